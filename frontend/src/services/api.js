@@ -67,7 +67,13 @@ const transformGame = (backendGame) => {
 // AUTH API
 export const authApi = {
   login: async (username) => {
-    const response = await wsClient.sendCommand('LOGIN', { username });
+    const params = { username };
+    // After a reconnect only the watched games changed since the last sync are replayed
+    if (wsClient.lastSequence !== null) {
+      params.since = wsClient.lastSequence;
+      params.epoch = wsClient.lastEpoch;
+    }
+    const response = await wsClient.sendCommand('LOGIN', params);
     return {
       username: response.username,
       message: response.message,
@@ -84,7 +90,8 @@ export const teamApi = {
   },
 
   getById: async (id) => {
-    const response = await wsClient.sendCommand('GET_TEAMS');
+    // Listings are ordered by id, so the one entry after id - 1 is the wanted one if it exists
+    const response = await wsClient.sendCommand('GET_TEAMS', { cursor: id - 1, limit: 1 });
     return response.teams.find(t => t.id === id) || null;
   },
 
@@ -153,7 +160,8 @@ export const gameApi = {
   },
 
   getById: async (id) => {
-    const response = await wsClient.sendCommand('GET_GAMES');
+    // Listings are ordered by id, so the one entry after id - 1 is the wanted one if it exists
+    const response = await wsClient.sendCommand('GET_GAMES', { cursor: id - 1, limit: 1 });
     const game = response.games.find(g => g.id === id);
     return game ? transformGame(game) : null;
   },
@@ -306,7 +314,8 @@ export const cupApi = {
   },
 
   getById: async (id) => {
-    const response = await wsClient.sendCommand('GET_CUPS');
+    // Listings are ordered by id, so the one entry after id - 1 is the wanted one if it exists
+    const response = await wsClient.sendCommand('GET_CUPS', { cursor: id - 1, limit: 1 });
     return response.cups.find(c => c.id === id) || null;
   },
 
@@ -346,6 +355,17 @@ export const systemApi = {
     return response.results || [];
   },
 
+  syncSince: async () => {
+    // Objects changed since the last sync; `full` is set when the server sent everything
+    return wsClient.sendCommand('SYNC_SINCE', { since: wsClient.lastSequence ?? 0, epoch: wsClient.lastEpoch });
+  },
+
+  batch: async (commands) => {
+    // Runs the commands in one round-trip; {$ref: n} stands for the ID created by commands[n]
+    const response = await wsClient.sendCommand('BATCH', { commands });
+    return response.results || [];
+  },
+
   list: async () => {
     const response = await wsClient.sendCommand('LIST');
     return response.items || [];
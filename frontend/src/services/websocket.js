@@ -11,6 +11,9 @@ class WebSocketClient {
     this.notificationHandlers = [];
     this.requestCallbacks = new Map();
     this.requestId = 0;
+    // Sequence and epoch of the server state last synced (from LOGIN / SYNC_SINCE), for delta syncs
+    this.lastSequence = null;
+    this.lastEpoch = null;
 
     this.errorHandler = null;
   }
@@ -70,11 +73,20 @@ class WebSocketClient {
       return;
     }
 
+    if (typeof data.sequence === 'number') {
+      this.lastSequence = data.sequence;
+      this.lastEpoch = data.epoch ?? null;
+    }
+
     if (data.status) {
-      if (this.requestCallbacks.size > 0) {
-        const firstKey = this.requestCallbacks.keys().next().value;
-        const { resolve, reject } = this.requestCallbacks.get(firstKey);
-        this.requestCallbacks.delete(firstKey);
+      // Replies may come out of order; match them by requestId. Untagged replies
+      // (e.g. to malformed requests) go to the oldest pending request.
+      const key = data.requestId != null
+        ? data.requestId
+        : this.requestCallbacks.keys().next().value;
+      if (this.requestCallbacks.has(key)) {
+        const { resolve, reject } = this.requestCallbacks.get(key);
+        this.requestCallbacks.delete(key);
 
         if (data.status === 'OK') {
           resolve(data);
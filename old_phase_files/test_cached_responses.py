@@ -0,0 +1,148 @@
+# test_cached_responses.py
+"""Unit tests for the versioned GET_STANDINGS and GET_GAMETREE responses."""
+
+import importlib
+import json
+
+import pytest
+
+import server as server_module
+
+
+class FakeWebSocket:
+    """Stands in for a client connection; keeps what the server sends."""
+
+    remote_address = ("test", 0)
+
+    def __init__(self) -> None:
+        self.sent = []
+
+    def send(self, message, text=None) -> None:
+        self.sent.append(message)
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    """Fresh server module whose state files live in a temporary directory."""
+    monkeypatch.chdir(tmp_path)
+    module = importlib.reload(server_module)
+    module.load_state()
+    return module
+
+
+@pytest.fixture
+def session(server):
+    """A session that is not connected to a running notification thread."""
+    session = server.Session(FakeWebSocket())
+    session.running = False
+    return session
+
+
+def run(session, **req):
+    """Runs one command and returns the response as a dict, parsing cached (serialized) ones."""
+    response = session.process_command(req)
+    return json.loads(response) if isinstance(response, str) else response
+
+
+def make_cup(session, cup_type="LEAGUE", count=4):
+    """Creates `count` teams and a cup of them; returns (cup ID, team IDs)."""
+    team_ids = [run(session, command="CREATE_TEAM", name=f"T{n}")["id"] for n in range(count)]
+    cup_id = run(session, command="CREATE_CUP", cup_type=cup_type, team_ids=team_ids)["id"]
+    return cup_id, team_ids
+
+
+def play(session, game_id, home=1, away=0):
+    """Plays a game to its end with the given score."""
+    run(session, command="START", id=game_id)
+    for side, points in (("HOME", home), ("AWAY", away)):
+        if points:
+            run(session, command="SCORE", id=game_id, points=points, side=side)
+    run(session, command="END", id=game_id)
+
+
+class TestCachedResponses:
+    """Test cases for cached_response and if_version revalidation."""
+
+    @pytest.mark.parametrize("cmd, cup_type", [("GET_STANDINGS", "LEAGUE"), ("GET_GAMETREE", "ELIMINATION")])
+    def test_repeated_poll_reuses_serialized_response(self, session, cmd, cup_type) -> None:
+        """Test an unchanged cup is answered with the very same JSON string."""
+        cup_id, _ = make_cup(session, cup_type)
+
+        first = session.process_command({"command": cmd, "id": cup_id})
+        second = session.process_command({"command": cmd, "id": cup_id})
+
+        assert isinstance(first, str)
+        assert second is first
+        assert json.loads(first)["status"] == "OK"
+
+    @pytest.mark.parametrize("cmd, cup_type", [("GET_STANDINGS", "LEAGUE"), ("GET_GAMETREE", "ELIMINATION")])
+    def test_current_version_is_not_modified(self, session, cmd, cup_type) -> None:
+        """Test a poll carrying the current version gets NOT_MODIFIED and a stale one the full response."""
+        cup_id, _ = make_cup(session, cup_type)
+        version = run(session, command=cmd, id=cup_id)["version"]
+
+        assert run(session, command=cmd, id=cup_id, if_version=version) == {"status": "NOT_MODIFIED", "version": version}
+        assert run(session, command=cmd, id=cup_id, if_version=version - 1)["status"] == "OK"
+
+    def test_game_update_invalidates(self, session) -> None:
+        """Test a finished game moves the version on and the standings show its result."""
+        cup_id, _ = make_cup(session)
+        before = run(session, command="GET_STANDINGS", id=cup_id)
+        game_id = run(session, command="GET_CUP_GAMES", id=cup_id)["games"][0]["id"]
+
+        play(session, game_id, 3, 0)
+        after = run(session, command="GET_STANDINGS", id=cup_id, if_version=before["version"])
+
+        assert after["status"] == "OK"
+        assert after["version"] > before["version"]
+        assert after["standings"] != before["standings"]
+        assert max(row["points"] for row in after["standings"]) == 2
+
+    def test_game_update_invalidates_gametree(self, session) -> None:
+        """Test the game tree shows the next round's team once a first-round game ended."""
+        cup_id, _ = make_cup(session, "ELIMINATION")
+        before = run(session, command="GET_GAMETREE", id=cup_id)
+        game_id = run(session, command="GET_CUP_GAMES", id=cup_id)["games"][0]["id"]
+
+        play(session, game_id, 2, 0)
+        after = run(session, command="GET_GAMETREE", id=cup_id, if_version=before["version"])
+
+        assert after["status"] == "OK" and after["version"] > before["version"]
+        assert after["gametree"] != before["gametree"]
+
+    def test_team_rename_invalidates(self, session) -> None:
+        """Test renaming a team of the cup moves the version on and shows the new name."""
+        cup_id, team_ids = make_cup(session)
+        before = run(session, command="GET_STANDINGS", id=cup_id)
+
+        run(session, command="UPDATE_TEAM", id=team_ids[0], name="Renamed")
+        after = run(session, command="GET_STANDINGS", id=cup_id, if_version=before["version"])
+
+        assert after["status"] == "OK"
+        assert "Renamed" in {row["team"] for row in after["standings"]}
+        assert "T0" not in {row["team"] for row in after["standings"]}
+
+    def test_rename_of_unrelated_team_keeps_version(self, session) -> None:
+        """Test a team outside the cup does not invalidate its responses."""
+        cup_id, _ = make_cup(session)
+        other = run(session, command="CREATE_TEAM", name="Other")["id"]
+        version = run(session, command="GET_STANDINGS", id=cup_id)["version"]
+
+        run(session, command="UPDATE_TEAM", id=other, name="Still other")
+
+        assert run(session, command="GET_STANDINGS", id=cup_id, if_version=version)["status"] == "NOT_MODIFIED"
+
+    def test_cup_deletion_drops_cached_responses(self, server, session) -> None:
+        """Test a deleted cup's cached responses are dropped and it is no longer served."""
+        cup_id, _ = make_cup(session, "ELIMINATION")
+        version = run(session, command="GET_STANDINGS", id=cup_id)["version"]
+        run(session, command="GET_GAMETREE", id=cup_id)
+        assert ("GET_STANDINGS", cup_id) in server.response_cache
+
+        response = run(session, command="DELETE", id=cup_id)
+
+        assert response["status"] == "OK", response
+        assert ("GET_STANDINGS", cup_id) not in server.response_cache
+        assert ("GET_GAMETREE", cup_id) not in server.response_cache
+        for cmd in ("GET_STANDINGS", "GET_GAMETREE"):
+            assert run(session, command=cmd, id=cup_id, if_version=version)["status"] == "ERROR"
@@ -0,0 +1,277 @@
+# test_cup_caches.py
+"""Unit tests for the incrementally maintained Cup caches against recomputed baselines."""
+
+import pickle
+import threading
+from datetime import timedelta
+
+from sports_lib import CupType, GameState, PlaceholderTeam, Repo
+
+
+def make_cup(cup_type, count=8, **kwargs):
+    """Creates a repo holding `count` teams and a cup of them; returns (repo, cup)."""
+    repo = Repo()
+    teams = [repo.get(repo.create(type="team", name=f"T{n}")) for n in range(count)]
+    cid = repo.create(type="cup", teams=teams, cup_type=cup_type, interval=timedelta(days=1), **kwargs)
+    return repo, repo.get(cid)
+
+
+def play(game, home=1, away=0):
+    """Plays a game to its end with the given score."""
+    game.start()
+    if home:
+        game.score(home, game.home())
+    if away:
+        game.score(away, game.away())
+    game.end()
+
+
+def correct(game, home, away):
+    """Changes the result of an ended game, as a correction of the score does."""
+    game.home_score, game.away_score = home, away
+    game._notify()
+
+
+def playable(cup):
+    """Returns the games that are not ended and have two real teams."""
+    return [
+        g for g in cup.games
+        if g.state != GameState.ENDED
+        and not isinstance(g.home_, PlaceholderTeam) and not isinstance(g.away_, PlaceholderTeam)
+    ]
+
+
+def fresh_name(cup, team):
+    """Resolves a slot with an empty memo, i.e. recomputed from the games."""
+    saved, cup._resolved = cup._resolved, {}
+    try:
+        return cup._resolve_placeholder(team)
+    finally:
+        cup._resolved = saved
+
+
+def naive_table(cup, key):
+    """Recomputes a standings table from every ended game: name -> (won, draw, lost, gf, ga, points)."""
+    teams = cup.teams if key is None else cup.groups[key]
+    rows = {team.team_name: [0] * 6 for team in teams}
+    for game in cup.games:
+        counts, game_key = cup._standings_key(game)
+        if not counts or game_key != key or game.state != GameState.ENDED:
+            continue
+        for name, scored, conceded in (
+            (game.home().team_name, game.home_score, game.away_score),
+            (game.away().team_name, game.away_score, game.home_score),
+        ):
+            row = rows.setdefault(name, [0] * 6)
+            row[3] += scored
+            row[4] += conceded
+            if scored > conceded:
+                row[0] += 1
+                row[5] += 2
+            elif scored == conceded:
+                row[1] += 1
+                row[5] += 1
+            else:
+                row[2] += 1
+    return {name: tuple(row) for name, row in rows.items()}
+
+
+def naive_edges(cup):
+    """Recomputes the bracket edges from the placeholder slots of the games."""
+    return {
+        (source_id, game.id(), side)
+        for game in cup.games
+        for side, slot in (("home", game.home_), ("away", game.away_))
+        if isinstance(slot, PlaceholderTeam)
+        for source_id in slot.source_games
+    }
+
+
+def cached_edges(cup):
+    """Returns the bracket edges the cup keeps in `_dependents`."""
+    return {(source_id, game_id, side) for source_id, edges in cup._dependents.items() for game_id, side in edges}
+
+
+def check_caches(cup):
+    """Asserts every cache of the cup matches its recomputed baseline."""
+    assert cup._games_by_id == {game.id(): game for game in cup.games}
+
+    # Edges stay registered after their slot was filled in; those are harmless.
+    cached = cached_edges(cup)
+    assert naive_edges(cup) <= cached
+    for source_id, game_id, side in cached - naive_edges(cup):
+        game = cup._games_by_id[game_id]
+        assert not isinstance(game.home_ if side == "home" else game.away_, PlaceholderTeam)
+
+    for slot in [slot for game in cup.games for slot in (game.home_, game.away_)]:
+        assert cup._resolve_placeholder(slot) == fresh_name(cup, slot)
+
+    if cup.cup_type in [CupType.LEAGUE, CupType.LEAGUE2]:
+        keys = [None]
+    elif cup.cup_type in [CupType.GROUP, CupType.GROUP2]:
+        keys = list(cup.groups)
+    else:
+        keys = []
+    for key in keys:
+        table = cup._standings_table(key)
+        assert {name: tuple(row) for name, *row in table} == naive_table(cup, key)
+        order = [(row[5], row[3] - row[4]) for _, *row in table]
+        assert order == sorted(order, reverse=True)
+
+
+def reload(repo, cup):
+    """Returns the cup of a pickled and restored copy of the repo."""
+    restored = pickle.loads(pickle.dumps(repo))
+    return restored.get(cup.getid())
+
+
+class TestStandingsCache:
+    """Test cases for the incremental standings tables."""
+
+    def test_league_matches_recomputed_table(self) -> None:
+        """Test the table matches a recomputation after every result."""
+        _, cup = make_cup(CupType.LEAGUE, count=5)
+        check_caches(cup)
+        for n, game in enumerate(cup.games):
+            play(game, n % 3, (n + 1) % 2)
+            check_caches(cup)
+
+    def test_result_corrected_after_end(self) -> None:
+        """Test correcting an ended game replaces its old result in the table."""
+        _, cup = make_cup(CupType.LEAGUE, count=4)
+        for game in cup.games:
+            play(game, 2, 1)
+        check_caches(cup)
+
+        correct(cup.games[0], 0, 3)  # The winner flips.
+        check_caches(cup)
+        correct(cup.games[0], 1, 1)  # Now a draw.
+        check_caches(cup)
+        correct(cup.games[1], 1, 1)  # Unchanged result: no delta.
+        correct(cup.games[1], 1, 1)
+        check_caches(cup)
+
+    def test_group_tables_and_playoffs(self) -> None:
+        """Test group tables match a recomputation up to and after the playoffs are generated."""
+        _, cup = make_cup(CupType.GROUP, num_groups=2, playoff_teams=4)
+        for n, game in enumerate(list(cup.games)):
+            play(game, n % 4, n % 3)
+            check_caches(cup)
+        assert cup.playoff_games
+        check_caches(cup)
+
+    def test_tables_survive_reload(self) -> None:
+        """Test a cup restored from a pickle rebuilds the same tables and keeps them up to date."""
+        repo, cup = make_cup(CupType.LEAGUE, count=4)
+        for game in cup.games[:3]:
+            play(game, 1, 0)
+        expected = cup.standings()
+
+        restored = reload(repo, cup)
+
+        assert restored.standings() == expected
+        check_caches(restored)
+        for n, game in enumerate(restored.games[3:]):
+            play(game, n, 1)
+            check_caches(restored)
+        correct(restored.games[0], 0, 2)
+        check_caches(restored)
+
+
+class TestBracketCaches:
+    """Test cases for the game map, the bracket graph and the placeholder memo."""
+
+    def test_elimination_bracket_played_through(self) -> None:
+        """Test every cache matches its baseline while a bracket is played round by round."""
+        _, cup = make_cup(CupType.ELIMINATION)
+        check_caches(cup)
+        while playable(cup):
+            for game in playable(cup):
+                play(game, 2, 1)
+                check_caches(cup)
+        assert all(g.state == GameState.ENDED for g in cup.games)
+
+    def test_winner_flip_invalidates_downstream_memo(self) -> None:
+        """Test a drawn game's placeholder resolves to the winner once the result is corrected."""
+        _, cup = make_cup(CupType.ELIMINATION, count=4)
+        first = cup.games[0]
+        final = next(g for g in cup.games if first.id() in getattr(g.home_, "source_games", []))
+        placeholder = final.home_
+
+        play(first, 1, 1)  # A draw leaves the slot open.
+        assert cup._resolve_placeholder(placeholder) == f"Winner of Game {first.id()}"
+        check_caches(cup)
+
+        correct(first, 1, 2)
+
+        assert final.home() is first.away()
+        assert fresh_name(cup, placeholder) == first.away().team_name
+        assert cup._resolve_placeholder(placeholder) == first.away().team_name
+
+    def test_nested_memo_invalidated_through_bracket(self) -> None:
+        """Test a memo two rounds down is dropped when a game upstream of it changes."""
+        _, cup = make_cup(CupType.ELIMINATION)
+        for game in cup.rounds[0]:
+            play(game, 1, 1)  # Every first-round game drawn: nothing advances.
+        check_caches(cup)
+
+        for game in cup.rounds[0]:
+            correct(game, 3, 0)
+            check_caches(cup)
+        assert not any(isinstance(slot, PlaceholderTeam) for g in cup.rounds[1] for slot in (g.home_, g.away_))
+
+    def test_two_leg_aggregate_placeholder(self) -> None:
+        """Test a two-leg placeholder resolves from the aggregate and follows corrections."""
+        _, cup = make_cup(CupType.ELIMINATION2, count=4)
+        leg1, leg2 = cup.rounds[0][0], cup.rounds[0][1]
+        final = next(g for g in cup.games if leg1.id() in getattr(g.home_, "source_games", []))
+        placeholder = final.home_
+        assert placeholder.source_games == [leg1.id(), leg2.id()]
+
+        play(leg1, 1, 1)
+        play(leg2, 0, 0)  # Level on aggregate: undecided.
+        assert cup._resolve_placeholder(placeholder).startswith("Winner of Games")
+        check_caches(cup)
+
+        correct(leg2, 2, 0)  # Leg 2's home side now leads 3-1 on aggregate.
+
+        assert cup._resolve_placeholder(placeholder) == fresh_name(cup, placeholder) == leg2.home().team_name
+        check_caches(cup)
+
+    def test_bracket_caches_survive_reload(self) -> None:
+        """Test a restored cup rebuilds the game map and the graph and keeps advancing."""
+        repo, cup = make_cup(CupType.ELIMINATION)
+        for game in cup.rounds[0][:2]:
+            play(game, 2, 0)
+
+        restored = reload(repo, cup)
+
+        assert cached_edges(restored) == naive_edges(restored)
+        check_caches(restored)
+        while playable(restored):
+            for game in playable(restored):
+                play(game, 0, 1)
+                check_caches(restored)
+        assert all(g.state == GameState.ENDED for g in restored.games)
+
+    def test_concurrent_reads_fill_memo_once(self) -> None:
+        """Test readers filling the placeholder memo at the same time all get the recomputed names."""
+        _, cup = make_cup(CupType.ELIMINATION)
+        for game in cup.rounds[0]:
+            play(game, 1, 0)
+        cup._resolved.clear()
+        barrier = threading.Barrier(4, timeout=5)
+        results = []
+
+        def read():
+            barrier.wait()
+            results.append([cup._resolve_placeholder(s) for g in cup.games for s in (g.home_, g.away_)])
+
+        threads = [threading.Thread(target=read, daemon=True) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(5)
+
+        assert len(results) == 4 and all(r == results[0] for r in results)
+        check_caches(cup)
@@ -0,0 +1,130 @@
+# test_cup_search.py
+"""Unit tests for Cup.search and the game datetimes it indexes."""
+
+import importlib
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+import pytest
+
+import server as server_module
+from sports_lib import Cup, CupType, Game, PlaceholderTeam, Team
+
+
+class FakeWebSocket:
+    """Stands in for a client connection; keeps what the server sends."""
+
+    remote_address = ("test", 0)
+
+    def __init__(self) -> None:
+        self.sent = []
+
+    def send(self, message, text=None) -> None:
+        self.sent.append(message)
+
+
+class TestGameDatetime:
+    """Test cases for the datetime accepted by Game.update."""
+
+    @pytest.fixture
+    def game(self) -> Game:
+        """Create a game for testing."""
+        return Game(Team("Home"), Team("Away"), id_=1, datetime=datetime(2030, 1, 1, 12, 0))
+
+    def test_naive_datetime_is_stored(self, game: Game) -> None:
+        """Test a naive datetime replaces the game's."""
+        game.update(datetime=datetime(2030, 2, 1, 9, 30))
+
+        assert game.datetime == datetime(2030, 2, 1, 9, 30)
+
+    def test_aware_datetime_is_rejected(self, game: Game) -> None:
+        """Test a datetime with a timezone is refused and leaves the game unchanged."""
+        with pytest.raises(ValueError):
+            game.update(datetime=datetime(2030, 2, 1, 9, 30, tzinfo=timezone.utc))
+
+        assert game.datetime == datetime(2030, 1, 1, 12, 0)
+
+    def test_non_datetime_is_rejected(self, game: Game) -> None:
+        """Test a value that is not a datetime is refused."""
+        with pytest.raises(TypeError):
+            game.update(datetime="2030-02-01T09:30:00")
+
+
+class TestCupSearchIndex:
+    """Test cases for keeping the search index current from game notifications."""
+
+    @pytest.fixture
+    def teams(self) -> List[Team]:
+        """Create teams for testing."""
+        return [Team(f"Team {n}") for n in range(4)]
+
+    def test_rescheduled_game_moves_in_date_index(self, teams: List[Team]) -> None:
+        """Test a date search finds a game at its new time after an update."""
+        cup = Cup(teams, CupType.LEAGUE, interval=timedelta(days=1))
+        game = cup.games[0]
+        later = datetime(2099, 1, 1, 12, 0)
+        cup.search(tname="Team 0")  # Builds the index.
+
+        game.update(datetime=later)
+
+        found = cup.search(between=(later - timedelta(hours=1), later + timedelta(hours=1)))
+        assert found == [game]
+
+    def test_index_failure_does_not_stop_the_bracket(self, teams: List[Team]) -> None:
+        """Test the next round is filled in even if re-indexing the ended game fails."""
+        cup = Cup(teams, CupType.ELIMINATION, interval=timedelta(days=1))
+        first = cup.games[0]
+        final = next(g for g in cup.games if isinstance(g.home(), PlaceholderTeam))
+        cup.search(tname="Team 0")  # Builds the index.
+        first.start()
+        first.score(1, first.home())
+        # Written directly, past Game.update's check: not comparable with the other dates.
+        first.datetime = datetime(2030, 1, 1, tzinfo=timezone.utc)
+
+        first.end()  # The observer error is logged, not raised.
+
+        assert final.home() is first.home()
+
+
+class TestUpdateGameDatetime:
+    """Test cases for the datetime of UPDATE_GAME."""
+
+    @pytest.fixture
+    def server(self, tmp_path, monkeypatch):
+        """Fresh server module whose state files live in a temporary directory."""
+        monkeypatch.chdir(tmp_path)
+        module = importlib.reload(server_module)
+        module.load_state()
+        return module
+
+    def command(self, server, **req):
+        """Runs one command in a fresh session."""
+        session = server.Session(FakeWebSocket())
+        session.running = False
+        return session.process_command(req)
+
+    @pytest.mark.parametrize("value", ["2030-06-01T12:00:00+02:00", "2030-06-01T12:00:00Z", "2030-06-01T12:00:00"])
+    def test_datetime_is_stored_naive(self, server, value) -> None:
+        """Test UPDATE_GAME stores the wall time without a timezone, so cup searches keep working."""
+        team_ids = [self.command(server, command="CREATE_TEAM", name=f"T{n}")["id"] for n in range(4)]
+        cup_id = self.command(server, command="CREATE_CUP", cup_type="LEAGUE", team_ids=team_ids)["id"]
+        games = self.command(server, command="GET_CUP_GAMES", id=cup_id)["games"]
+        self.command(server, command="SEARCH_GAMES", cup_id=cup_id, tname="T0")  # Builds the index.
+
+        response = self.command(server, command="UPDATE_GAME", id=games[0]["id"], datetime=value)
+
+        assert response["status"] == "OK", response
+        assert server.repository._objects[games[0]["id"]]["instance"].datetime == datetime(2030, 6, 1, 12, 0)
+        found = self.command(server, command="SEARCH_GAMES", cup_id=cup_id,
+                             start_date="2030-06-01T00:00:00Z", end_date="2030-06-02T00:00:00Z")
+        assert [g["id"] for g in found["games"]] == [games[0]["id"]]
+
+    def test_invalid_datetime_is_an_error(self, server) -> None:
+        """Test a datetime that is not an ISO string gets an error response."""
+        home = self.command(server, command="CREATE_TEAM", name="Home")["id"]
+        away = self.command(server, command="CREATE_TEAM", name="Away")["id"]
+        game = self.command(server, command="CREATE_GAME", home_id=home, away_id=away)["id"]
+
+        for value in ("tomorrow", 12):
+            response = self.command(server, command="UPDATE_GAME", id=game, datetime=value)
+            assert response["status"] == "ERROR"
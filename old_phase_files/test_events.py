@@ -0,0 +1,149 @@
+# test_events.py
+"""Unit tests for EventBus class."""
+
+import importlib
+import threading
+import time
+
+import pytest
+
+import server as server_module
+from sports_lib.events import EventBus
+
+
+class FakeGame:
+    """Records its deliveries; `then` runs inside the delivery, like an observer."""
+
+    def __init__(self, log, name, then=None, delay=0.0) -> None:
+        self.log = log
+        self.name = name
+        self.then = then
+        self.delay = delay
+
+    def _dispatch(self) -> None:
+        time.sleep(self.delay)
+        self.log.append(self.name)
+        if self.then is not None:
+            self.then()
+
+
+class FakeWebSocket:
+    """Stands in for a client connection; keeps what the server sends."""
+
+    remote_address = ("test", 0)
+
+    def __init__(self) -> None:
+        self.sent = []
+
+    def send(self, message, text=None) -> None:
+        self.sent.append(message)
+
+
+class TestEventBus:
+    """Test cases for EventBus class."""
+
+    @pytest.fixture
+    def bus(self):
+        """Create a started bus and stop it afterwards."""
+        bus = EventBus(lock=threading.RLock())
+        bus.start()
+        yield bus
+        bus.stop()
+
+    def test_delivers_inline_before_start(self) -> None:
+        """Test events are delivered by the publisher until the bus is started."""
+        log = []
+        bus = EventBus()
+
+        bus.publish(FakeGame(log, "a"))
+
+        assert log == ["a"]
+
+    def test_delivers_in_publication_order(self, bus) -> None:
+        """Test the dispatcher delivers events in the order they were published."""
+        log = []
+        for n in range(20):
+            bus.publish(FakeGame(log, n, delay=0.001))
+
+        assert bus.flush(timeout=5)
+        assert log == list(range(20))
+
+    def test_flush_waits_for_cascaded_events(self, bus) -> None:
+        """Test flush also waits for events that observers publish while it waits."""
+        log = []
+        last = FakeGame(log, "third", delay=0.05)
+        second = FakeGame(log, "second", then=lambda: bus.publish(last), delay=0.05)
+        first = FakeGame(log, "first", then=lambda: bus.publish(second), delay=0.05)
+
+        bus.publish(first)
+
+        assert bus.flush(timeout=5)
+        assert log == ["first", "second", "third"]
+
+    def test_flush_ignores_later_publications(self, bus) -> None:
+        """Test flush returns once earlier events are delivered while another thread keeps publishing."""
+        log = []
+        stop = threading.Event()
+
+        def publish_forever():
+            while not stop.is_set():
+                bus.publish(FakeGame([], "noise", delay=0.002))  # Slower than it is published: never idle.
+                time.sleep(0.001)
+
+        bus.publish(FakeGame(log, "before", delay=0.05))
+        publisher = threading.Thread(target=publish_forever, daemon=True)
+        publisher.start()
+        try:
+            started = time.monotonic()
+            assert bus.flush(timeout=5)
+            assert time.monotonic() - started < 1
+            assert log == ["before"]
+        finally:
+            stop.set()
+            publisher.join(5)
+
+    def test_flush_times_out(self, bus) -> None:
+        """Test flush returns False when delivery takes longer than the timeout."""
+        release = threading.Event()
+        bus.publish(FakeGame([], "slow", then=release.wait))
+
+        assert not bus.flush(timeout=0.05)
+        release.set()
+        assert bus.flush(timeout=5)
+
+
+class TestEventBarrier:
+    """Test cases for commands that wait for the event dispatcher."""
+
+    @pytest.fixture
+    def server(self, tmp_path, monkeypatch):
+        """Fresh server module with a running event bus, state kept in a temporary directory."""
+        monkeypatch.chdir(tmp_path)
+        module = importlib.reload(server_module)
+        module.load_state()
+        module.events.start()
+        yield module
+        module.events.stop()
+
+    def test_cup_games_show_next_round_after_end(self, server) -> None:
+        """Test GET_CUP_GAMES sees the teams that ending a game advances to the next round."""
+        session = server.Session(FakeWebSocket())
+        session.running = False
+        team_ids = [session.process_command({"command": "CREATE_TEAM", "name": f"T{n}"})["id"] for n in range(8)]
+        cup = session.process_command({"command": "CREATE_CUP", "cup_type": "ELIMINATION", "team_ids": team_ids})
+        cup_id = cup["id"]
+
+        ended = set()
+        while True:
+            games = session.process_command({"command": "GET_CUP_GAMES", "id": cup_id})["games"]
+            playable = [g for g in games if g["id"] not in ended and g["home_id"] and g["away_id"]]
+            if not playable:
+                break
+            for game in playable:
+                session.process_command({"command": "START", "id": game["id"]})
+                session.process_command({"command": "SCORE", "id": game["id"], "points": 1, "side": "HOME"})
+                session.process_command({"command": "END", "id": game["id"]})
+                ended.add(game["id"])
+
+        assert len(ended) == len(games) == 7
+        assert not any(g["home"].startswith("Winner of") or g["away"].startswith("Winner of") for g in games)
@@ -0,0 +1,306 @@
+# test_journal.py
+"""Unit tests for the persistence journal and crash recovery."""
+
+import importlib
+import os
+
+import pytest
+
+import server as server_module
+
+
+class FakeWebSocket:
+    """Stands in for a client connection; keeps what the server sends."""
+
+    remote_address = ("test", 0)
+
+    def __init__(self) -> None:
+        self.sent = []
+
+    def send(self, message, text=None) -> None:
+        self.sent.append(message)
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    """Fresh server module whose state files live in a temporary directory."""
+    monkeypatch.chdir(tmp_path)
+    module = importlib.reload(server_module)
+    module.load_state()
+    return module
+
+
+def restart(server):
+    """Simulates a server restart: fresh module state recovered from the files on disk."""
+    module = importlib.reload(server)
+    module.load_state()
+    return module
+
+
+def run(session, **req):
+    """Runs one command and asserts it succeeded."""
+    response = session.process_command(req)
+    assert response["status"] == "OK", response
+    return response
+
+
+def populate(server):
+    """Creates two teams with a player each and a game in progress; returns the game ID."""
+    session = server.Session(FakeWebSocket())
+    session.running = False
+    home = run(session, command="CREATE_TEAM", name="Home")["id"]
+    away = run(session, command="CREATE_TEAM", name="Away")["id"]
+    run(session, command="ADD_PLAYER", team_id=home, name="Alice", no=7)
+    run(session, command="ADD_PLAYER", team_id=away, name="Bob", no=9)
+    game = run(session, command="CREATE_GAME", home_id=home, away_id=away)["id"]
+    run(session, command="START", id=game)
+    run(session, command="SCORE", id=game, points=2, side="HOME")
+    run(session, command="SCORE", id=game, points=3, side="AWAY")
+    return game
+
+
+def state_of(server):
+    """Returns a comparable image of every team and game in the repository."""
+    image = {}
+    for oid, data in server.repository._objects.items():
+        instance = data["instance"]
+        if isinstance(instance, server.Team):
+            image[oid] = ("team", instance.team_name, dict(instance.players))
+        elif isinstance(instance, server.Game):
+            image[oid] = ("game", instance.state, instance.home_score, instance.away_score)
+    return image
+
+
+class TestJournalFraming:
+    """Test cases for the Journal record framing."""
+
+    @pytest.fixture
+    def journal(self, tmp_path) -> server_module.Journal:
+        """Create a journal in a temporary file."""
+        return server_module.Journal(str(tmp_path / "test.journal"))
+
+    def test_replay_returns_records_in_order(self, journal) -> None:
+        """Test records come back with their sequence numbers, in order."""
+        journal.write(journal.encode([("team", {"id": 1}), ("team", {"id": 2})]), 2)
+        journal.write(journal.encode([("game", {"id": 3})]), 1)
+
+        records = list(journal.replay(0))
+
+        assert records == [(1, "team", {"id": 1}), (2, "team", {"id": 2}), (3, "game", {"id": 3})]
+        assert journal.seq == 3
+
+    def test_replay_skips_records_covered_by_snapshot(self, journal) -> None:
+        """Test only records newer than the snapshot's sequence number are replayed."""
+        journal.write(journal.encode([("team", {"id": n}) for n in range(1, 4)]), 3)
+
+        records = list(journal.replay(2))
+
+        assert records == [(3, "team", {"id": 3})]
+
+    def test_torn_last_record_is_discarded(self, journal) -> None:
+        """Test a record cut short by a crash is dropped and the file truncated."""
+        journal.write(journal.encode([("team", {"id": 1}), ("team", {"id": 2})]), 2)
+        intact = os.path.getsize(journal.path)
+        torn = journal.encode([("team", {"id": 3})])
+        with open(journal.path, "ab") as f:
+            f.write(torn[:len(torn) // 2])
+
+        records = list(journal.replay(0))
+
+        assert [seq for seq, _, _ in records] == [1, 2]
+        assert journal.seq == 2
+        assert os.path.getsize(journal.path) == intact
+
+    def test_corrupt_last_record_is_discarded(self, journal) -> None:
+        """Test a record failing its checksum ends the replay."""
+        journal.write(journal.encode([("team", {"id": 1}), ("team", {"id": 2})]), 2)
+        with open(journal.path, "r+b") as f:
+            f.seek(-1, os.SEEK_END)
+            last = f.read(1)
+            f.seek(-1, os.SEEK_END)
+            f.write(bytes([last[0] ^ 0xFF]))
+
+        records = list(journal.replay(0))
+
+        assert [seq for seq, _, _ in records] == [1]
+
+    def test_append_after_torn_tail(self, journal) -> None:
+        """Test records appended after a torn tail was cut off replay cleanly."""
+        journal.write(journal.encode([("team", {"id": 1})]), 1)
+        with open(journal.path, "ab") as f:
+            f.write(b"\x00\x00\x01")
+        list(journal.replay(0))
+
+        journal.write(journal.encode([("team", {"id": 2})]), 1)
+        records = list(journal.replay(0))
+
+        assert records == [(1, "team", {"id": 1}), (2, "team", {"id": 2})]
+
+
+class TestCrashRecovery:
+    """Test cases for recovering the repository from the snapshot and the journal."""
+
+    def test_journal_replays_without_snapshot(self, server) -> None:
+        """Test every change made since startup survives a crash without any SAVE."""
+        populate(server)
+        expected = state_of(server)
+        assert not os.path.exists(server.SAVE_FILE)
+
+        server = restart(server)
+
+        assert state_of(server) == expected
+
+    def test_journal_replays_on_top_of_snapshot(self, server) -> None:
+        """Test changes made after a SAVE are replayed on top of the saved snapshot."""
+        game = populate(server)
+        server.save_state()
+        session = server.Session(FakeWebSocket())
+        session.running = False
+        run(session, command="SCORE", id=game, points=1, side="HOME")
+        run(session, command="CREATE_TEAM", name="Late")
+        expected = state_of(server)
+
+        server = restart(server)
+
+        assert state_of(server) == expected
+        assert server.journal.pending == 0  # Folded into a snapshot after the replay.
+        home_score = server.repository._objects[game]["instance"].home_score
+        assert home_score == 3
+
+    def test_save_truncates_journal(self, server) -> None:
+        """Test a SAVE empties the journal and the snapshot alone restores the state."""
+        populate(server)
+        assert os.path.getsize(server.JOURNAL_FILE) > 0
+
+        server.save_state()
+
+        assert os.path.getsize(server.JOURNAL_FILE) == 0
+        assert server.journal.pending == 0
+        expected = state_of(server)
+        server = restart(server)
+        assert state_of(server) == expected
+        assert server.journal.pending == 0
+
+    def test_torn_journal_tail_after_crash(self, server) -> None:
+        """Test a crash in the middle of an append loses only the record being written."""
+        populate(server)
+        expected = state_of(server)
+        with open(server.JOURNAL_FILE, "ab") as f:
+            f.write(server.Journal.HEADER.pack(100, 0) + b"partial")
+
+        server = restart(server)
+
+        assert state_of(server) == expected
+        session = server.Session(FakeWebSocket())
+        session.running = False
+        run(session, command="CREATE_TEAM", name="After")
+        expected = state_of(server)
+        assert state_of(restart(server)) == expected
+
+
+class TestPlayoffReplay:
+    """Test cases for replaying the end of a group stage."""
+
+    def bracket_of(self, server, cup_id):
+        """Returns the cup's games as (ID, home, away) in schedule order."""
+        cup = server.repository._objects[cup_id]["instance"]
+        return [(g.id(), g.home().team_name, g.away().team_name) for g in cup.games]
+
+    def test_records_after_group_stage_survive_two_restarts(self, server, capsys) -> None:
+        """Test a crash before the playoff snapshot loses nothing and rebuilds the same bracket."""
+        session = server.Session(FakeWebSocket())
+        session.running = False
+        team_ids = [run(session, command="CREATE_TEAM", name=f"T{n}")["id"] for n in range(8)]
+        cup_id = run(session, command="CREATE_CUP", cup_type="GROUP", team_ids=team_ids,
+                     num_groups=2, playoff_teams=4)["id"]
+        group_games = [g["id"] for g in run(session, command="GET_CUP_GAMES", id=cup_id)["games"]]
+
+        # The process dies before any further snapshot reaches the disk.
+        server.save_state = lambda: None
+        for n, game in enumerate(group_games):
+            run(session, command="START", id=game)
+            run(session, command="SCORE", id=game, points=1 + n % 3, side="HOME")
+            run(session, command="END", id=game)
+        late = run(session, command="CREATE_TEAM", name="Late")["id"]
+        expected, bracket = state_of(server), self.bracket_of(server, cup_id)
+        assert len(bracket) > len(group_games)
+
+        server = restart(server)
+        assert state_of(server) == expected
+        assert self.bracket_of(server, cup_id) == bracket
+
+        server = restart(server)
+        assert state_of(server) == expected
+        assert self.bracket_of(server, cup_id) == bracket
+        assert server.repository._objects[late]["instance"].team_name == "Late"
+
+
+class TestSyncAfterRestart:
+    """Test cases for SYNC_SINCE cursors handed out before a restart."""
+
+    def sync(self, server, **req):
+        """Runs SYNC_SINCE in a fresh session."""
+        session = server.Session(FakeWebSocket())
+        session.running = False
+        return run(session, command="SYNC_SINCE", **req)
+
+    def test_cursor_from_before_restart_gets_everything(self, server) -> None:
+        """Test a cursor whose sequence number is reused after a restart forces a full sync."""
+        game = populate(server)
+        before = self.sync(server, since=0)
+
+        server = restart(server)
+        session = server.Session(FakeWebSocket())
+        session.running = False
+        while server.repository.changes.seq <= before["sequence"] + 1:
+            run(session, command="SCORE", id=game, points=1, side="AWAY")
+        synced = self.sync(server, since=before["sequence"])
+
+        assert synced["full"]
+        assert synced["epoch"] != before["epoch"]
+
+    def test_epoch_from_before_restart_gets_everything(self, server) -> None:
+        """Test a cursor of another epoch forces a full sync even when its sequence is current."""
+        populate(server)
+        before = self.sync(server, since=0)
+
+        server = restart(server)
+        current = self.sync(server, since=0)
+        synced = self.sync(server, since=current["sequence"], epoch=before["epoch"])
+
+        assert synced["full"]
+        assert not self.sync(server, since=current["sequence"], epoch=current["epoch"])["full"]
+
+
+class TestBatchPersistence:
+    """Test cases for the deferred persistence of BATCH."""
+
+    def test_batch_is_persisted_under_its_own_lock(self, server) -> None:
+        """Test the batch is persisted within its own lock acquisition, before other writers run."""
+        game = populate(server)
+        session = server.Session(FakeWebSocket())
+        session.running = False
+        acquired = server.repo_lock.stats()["write"]["acquired"]
+        pending = server.journal.pending
+
+        run(session, command="BATCH", commands=[
+            {"command": "SCORE", "id": game, "points": 1, "side": "HOME"},
+            {"command": "SCORE", "id": game, "points": 1, "side": "AWAY"},
+        ])
+
+        assert server.repo_lock.stats()["write"]["acquired"] == acquired + 1
+        assert server.journal.pending == pending + 2
+
+    def test_batch_survives_restart(self, server) -> None:
+        """Test the changes of a batch are replayed after a restart."""
+        game = populate(server)
+        session = server.Session(FakeWebSocket())
+        session.running = False
+        run(session, command="BATCH", commands=[
+            {"command": "CREATE_TEAM", "name": "Batched"},
+            {"command": "ADD_PLAYER", "team_id": {"$ref": 0}, "name": "Carol", "no": 4},
+            {"command": "SCORE", "id": game, "points": 2, "side": "AWAY"},
+        ])
+        expected = state_of(server)
+
+        assert state_of(restart(server)) == expected
@@ -0,0 +1,244 @@
+# test_notifications.py
+"""Unit tests for notification encoding, coalescing and the bounded session queues."""
+
+import importlib
+import json
+import time
+
+import pytest
+
+import server as server_module
+
+
+class FakeWebSocket:
+    """Stands in for a client connection; keeps what the server sends."""
+
+    remote_address = ("test", 0)
+
+    def __init__(self) -> None:
+        self.sent = []
+        self.closed = None
+
+    def send(self, message, text=None) -> None:
+        self.sent.append(message)
+
+    def close(self, code=1000, reason="") -> None:
+        self.closed = (code, reason)
+
+
+def wait_until(predicate, timeout: float = 5.0) -> None:
+    """Polls until the predicate holds, failing the test after the timeout."""
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "Timed out waiting for the condition"
+        time.sleep(0.001)
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    """Fresh server module (and counters) whose state files live in a temporary directory."""
+    monkeypatch.chdir(tmp_path)
+    module = importlib.reload(server_module)
+    module.load_state()
+    return module
+
+
+def run(session, **req):
+    """Runs one command and asserts it succeeded."""
+    response = session.process_command(req)
+    assert response["status"] == "OK", response
+    return response
+
+
+def make_game(server):
+    """Creates two teams and a running game between them; returns (session, game ID, home ID)."""
+    session = server.Session(FakeWebSocket())
+    session.running = False
+    home = run(session, command="CREATE_TEAM", name="Home")["id"]
+    away = run(session, command="CREATE_TEAM", name="Away")["id"]
+    game = run(session, command="CREATE_GAME", home_id=home, away_id=away)["id"]
+    run(session, command="START", id=game)
+    return session, game, home
+
+
+class TestEncodeNotification:
+    """Test cases for encode_notification and its cache."""
+
+    def test_same_version_reuses_buffer(self, server) -> None:
+        """Test an unchanged game is encoded once and the same buffer is returned."""
+        _, gid, _ = make_game(server)
+        game = server.repository.get(gid)
+
+        first = server.encode_notification(game)
+
+        assert server.encode_notification(game) is first
+        assert server.notification_cache[game][0] == (game.version, "Home", "Away")
+        assert json.loads(first)["game_id"] == gid
+
+    def test_new_version_is_encoded_again(self, server) -> None:
+        """Test a mutation bumps the version and the next encoding shows it."""
+        session, gid, _ = make_game(server)
+        game = server.repository.get(gid)
+        first = server.encode_notification(game)
+
+        run(session, command="SCORE", id=gid, points=2, side="HOME")
+        second = server.encode_notification(game)
+
+        assert second is not first
+        assert json.loads(second)["score"] == {"home": 2, "away": 0}
+        assert server.notification_cache[game][0][0] == game.version
+
+    def test_team_rename_is_part_of_the_key(self, server) -> None:
+        """Test renaming a team, which does not bump the game's version, re-encodes it."""
+        session, gid, home = make_game(server)
+        game = server.repository.get(gid)
+        first = server.encode_notification(game)
+        version = game.version
+
+        server.repository.get(home).team_name = "Renamed"  # As UPDATE_TEAM does, without a game mutation.
+        second = server.encode_notification(game)
+
+        assert game.version == version
+        assert second is not first
+        assert json.loads(second)["home"] == "Renamed"
+        assert server.notification_cache[game][0] == (version, "Renamed", "Away")
+
+
+class TestNotificationQueue:
+    """Test cases for NotificationQueue class."""
+
+    def test_coalesce_replaces_pending_in_place(self, server) -> None:
+        """Test a newer message of a game replaces its pending one and keeps its place in line."""
+        queue = server.NotificationQueue(10, "drop_oldest", coalesce=True)
+        queue.put(b"g1 v1", key=1)
+        queue.put(b"g2 v1", key=2)
+
+        queue.put(b"g1 v2", key=1)
+        queue.put(b"g1 v3", key=1)
+
+        assert queue.take() == [b"g1 v3", b"g2 v1"]
+        assert queue.coalesced == 2 and queue.dropped == 0
+        assert server.notify_stats["coalesced"] == 2
+
+    def test_without_coalescing_every_update_is_kept(self, server) -> None:
+        """Test a queue that does not coalesce delivers every update of a game, in order."""
+        queue = server.NotificationQueue(10, "drop_oldest")
+        for n in range(3):
+            queue.put(f"g1 v{n}".encode(), key=1)
+
+        assert queue.take() == [b"g1 v0", b"g1 v1", b"g1 v2"]
+        assert queue.coalesced == 0
+
+    def test_drop_oldest_when_full(self, server) -> None:
+        """Test a full 'drop_oldest' queue discards its oldest message for the new one."""
+        queue = server.NotificationQueue(3, "drop_oldest")
+        for n in range(5):
+            queue.put(f"m{n}".encode(), key=n)
+
+        assert queue.take() == [b"m2", b"m3", b"m4"]
+        assert queue.dropped == 2
+        assert server.notify_stats["dropped"] == 2
+
+    def test_coalesce_policy_when_full(self, server) -> None:
+        """Test a full 'coalesce' queue replaces the same game's message, or else drops the oldest."""
+        queue = server.NotificationQueue(3, "coalesce")
+        for n in range(3):
+            queue.put(f"g{n} v1".encode(), key=n)
+
+        queue.put(b"g0 v2", key=0)  # Same game: replaced, moved behind the others.
+        queue.put(b"g9 v1", key=9)  # New game: the oldest (g1) gives way.
+
+        assert queue.take() == [b"g2 v1", b"g0 v2", b"g9 v1"]
+        assert (queue.coalesced, queue.dropped) == (1, 1)
+        assert server.notify_stats["coalesced"] == 1 and server.notify_stats["dropped"] == 1
+
+    def test_disconnect_policy_evicts(self, server) -> None:
+        """Test a full 'disconnect' queue discards everything, stops the agent and evicts once."""
+        evictions = []
+        queue = server.NotificationQueue(2, "disconnect", on_overflow=lambda: evictions.append(1))
+        queue.put(b"m0", key=0)
+        queue.put(b"m1", key=1)
+
+        queue.put(b"m2", key=2)
+        queue.put(b"m3", key=3)  # After the eviction: dropped.
+
+        assert queue.take() == [None]
+        assert evictions == [1]
+        assert queue.overflowed and queue.dropped == 4
+        assert server.notify_stats["evicted"] == 1 and server.notify_stats["dropped"] == 4
+
+    def test_stop_sentinel_accepted_when_full(self, server) -> None:
+        """Test the stop sentinel is queued even when the queue is full."""
+        queue = server.NotificationQueue(1, "drop_oldest")
+        queue.put(b"m0", key=0)
+
+        queue.put(None)
+
+        assert queue.take() == [b"m0", None]
+
+    def test_unknown_policy_raises(self, server) -> None:
+        """Test an unknown overflow policy is refused."""
+        with pytest.raises(ValueError):
+            server.NotificationQueue(1, "block")
+
+
+class TestSessionNotifications:
+    """Test cases for notifications reaching a watching session."""
+
+    def test_coalescing_session_gets_latest_state(self, server, monkeypatch) -> None:
+        """Test score updates arriving between two flushes reach a coalescing session as one message."""
+        monkeypatch.setattr(server, "NOTIFY_FLUSH_INTERVAL", 5.0)
+        writer, gid, _ = make_game(server)
+        ws = FakeWebSocket()
+        watcher = server.Session(ws, coalesce=True)
+        run(watcher, command="WATCH", id=gid)
+        wait_until(lambda: len(ws.sent) == 1)  # The initial state, flushed at once.
+
+        for _ in range(5):
+            run(writer, command="SCORE", id=gid, points=1, side="AWAY")
+
+        pending = watcher.output_queue.take()
+        assert len(pending) == 1
+        assert json.loads(pending[0])["score"] == {"home": 0, "away": 5}
+        assert watcher.output_queue.coalesced == 4
+        watcher.output_queue.put(None)
+
+    def test_overflow_evicts_slow_session(self, server, monkeypatch) -> None:
+        """Test a session whose queue overflows under 'disconnect' is closed."""
+        monkeypatch.setattr(server, "NOTIFY_QUEUE_LIMIT", 2)
+        monkeypatch.setattr(server, "NOTIFY_OVERFLOW_POLICY", "disconnect")
+        ws = FakeWebSocket()
+        session = server.Session(ws)
+        session.running = False
+        session.output_queue.put(None)  # Stop the agent, so nothing is consumed.
+        session.agent_thread.join(5)
+        session.output_queue.take()
+
+        for n in range(3):
+            session.observer.message_queue.put(f"m{n}".encode(), key=n)
+
+        wait_until(lambda: ws.closed is not None)
+        assert ws.closed[0] == 1008
+
+
+class TestServerStats:
+    """Test cases for the notification counters of SERVER_STATS."""
+
+    def test_counters_reported(self, server) -> None:
+        """Test drops, coalesced updates and evictions across sessions add up in SERVER_STATS."""
+        session = server.Session(FakeWebSocket())
+        session.running = False
+        assert run(session, command="SERVER_STATS")["notifications"] == {"dropped": 0, "coalesced": 0, "evicted": 0}
+
+        dropping = server.NotificationQueue(1, "drop_oldest")
+        for n in range(3):
+            dropping.put(b"m", key=n)
+        coalescing = server.NotificationQueue(5, "drop_oldest", coalesce=True)
+        for _ in range(4):
+            coalescing.put(b"m", key=1)
+        evicting = server.NotificationQueue(1, "disconnect")
+        evicting.put(b"m", key=1)
+        evicting.put(b"m", key=2)
+
+        stats = run(session, command="SERVER_STATS")["notifications"]
+        assert stats == {"dropped": 2 + 2, "coalesced": 3, "evicted": 1}
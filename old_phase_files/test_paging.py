@@ -0,0 +1,166 @@
+# test_paging.py
+"""Unit tests for paged listings: limit / cursor, totals and field projections."""
+
+import importlib
+
+import pytest
+
+import server as server_module
+
+
+class FakeWebSocket:
+    """Stands in for a client connection; keeps what the server sends."""
+
+    remote_address = ("test", 0)
+
+    def __init__(self) -> None:
+        self.sent = []
+
+    def send(self, message, text=None) -> None:
+        self.sent.append(message)
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    """Fresh server module whose state files live in a temporary directory."""
+    monkeypatch.chdir(tmp_path)
+    module = importlib.reload(server_module)
+    module.load_state()
+    return module
+
+
+@pytest.fixture
+def session(server):
+    """A session that is not connected to a running notification thread."""
+    session = server.Session(FakeWebSocket())
+    session.running = False
+    return session
+
+
+def run(session, **req):
+    """Runs one command and asserts it succeeded."""
+    response = session.process_command(req)
+    assert response["status"] == "OK", response
+    return response
+
+
+def make_teams(session, count):
+    """Creates `count` teams and returns their IDs."""
+    return [run(session, command="CREATE_TEAM", name=f"T{n}")["id"] for n in range(count)]
+
+
+def walk(session, cmd, key, limit, **req):
+    """Follows next_cursor from the first page to the last; returns the listed IDs."""
+    seen, cursor = [], None
+    while True:
+        response = run(session, command=cmd, limit=limit, cursor=cursor, **req)
+        seen += [item["id"] for item in response[key]]
+        cursor = response["next_cursor"]
+        if cursor is None:
+            return seen
+
+
+class TestPageParams:
+    """Test cases for page_params and field_params."""
+
+    def test_defaults_and_parsing(self, server) -> None:
+        """Test missing parameters mean no paging and no projection, and numbers may come as strings."""
+        assert server.page_params({}) == (None, None)
+        assert server.page_params({"limit": "5", "cursor": "12"}) == (5, 12)
+        assert server.field_params({}) is None
+        assert server.field_params({"fields": "name, score"}) == {"name", "score"}
+        assert server.field_params({"fields": ["state"]}, server.GAME_FIELDS) == {"state"}
+
+    @pytest.mark.parametrize("req", [{"limit": 0}, {"limit": "ten"}, {"limit": [1]}, {"cursor": "abc"}, {"cursor": {}}])
+    def test_invalid_paging_raises(self, server, req) -> None:
+        """Test a limit that is not a positive integer or a cursor that is not an ID raises ValueError."""
+        with pytest.raises(ValueError):
+            server.page_params(req)
+
+    @pytest.mark.parametrize("fields", [5, {"name": 1}, ["name", 3], "nickname"])
+    def test_invalid_fields_raise(self, server, fields) -> None:
+        """Test fields that are malformed or unknown for the listing raise ValueError."""
+        with pytest.raises(ValueError):
+            server.field_params({"fields": fields}, server.CUP_FIELDS)
+
+    def test_project_keeps_id(self, server) -> None:
+        """Test a projection keeps the requested fields and the ID."""
+        item = {"id": 1, "name": "A", "desc": "Team A"}
+
+        assert server.project(item, {"name"}) == {"id": 1, "name": "A"}
+        assert server.project(item, None) is item
+
+
+class TestPagedListings:
+    """Test cases for limit / cursor paging of the listing commands."""
+
+    @pytest.mark.parametrize("cmd, key", [("GET_TEAMS", "teams"), ("LIST", "items")])
+    def test_pages_cover_everything_once(self, session, cmd, key) -> None:
+        """Test following the cursor lists every object once, in ID order."""
+        make_teams(session, 7)
+        everything = run(session, command=cmd)[key]
+
+        assert walk(session, cmd, key, 3) == [item["id"] for item in everything]
+
+    def test_total_counts_all_pages(self, session) -> None:
+        """Test total is the size of the whole listing, not of the page."""
+        ids = make_teams(session, 5)
+
+        page = run(session, command="GET_TEAMS", limit=2)
+        assert (len(page["teams"]), page["total"], page["next_cursor"]) == (2, 5, ids[1])
+
+        run(session, command="DELETE", id=ids[0])
+        assert run(session, command="GET_TEAMS", limit=2)["total"] == 4
+        assert run(session, command="LIST", limit=1)["total"] == 4
+
+    def test_cursor_stable_across_deletes(self, session) -> None:
+        """Test deleting the cursor's item and others between pages neither skips nor repeats items."""
+        ids = make_teams(session, 8)
+        first = run(session, command="GET_TEAMS", limit=3)
+        cursor = first["next_cursor"]
+        assert cursor == ids[2]
+
+        for oid in (ids[1], ids[2], ids[5]):  # Before, at and after the cursor.
+            run(session, command="DELETE", id=oid)
+        second = run(session, command="GET_TEAMS", limit=2, cursor=cursor)
+        third = run(session, command="GET_TEAMS", limit=2, cursor=second["next_cursor"])
+
+        listed = [t["id"] for t in first["teams"] + second["teams"] + third["teams"]]
+        assert listed == [ids[0], ids[1], ids[2], ids[3], ids[4], ids[6], ids[7]]
+        assert third["next_cursor"] is None
+
+    def test_fields_projection(self, session) -> None:
+        """Test fields limits each listed item to the named fields and its ID."""
+        make_teams(session, 2)
+
+        teams = run(session, command="GET_TEAMS", fields="name")["teams"]
+        items = run(session, command="LIST", fields=["desc"])["items"]
+
+        assert all(set(team) == {"id", "name"} for team in teams)
+        assert all(set(item) == {"id", "desc"} for item in items)
+
+    def test_team_listing_accepts_custom_fields(self, session) -> None:
+        """Test a team listing may project custom attributes, which have no fixed names."""
+        tid = make_teams(session, 1)[0]
+        run(session, command="UPDATE_TEAM", id=tid, coach="Ann")
+
+        assert run(session, command="GET_TEAMS", fields="coach")["teams"] == [{"id": tid, "coach": "Ann"}]
+
+    @pytest.mark.parametrize("cmd", ["GET_TEAMS", "GET_CUPS", "GET_GAMES", "LIST", "SEARCH_GAMES"])
+    @pytest.mark.parametrize("params", [{"cursor": "abc"}, {"limit": -1}, {"fields": 7}])
+    def test_invalid_parameters_answer_error(self, session, cmd, params) -> None:
+        """Test a malformed cursor, limit or fields gets an ERROR response instead of an exception."""
+        make_teams(session, 2)
+
+        response = session.process_command({"command": cmd, **params})
+
+        assert response["status"] == "ERROR"
+        assert next(iter(params)) in response["message"]
+
+    @pytest.mark.parametrize("cmd", ["GET_CUPS", "GET_GAMES", "LIST", "SEARCH_GAMES"])
+    def test_unknown_field_answers_error(self, session, cmd) -> None:
+        """Test naming a field the listing does not have gets an ERROR response listing the valid ones."""
+        response = session.process_command({"command": cmd, "fields": "nickname"})
+
+        assert response["status"] == "ERROR"
+        assert "nickname" in response["message"] and "Valid" in response["message"]
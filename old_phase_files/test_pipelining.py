@@ -0,0 +1,162 @@
+# test_pipelining.py
+"""Unit tests for pipelined requests: requestId correlation and response order."""
+
+import importlib
+import json
+import threading
+import time
+
+import pytest
+
+import server as server_module
+
+
+class FakeWebSocket:
+    """Stands in for a client connection: yields the given requests, keeps what the server sends."""
+
+    remote_address = ("test", 0)
+
+    def __init__(self, requests=()) -> None:
+        self.requests = [json.dumps(req) for req in requests]
+        self.sent = []
+        self.lock = threading.Lock()
+
+    def __iter__(self):
+        return iter(self.requests)
+
+    def send(self, message, text=None) -> None:
+        with self.lock:
+            self.sent.append(message)
+
+    def responses(self):
+        """Returns the decoded responses, without the welcome message and notifications."""
+        with self.lock:
+            decoded = [json.loads(message) for message in self.sent]
+        return [msg for msg in decoded if msg.get("type") not in ("INFO", "GAME_UPDATE")]
+
+
+def wait_until(predicate, timeout: float = 5.0) -> None:
+    """Polls until the predicate holds, failing the test after the timeout."""
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "Timed out waiting for the condition"
+        time.sleep(0.001)
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    """Fresh server module whose state files live in a temporary directory."""
+    monkeypatch.chdir(tmp_path)
+    module = importlib.reload(server_module)
+    module.load_state()
+    return module
+
+
+def serve(server, requests):
+    """Runs a connection that sends the requests in order; returns the responses once all arrived."""
+    ws = FakeWebSocket(requests)
+    server.agent(ws)
+    wait_until(lambda: len(ws.responses()) == len(requests))
+    return ws.responses()
+
+
+def slow_down(server, monkeypatch, request_id, delay=0.3):
+    """Makes the request carrying the given requestId take `delay` seconds longer."""
+    process_command = server.Session.process_command
+
+    def delayed(self, req):
+        if req.get("requestId") == request_id:
+            time.sleep(delay)
+        return process_command(self, req)
+
+    monkeypatch.setattr(server.Session, "process_command", delayed)
+
+
+class TestRequestIdCorrelation:
+    """Test cases for tagging responses with their request's requestId."""
+
+    def test_every_response_echoes_its_request_id(self, server) -> None:
+        """Test responses to many reads in flight each carry the requestId of their own request."""
+        creates = [{"command": "CREATE_TEAM", "name": f"T{n}", "requestId": f"c{n}"} for n in range(5)]
+        reads = [{"command": "GET_TEAMS", "limit": n, "requestId": n} for n in range(1, 21)]
+
+        responses = serve(server, creates + reads)
+
+        by_id = {r["requestId"]: r for r in responses}
+        assert len(by_id) == len(creates) + len(reads)
+        for n in range(1, 21):
+            assert len(by_id[n]["teams"]) == min(n, 5)
+        assert all(by_id[f"c{n}"]["id"] for n in range(5))
+
+    def test_slow_read_answers_after_later_ones(self, server, monkeypatch) -> None:
+        """Test a slow pipelined read does not hold up the reads sent after it, and keeps its tag."""
+        slow_down(server, monkeypatch, "slow")
+        requests = [
+            {"command": "CREATE_TEAM", "name": "A", "requestId": "w"},
+            {"command": "GET_TEAMS", "requestId": "slow"},
+            {"command": "LIST", "requestId": "fast1"},
+            {"command": "GET_CUPS", "requestId": "fast2"},
+        ]
+
+        responses = serve(server, requests)
+
+        order = [r["requestId"] for r in responses]
+        assert order[0] == "w" and order[-1] == "slow"
+        assert set(order[1:3]) == {"fast1", "fast2"}
+        assert responses[-1]["teams"][0]["name"] == "A"
+
+    def test_cached_response_is_tagged(self, server) -> None:
+        """Test a pipelined cached (pre-serialized) response still carries its requestId."""
+        requests = [{"command": "CREATE_TEAM", "name": f"T{n}"} for n in range(4)]
+        requests.append({"command": "CREATE_CUP", "cup_type": "LEAGUE", "team_ids": [1, 2, 3, 4]})
+        requests += [{"command": "GET_STANDINGS", "id": 5, "requestId": n} for n in range(3)]
+
+        responses = serve(server, requests)
+
+        standings = [r for r in responses if "standings" in r]
+        assert sorted(r["requestId"] for r in standings) == [0, 1, 2]
+        assert all(r["status"] == "OK" for r in standings)
+
+    def test_untagged_request_gets_untagged_response(self, server) -> None:
+        """Test a request without requestId gets a response without one."""
+        responses = serve(server, [{"command": "GET_TEAMS"}])
+
+        assert "requestId" not in responses[0]
+
+
+class TestWriteOrder:
+    """Test cases for writes keeping their order among pipelined reads."""
+
+    def test_writes_answer_in_order_and_reads_see_earlier_writes(self, server, monkeypatch) -> None:
+        """Test writes are answered in arrival order and each read sees the writes sent before it."""
+        slow_down(server, monkeypatch, "r0")
+        requests = []
+        for n in range(6):
+            requests.append({"command": "CREATE_TEAM", "name": f"T{n}", "requestId": f"w{n}"})
+            requests.append({"command": "GET_TEAMS", "requestId": f"r{n}"})
+
+        responses = serve(server, requests)
+
+        writes = [r["requestId"] for r in responses if r["requestId"].startswith("w")]
+        assert writes == [f"w{n}" for n in range(6)]
+        by_id = {r["requestId"]: r for r in responses}
+        assert [by_id[f"w{n}"]["id"] for n in range(6)] == list(range(1, 7))
+        for n in range(6):
+            assert by_id[f"r{n}"]["total"] >= n + 1
+
+    def test_update_game_ignores_request_id(self, server) -> None:
+        """Test UPDATE_GAME, like UPDATE_TEAM, does not take requestId for a field to update."""
+        requests = [
+            {"command": "CREATE_TEAM", "name": "Home"},
+            {"command": "CREATE_TEAM", "name": "Away"},
+            {"command": "CREATE_GAME", "home_id": 1, "away_id": 2},
+            {"command": "UPDATE_GAME", "id": 3, "group": "A", "requestId": "u"},
+            {"command": "UPDATE_TEAM", "id": 1, "coach": "Ann", "requestId": "t"},
+        ]
+
+        responses = serve(server, requests)
+
+        assert [r["status"] for r in responses] == ["OK"] * 5
+        game = server.repository.get(3)
+        assert game.group == "A" and not hasattr(game, "requestId")
+        assert "requestId" not in server.repository.get(1)._generic_attrs
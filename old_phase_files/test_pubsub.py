@@ -0,0 +1,255 @@
+# test_pubsub.py
+"""Unit tests for SubscriptionRegistry and the topics Game, Cup and Team subscribe through."""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from sports_lib import Game, Repo
+from sports_lib.cup import WatchFilter
+from sports_lib.pubsub import SubscriptionRegistry, topic
+
+
+class Recorder:
+    """Observer that records the IDs of the games it is updated about."""
+
+    def __init__(self) -> None:
+        self.seen = []
+
+    def update(self, game) -> None:
+        self.seen.append(game.id())
+
+
+@pytest.fixture(autouse=True)
+def synchronous_dispatch(monkeypatch):
+    """Dispatch notifications in the notifying thread, as without a server."""
+    monkeypatch.setattr(Game, "event_bus", None)
+
+
+@pytest.fixture
+def repo() -> Repo:
+    """Create a repo with four teams, a game between the first two and a league cup of all."""
+    repo = Repo()
+    teams = [repo.get(repo.create(type="team", name=name)) for name in ("A", "B", "C", "D")]
+    repo.create(type="game", home=teams[0], away=teams[1], datetime=datetime(2024, 1, 1))
+    repo.create(type="cup", teams=teams, cup_type="LEAGUE", interval=timedelta(days=1))
+    return repo
+
+
+def cup_of(repo):
+    """Returns the repo's only cup."""
+    return next(cup for _, cup in repo.cups())
+
+
+class TestSubscriptionRegistry:
+    """Test cases for SubscriptionRegistry class."""
+
+    def test_subscribe_and_unsubscribe(self) -> None:
+        """Test subscribers are kept per topic, in order, and each subscription counts once."""
+        registry = SubscriptionRegistry()
+        first, second = object(), object()
+
+        assert registry.subscribe("game:1", first) is True
+        assert registry.subscribe("game:1", second) is True
+        assert registry.subscribe("game:1", first) is False
+        registry.subscribe("team:2", first)
+
+        assert registry.subscribers("game:1") == (first, second)
+        assert registry.topics_of(first) == {"game:1", "team:2"}
+        assert registry.unsubscribe("game:1", first) is True
+        assert registry.unsubscribe("game:1", first) is False
+        assert registry.subscribers("game:1") == (second,)
+        assert registry.topics_of(first) == {"team:2"}
+
+    def test_params_are_stored_as_given(self) -> None:
+        """Test a subscription keeps any parameters, and subscribing again replaces them."""
+        registry = SubscriptionRegistry()
+        sub = object()
+        filters = ("f1", "f2")
+
+        registry.subscribe("cup:1", sub, filters)
+        assert registry.params("cup:1", sub) is filters
+        registry.subscribe("cup:1", sub, filters + ("f3",))
+
+        assert registry.subscriptions("cup:1") == [(sub, ("f1", "f2", "f3"))]
+        assert registry.params("cup:2", sub) is None
+
+    def test_unsubscribe_all_and_drop_topic(self) -> None:
+        """Test removing a subscriber everywhere and removing a topic with its subscribers."""
+        registry = SubscriptionRegistry()
+        first, second = object(), object()
+        for name in ("game:1", "game:2", "cup:3"):
+            registry.subscribe(name, first)
+        registry.subscribe("game:1", second)
+
+        assert sorted(registry.unsubscribe_all(first)) == ["cup:3", "game:1", "game:2"]
+        registry.drop_topic("game:1")
+
+        assert registry.subscribers("game:1") == ()
+        assert registry.topics_of(first) == set() and registry.topics_of(second) == set()
+
+    def test_snapshot_refreshed_after_change(self) -> None:
+        """Test the cached subscriber tuple follows subscriptions and unsubscriptions."""
+        registry = SubscriptionRegistry()
+        first, second = object(), object()
+        registry.subscribe("game:1", first)
+        before = registry.subscribers("game:1")
+        assert registry.subscribers("game:1") is before
+
+        registry.subscribe("game:1", second)
+        assert registry.subscribers("game:1") == (first, second)
+        registry.unsubscribe("game:1", first)
+        assert registry.subscribers("game:1") == (second,)
+        assert before == (first,)
+
+
+class TestTopicRouting:
+    """Test cases for routing game updates through the game:, team: and cup: topics."""
+
+    def test_topic_names(self, repo: Repo) -> None:
+        """Test each object subscribes under its kind and ID."""
+        assert topic("game", 7) == "game:7"
+        assert repo.get(1).topic() == "team:1"
+        assert repo.get(5).topic() == "game:5"
+        assert cup_of(repo).topic() == f"cup:{cup_of(repo).getid()}"
+
+    def test_game_topic(self, repo: Repo) -> None:
+        """Test a game watcher hears about that game only."""
+        game = repo.get(5)
+        other = cup_of(repo).games[0]
+        recorder = Recorder()
+        game.watch(recorder)
+
+        game.start()
+        other.start()
+
+        assert recorder.seen == [5]
+        assert repo.subscriptions.is_subscribed("game:5", recorder)
+
+    def test_team_topic(self, repo: Repo) -> None:
+        """Test a team watcher hears about every game of the team, once per update."""
+        recorder = Recorder()
+        repo.get(1).watch(recorder)
+        repo.get(5).watch(recorder)  # Watching a game of the team too: still one update.
+        team_games = [g for _, g in repo.games() if 1 in (g.home().id_, g.away().id_)]
+        others = [g for _, g in repo.games() if g not in team_games]
+
+        for game in team_games + others:
+            game.start()
+
+        assert recorder.seen == [g.id() for g in team_games]
+
+    def test_cup_topic_routes_matching_games(self, repo: Repo) -> None:
+        """Test a cup watcher with a team filter is attached to that team's cup games only."""
+        cup = cup_of(repo)
+        recorder = Recorder()
+        cup.watch(recorder, tname="c")
+
+        for game in cup.games:
+            game.start()
+        repo.get(5).start()  # Not a cup game.
+
+        expected = [g.id() for g in cup.games if "C" in (g.home().team_name, g.away().team_name)]
+        assert recorder.seen == expected
+        assert repo.subscriptions.is_subscribed(cup.topic(), recorder)
+        assert repo.subscriptions.is_subscribed(f"{cup.topic()}/team:c", recorder)
+
+    def test_unwatch(self, repo: Repo) -> None:
+        """Test unwatching removes the observer from its topic and the games it was attached to."""
+        cup = cup_of(repo)
+        recorder = Recorder()
+        cup.watch(recorder)
+        repo.get(2).watch(recorder)
+        game = repo.get(5)
+        game.watch(recorder)
+
+        cup.unwatch(recorder)
+        repo.get(2).unwatch(recorder)
+        game.unwatch(recorder)
+        for _, each in repo.games():
+            each.start()
+
+        assert recorder.seen == []
+        assert repo.subscriptions.topics_of(recorder) == set()
+        for unwatch in (cup.unwatch, game.unwatch, repo.get(2).unwatch):
+            with pytest.raises(ValueError):
+                unwatch(recorder)
+
+    def test_one_filter_per_parameter_set(self, repo: Repo) -> None:
+        """Test a parameter set is accepted once per observer and different sets add up."""
+        cup = cup_of(repo)
+        recorder = Recorder()
+
+        cup.watch(recorder, tname="A")
+        with pytest.raises(ValueError):
+            cup.watch(recorder, tname="A")
+        cup.watch(recorder, tname="B")
+
+        filters = repo.subscriptions.params(cup.topic(), recorder)
+        assert [f.params for f in filters] == [{"tname": "A"}, {"tname": "B"}]
+        with pytest.raises(ValueError):
+            cup.watch(recorder, player="A")
+
+    def test_deleted_object_drops_its_topic(self, repo: Repo) -> None:
+        """Test deleting a game or a cup drops its subscriptions."""
+        cup = cup_of(repo)
+        recorder = Recorder()
+        repo.get(5).watch(recorder)
+        cup.watch(recorder, group=None)
+
+        repo.delete(5)
+        repo.delete(cup.getid())
+
+        assert repo.subscriptions.topics_of(recorder) == set()
+
+
+class TestWatchFilter:
+    """Test cases for WatchFilter class and the filters of Cup.watch."""
+
+    @pytest.fixture
+    def cup(self):
+        """Create a repo with eight teams and a group cup of them (two groups, four in the playoffs)."""
+        repo = Repo()
+        teams = [repo.get(repo.create(type="team", name=f"T{n}")) for n in range(8)]
+        cid = repo.create(
+            type="cup", teams=teams, cup_type="GROUP", interval=timedelta(days=1), num_groups=2, playoff_teams=4
+        )
+        return repo.get(cid)
+
+    def test_conditions(self, cup) -> None:
+        """Test team names match case-insensitively and every condition must hold."""
+        game = cup.games[0]
+        name, other = game.home().team_name, game.away().team_name
+        when = (game.datetime - timedelta(hours=1), game.datetime + timedelta(hours=1))
+
+        assert WatchFilter(tname=name.lower()).matches(game)
+        assert WatchFilter(tname=other.upper(), group=game.group, between=when).matches(game)
+        assert not WatchFilter(tname=name, group="no such group").matches(game)
+        assert not WatchFilter(between=(when[1], when[1])).matches(game)
+
+    @pytest.mark.parametrize("params", [{"tname": ""}, {"group": ""}, {"between": ()}, {"tname": "", "group": ""}])
+    def test_empty_values_set_no_condition(self, cup, params) -> None:
+        """Test an empty tname, group or between filters nothing, like a missing one."""
+        watch_filter = WatchFilter(**params)
+
+        assert watch_filter.params == {}
+        assert watch_filter.bucket() == "all"
+        assert all(watch_filter.matches(game) for game in cup.games)
+
+    def test_empty_tname_watches_every_game(self, cup) -> None:
+        """Test watching with tname="" covers existing games and the playoff games created later."""
+        recorder = Recorder()
+        cup.watch(recorder, tname="")
+        with pytest.raises(ValueError):
+            cup.watch(recorder)  # The same (empty) parameter set.
+
+        group_games = list(cup.games)
+        for game in group_games:
+            game.start()
+            game.score(1, game.home())
+            game.end()
+
+        assert cup.playoff_games
+        assert recorder.seen == [g.id() for g in group_games for _ in range(3)]
+        for game in cup.playoff_games:
+            assert cup.subscriptions.is_subscribed(game.topic(), recorder)
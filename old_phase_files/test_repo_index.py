@@ -0,0 +1,200 @@
+# test_repo_index.py
+"""Unit tests for the Repo identity and per-type indexes and for paging."""
+
+import pickle
+from datetime import datetime, timedelta
+
+import pytest
+
+from sports_lib import Cup, Game, Repo, Team
+from sports_lib.repo import paginate
+
+
+def check_indexes(repo: Repo) -> None:
+    """Asserts every derived index matches one recomputed from `_objects`."""
+    objects = {oid: data["instance"] for oid, data in repo._objects.items()}
+    assert repo._sorted_ids == sorted(objects)
+    for key, cls in (("team", Team), ("game", Game), ("cup", Cup)):
+        expected = {oid: obj for oid, obj in objects.items() if isinstance(obj, cls)}
+        assert repo._by_type[key] == expected
+        assert repo._sorted_ids_by_type[key] == sorted(expected)
+        assert repo.count(key) == len(expected)
+    assert len(repo._ids_by_identity) == len(objects)
+    for oid, obj in objects.items():
+        assert repo.id_of(obj) == oid
+
+
+@pytest.fixture
+def repo() -> Repo:
+    """Create a repo with three teams, a game and a league cup of the teams."""
+    repo = Repo()
+    teams = [repo.get(repo.create(type="team", name=name)) for name in ("A", "B", "C")]
+    repo.create(type="game", home=teams[0], away=teams[1], datetime=datetime.now())
+    repo.create(type="cup", teams=teams, cup_type="LEAGUE", interval=timedelta(days=1))
+    return repo
+
+
+class TestIdentityIndex:
+    """Test cases for Repo.id_of."""
+
+    def test_lookup_is_by_identity(self, repo: Repo) -> None:
+        """Test an object is found by identity and an equal-looking stranger is not."""
+        team = repo.get(1)
+
+        assert repo.id_of(team) == 1
+        assert repo.id_of(Team("A")) is None
+        assert repo.id_of(None) is None
+
+    def test_cup_games_are_indexed(self, repo: Repo) -> None:
+        """Test the games a cup creates through the repo are found by identity."""
+        cup = next(cup for _, cup in repo.cups())
+
+        assert [repo.id_of(game) for game in cup.games] == [game.id() for game in cup.games]
+        check_indexes(repo)
+
+    def test_delete_removes_identity(self, repo: Repo) -> None:
+        """Test a deleted object is no longer found."""
+        game = repo.get(4)
+
+        repo.delete(4)
+
+        assert repo.id_of(game) is None
+        check_indexes(repo)
+
+    def test_recreate_after_delete(self, repo: Repo) -> None:
+        """Test a new object created after a delete gets a new ID and is indexed under it."""
+        old = repo.get(2)
+        repo.delete(2)
+
+        new_id = repo.create(type="team", name="B")
+
+        assert new_id == repo._last_id and new_id != 2
+        assert repo.id_of(old) is None
+        assert repo.id_of(repo.get(new_id)) == new_id
+        assert repo.page("team")[0] == [1, 3, new_id]
+        check_indexes(repo)
+
+
+class TestTypeIndex:
+    """Test cases for the per-type buckets and their sorted ID lists."""
+
+    def test_iterators_cover_their_type_only(self, repo: Repo) -> None:
+        """Test teams(), games() and cups() list exactly their objects, in ID order."""
+        assert [oid for oid, _ in repo.teams()] == [1, 2, 3]
+        assert [oid for oid, _ in repo.games()] == repo._sorted_ids_by_type["game"]
+        assert [oid for oid, _ in repo.cups()] == [5]
+        assert all(isinstance(game, Game) for _, game in repo.games())
+
+    def test_iteration_survives_changes(self, repo: Repo) -> None:
+        """Test deleting while iterating a type does not break the iteration."""
+        for oid, _ in repo.teams():
+            if oid == 1:
+                repo.create(type="team", name="D")
+            repo.delete(repo.create(type="team", name="Temp"))
+
+        check_indexes(repo)
+
+    def test_count_rejects_unknown_type(self, repo: Repo) -> None:
+        """Test counting or paging an unknown type raises ValueError."""
+        with pytest.raises(ValueError):
+            repo.count("player")
+        with pytest.raises(ValueError):
+            repo.page("player")
+
+    def test_mixed_creates_and_deletes(self) -> None:
+        """Test the indexes stay consistent through interleaved creates and deletes."""
+        repo = Repo()
+        for n in range(30):
+            tid = repo.create(type="team", name=f"T{n}")
+            if n % 3 == 0:
+                repo.delete(tid)
+            if n % 4 == 0 and n:
+                teams = [team for _, team in repo.teams()][-2:]
+                gid = repo.create(type="game", home=teams[0], away=teams[1], datetime=datetime.now())
+                if n % 8 == 0:
+                    repo.delete(gid)
+            check_indexes(repo)
+
+
+class TestPaging:
+    """Test cases for paginate and Repo.page."""
+
+    def test_pages_follow_the_cursor(self) -> None:
+        """Test pages of a list are consecutive and the last one has no cursor."""
+        ids = list(range(1, 11))
+
+        first, cursor = paginate(ids, 4, None)
+        second, cursor2 = paginate(ids, 4, cursor)
+        last, cursor3 = paginate(ids, 4, cursor2)
+
+        assert (first, second, last) == ([1, 2, 3, 4], [5, 6, 7, 8], [9, 10])
+        assert cursor == 4 and cursor2 == 8 and cursor3 is None
+
+    def test_exact_multiple_has_no_cursor_after_last_page(self) -> None:
+        """Test a list that fills its last page exactly ends without a cursor."""
+        assert paginate([1, 2, 3, 4], 2, 2) == ([3, 4], None)
+
+    def test_no_limit_and_empty(self) -> None:
+        """Test a missing limit returns the rest and an empty list an empty page."""
+        assert paginate([1, 5, 9], None, 1) == ([5, 9], None)
+        assert paginate([], 3, None) == ([], None)
+        assert paginate([1, 2], 3, 99) == ([], None)
+
+    def test_cursor_survives_deleted_items(self, repo: Repo) -> None:
+        """Test deleting the cursor's object or a later one does not skip or repeat IDs."""
+        ids = [repo.create(type="team", name=f"P{n}") for n in range(6)]
+        teams = repo._sorted_ids_by_type["team"]
+        page, cursor = repo.page("team", limit=4)
+        assert cursor == teams[3]
+
+        repo.delete(cursor)
+        repo.delete(ids[-1])
+        rest, end = repo.page("team", limit=100, after=cursor)
+
+        assert rest == [oid for oid in teams if oid > cursor]
+        assert end is None
+        assert ids[-1] not in rest
+
+    def test_page_of_all_objects(self, repo: Repo) -> None:
+        """Test paging without a type walks every ID once."""
+        seen, cursor = [], None
+        while True:
+            page, cursor = repo.page(limit=3, after=cursor)
+            seen += page
+            if cursor is None:
+                break
+
+        assert seen == sorted(repo._objects)
+
+
+class TestReload:
+    """Test cases for rebuilding the indexes in Repo.__setstate__."""
+
+    def test_indexes_rebuilt_after_pickle(self, repo: Repo) -> None:
+        """Test a restored repo finds its own (new) instances and pages the same IDs."""
+        repo.delete(2)
+        restored = pickle.loads(pickle.dumps(repo))
+
+        check_indexes(restored)
+        assert restored.page("team") == repo.page("team")
+        assert restored.id_of(repo.get(1)) is None  # The original instance is not managed there.
+        restored.create(type="team", name="After")
+        check_indexes(restored)
+
+    def test_old_format_pickle(self, repo: Repo, monkeypatch) -> None:
+        """Test a repo pickled with only its objects, attachments and last ID gets every index."""
+        # The state a Repo pickled before the derived indexes and the change log existed.
+        monkeypatch.setattr(
+            Repo, "__getstate__",
+            lambda self: {"_objects": self._objects, "_attachments": self._attachments, "_last_id": self._last_id},
+        )
+        data = pickle.dumps(repo)
+        monkeypatch.undo()
+
+        restored = pickle.loads(data)
+
+        check_indexes(restored)
+        assert restored.changes.seq == 0
+        new_id = restored.create(type="team", name="New")
+        assert new_id == repo._last_id + 1
+        check_indexes(restored)
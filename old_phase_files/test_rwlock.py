@@ -0,0 +1,216 @@
+# test_rwlock.py
+"""Unit tests for RWLock class."""
+
+import threading
+import time
+
+import pytest
+
+from sports_lib.rwlock import RWLock
+
+
+def wait_until(predicate, timeout: float = 5.0) -> None:
+    """Polls until the predicate holds, failing the test after the timeout."""
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "Timed out waiting for the lock state"
+        time.sleep(0.001)
+
+
+def start(target) -> threading.Thread:
+    """Runs the target on a daemon thread."""
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    return thread
+
+
+class TestRWLock:
+    """Test cases for RWLock class."""
+
+    @pytest.fixture
+    def lock(self) -> RWLock:
+        """Create an unlocked lock."""
+        return RWLock()
+
+    def test_writers_exclude_each_other(self, lock: RWLock) -> None:
+        """Test at most one writer holds the lock at any time."""
+        inside = []
+        overlaps = []
+
+        def write():
+            for _ in range(50):
+                with lock:
+                    inside.append(1)
+                    overlaps.append(len(inside))
+                    time.sleep(0.0001)
+                    inside.pop()
+
+        threads = [start(write) for _ in range(4)]
+        for thread in threads:
+            thread.join(10)
+
+        assert len(overlaps) == 200
+        assert max(overlaps) == 1
+
+    def test_writer_excludes_readers(self, lock: RWLock) -> None:
+        """Test a reader waits while a writer holds the lock."""
+        entered = threading.Event()
+
+        def read():
+            with lock.read():
+                entered.set()
+
+        with lock:
+            reader = start(read)
+            wait_until(lambda: lock.stats()["waiting_readers"] == 1)
+            assert not entered.is_set()
+        reader.join(5)
+
+        assert entered.is_set()
+
+    def test_readers_share_the_lock(self, lock: RWLock) -> None:
+        """Test several readers hold the lock at the same time."""
+        barrier = threading.Barrier(3, timeout=5)
+
+        def read():
+            with lock.read():
+                barrier.wait()
+
+        threads = [start(read) for _ in range(3)]
+        for thread in threads:
+            thread.join(5)
+
+        assert not barrier.broken
+
+    def test_write_is_reentrant(self, lock: RWLock) -> None:
+        """Test the writer can take the lock again, and keeps it until the outermost release."""
+        with lock:
+            with lock:
+                pass
+            assert lock.stats()["writer"]
+        assert not lock.stats()["writer"]
+
+    def test_read_is_reentrant(self, lock: RWLock) -> None:
+        """Test a reader can take the lock again, and keeps it until the outermost release."""
+        with lock.read():
+            with lock.read():
+                pass
+            assert lock.stats()["readers"] == 1
+        assert lock.stats()["readers"] == 0
+
+    def test_read_inside_write(self, lock: RWLock) -> None:
+        """Test the writer can take the lock for reading without giving up the write."""
+        with lock:
+            with lock.read():
+                assert lock.stats()["writer"]
+                with lock:
+                    pass
+            assert lock.stats()["writer"]
+            assert lock.stats()["readers"] == 0
+        assert not lock.stats()["writer"]
+
+    def test_upgrade_raises(self, lock: RWLock) -> None:
+        """Test a reader cannot take the lock for writing."""
+        with lock.read():
+            with pytest.raises(RuntimeError):
+                lock.acquire_write()
+            assert lock.stats()["readers"] == 1
+        with lock:
+            pass
+
+    def test_release_by_other_thread_raises(self, lock: RWLock) -> None:
+        """Test only the writing thread can release the write lock."""
+        errors = []
+
+        def release():
+            try:
+                lock.release_write()
+            except RuntimeError as e:
+                errors.append(e)
+
+        with lock:
+            start(release).join(5)
+
+        assert len(errors) == 1
+
+    def test_writers_served_in_arrival_order(self, lock: RWLock) -> None:
+        """Test waiting writers take the lock in the order they asked for it."""
+        order = []
+
+        def write(n):
+            with lock:
+                order.append(n)
+
+        threads = []
+        with lock:
+            for n in range(5):
+                threads.append(start(lambda n=n: write(n)))
+                wait_until(lambda: lock.stats()["waiting_writers"] == n + 1)
+        for thread in threads:
+            thread.join(5)
+
+        assert order == list(range(5))
+
+    def test_readers_do_not_starve_writers(self, lock: RWLock) -> None:
+        """Test readers arriving after a waiting writer queue behind it."""
+        order = []
+
+        def write():
+            with lock:
+                order.append("writer")
+
+        def read():
+            with lock.read():
+                order.append("reader")
+
+        with lock.read():
+            writer = start(write)
+            wait_until(lambda: lock.stats()["waiting_writers"] == 1)
+            reader = start(read)
+            wait_until(lambda: lock.stats()["waiting_readers"] == 1)
+            assert order == []
+        writer.join(5)
+        reader.join(5)
+
+        assert order == ["writer", "reader"]
+
+    def test_writers_do_not_starve_readers(self, lock: RWLock) -> None:
+        """Test readers waiting when a writer releases go before the next writer."""
+        order = []
+
+        def write():
+            with lock:
+                order.append("writer")
+
+        def read():
+            with lock.read():
+                order.append("reader")
+
+        with lock:
+            writer = start(write)
+            wait_until(lambda: lock.stats()["waiting_writers"] == 1)
+            readers = [start(read) for _ in range(3)]
+            wait_until(lambda: lock.stats()["waiting_readers"] == 3)
+        writer.join(5)
+        for reader in readers:
+            reader.join(5)
+
+        assert order == ["reader"] * 3 + ["writer"]
+
+    def test_stats_record_contention(self, lock: RWLock) -> None:
+        """Test waits are counted per mode."""
+
+        def read():
+            with lock.read():
+                pass
+
+        with lock:
+            reader = start(read)
+            wait_until(lambda: lock.stats()["waiting_readers"] == 1)
+        reader.join(5)
+
+        stats = lock.stats()
+        assert stats["write"]["acquired"] == 1
+        assert stats["write"]["contended"] == 0
+        assert stats["read"]["contended"] == 1
+        assert stats["read"]["wait_max"] > 0
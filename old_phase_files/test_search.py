@@ -0,0 +1,131 @@
+# test_search.py
+"""Unit tests for SearchIndex class and Repo.search."""
+
+from datetime import datetime
+
+import pytest
+
+from sports_lib import Repo
+from sports_lib.search import SearchIndex
+
+
+def naive_match(texts, query, mode="substring"):
+    """Recomputes a match by scanning every text: the baseline the index must agree with."""
+    query = query.casefold()
+    found = []
+    for oid, values in texts.items():
+        folded = [value.casefold() for value in values]
+        if mode == "prefix":
+            words = [word for value in folded for word in value.replace("-", " ").split()]
+            if all(any(word.startswith(term) for word in words) for term in query.split()):
+                found.append(oid)
+        elif any(query in value for value in folded):
+            found.append(oid)
+    return sorted(found)
+
+
+TEXTS = {
+    1: ["Team Helsinki"],
+    2: ["Team Helsingborg"],
+    3: ["Team Borg"],
+    4: ["Helsinki vs Borg", "Group A", "2024-05-01"],
+    5: ["Cup Tournament: LEAGUE", "Nordic Cup"],
+}
+
+
+@pytest.fixture
+def index() -> SearchIndex:
+    """Create an index of a few teams, a game and a cup."""
+    index = SearchIndex()
+    for oid, texts in TEXTS.items():
+        index.set(oid, texts)
+    return index
+
+
+class TestSearchIndex:
+    """Test cases for SearchIndex class."""
+
+    @pytest.mark.parametrize("query", ["helsin", "ELSINK", "borg", "nki vs b", "sinki", "nordic cup", "2024-05"])
+    def test_substring_via_trigrams(self, index: SearchIndex, query: str) -> None:
+        """Test substring queries find the same objects as a scan of the texts."""
+        assert index.match(query) == naive_match(TEXTS, query)
+
+    def test_substring_candidates_are_verified(self, index: SearchIndex) -> None:
+        """Test words found separately do not match unless they occur together as queried."""
+        assert index.match("team borg") == [3]
+        assert index.match("borg team") == []
+        assert index.match("zzz") == []
+
+    @pytest.mark.parametrize("query", ["hel", "Helsinki", "team hel", "borg", "gro a", "cup", "elsinki"])
+    def test_prefix_via_sorted_words(self, index: SearchIndex, query: str) -> None:
+        """Test prefix queries need every query word to start a word of the object."""
+        assert index.match(query, "prefix") == naive_match(TEXTS, query, "prefix")
+
+    def test_prefix_range_ends_at_first_mismatch(self, index: SearchIndex) -> None:
+        """Test the prefix scan of the sorted words covers exactly the words with the prefix."""
+        assert index._words_with_prefix("hel") == ["helsingborg", "helsinki"]
+        assert index._words_with_prefix("helsinki") == ["helsinki"]
+        assert index._words_with_prefix("zz") == []
+
+    @pytest.mark.parametrize("query", ["b", "bo", "a", "sk", "20", " ", "-", ": "])
+    def test_short_queries(self, index: SearchIndex, query: str) -> None:
+        """Test queries shorter than a trigram, or without any word, still match by scanning."""
+        assert index.match(query) == naive_match(TEXTS, query)
+
+    def test_unknown_mode(self, index: SearchIndex) -> None:
+        """Test an unknown match mode raises ValueError."""
+        with pytest.raises(ValueError):
+            index.match("borg", "regex")
+
+    def test_set_replaces_and_remove_cleans_up(self, index: SearchIndex) -> None:
+        """Test re-indexing an object drops its old words, and removing the last user drops a word."""
+        index.set(3, ["Team Malmo"])
+
+        assert index.match("borg") == [2, 4]
+        assert index.match("malm") == [3]
+
+        for oid in (2, 4):
+            index.remove(oid)
+        index.remove(99)  # Not indexed: ignored.
+
+        assert index.match("borg") == []
+        assert "helsingborg" not in index._words and "borg" not in index._postings
+        assert all("helsingborg" not in words for words in index._grams.values())
+        assert len(index) == 3
+
+
+class TestRepoSearch:
+    """Test cases for keeping the repo's search index current."""
+
+    @pytest.fixture
+    def repo(self) -> Repo:
+        """Create a repo with two teams and a game between them, with its index built."""
+        repo = Repo()
+        home = repo.get(repo.create(type="team", name="Helsinki"))
+        away = repo.get(repo.create(type="team", name="Borg"))
+        repo.create(type="game", home=home, away=away, datetime=datetime(2024, 5, 1))
+        assert repo.search("helsinki") == [1, 3]  # Builds the index.
+        return repo
+
+    def test_rename_refreshes_team_and_games(self, repo: Repo) -> None:
+        """Test a renamed team is found by its new name, and so are its games."""
+        repo.get(1).update(name="Oslo")
+        repo.changed(1, renamed=True)
+
+        assert repo.search("helsinki") == []
+        assert repo.search("oslo") == [1, 3]
+        assert repo.search("osl", "prefix") == [1, 3]
+
+    def test_delete_removes_entry(self, repo: Repo) -> None:
+        """Test a deleted object is no longer found."""
+        repo.delete(3)
+
+        assert repo.search("helsinki") == [1]
+        assert repo.search("2024-05-01") == []
+
+    def test_create_adds_entry(self, repo: Repo) -> None:
+        """Test an object created after the index was built is found."""
+        tid = repo.create(type="team", name="Helsinki Juniors")
+
+        assert repo.search("helsinki") == [1, 3, tid]
+        assert repo.search("jun", "prefix") == [tid]
@@ -0,0 +1,275 @@
+# test_snapshot.py
+"""Unit tests for RepoSnapshot and SnapshotPublisher classes."""
+
+import importlib
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+import server as server_module
+from sports_lib import Repo, SnapshotPublisher
+from sports_lib.snapshot import ChunkedMap
+
+
+class FakeWebSocket:
+    """Stands in for a client connection; keeps what the server sends."""
+
+    remote_address = ("test", 0)
+
+    def __init__(self) -> None:
+        self.sent = []
+
+    def send(self, message, text=None) -> None:
+        self.sent.append(message)
+
+
+class Renderer:
+    """Renders an object as (its description, its version) and counts the calls per ID."""
+
+    def __init__(self) -> None:
+        self.calls = []
+
+    def __call__(self, oid, obj):
+        self.calls.append(oid)
+        return str(obj), getattr(obj, "version", 0)
+
+
+def rebuilt(repo, render=None):
+    """Returns a snapshot rendered from scratch, the baseline incremental ones must match."""
+    return SnapshotPublisher(render or Renderer()).refresh(repo)
+
+
+def assert_same(snapshot, baseline) -> None:
+    """Asserts two snapshots show the same repository state."""
+    assert dict(snapshot.entries) == dict(baseline.entries)
+    assert snapshot.ids == baseline.ids
+    assert dict(snapshot.ids_by_type) == dict(baseline.ids_by_type)
+    assert dict(snapshot.cup_games) == dict(baseline.cup_games)
+
+
+class TestChunkedMap:
+    """Test cases for ChunkedMap class."""
+
+    def test_mapping_in_id_order(self) -> None:
+        """Test lookups, membership, length and ID-ordered iteration."""
+        m = ChunkedMap([(700, "c"), (3, "a"), (260, "b")])
+
+        assert list(m) == [3, 260, 700]
+        assert len(m) == 3
+        assert m[260] == "b" and m.get(4) is None
+        assert 3 in m and 4 not in m and "3" not in m
+        with pytest.raises(KeyError):
+            m[1000]
+
+    def test_updated_copies_only_touched_buckets(self) -> None:
+        """Test an update leaves the original alone and shares the buckets it did not touch."""
+        m = ChunkedMap((n, n) for n in range(3 * ChunkedMap.BUCKET_SIZE))
+
+        changed = m.updated({1: "one", 10_000: "new"}, deleted=[2, 99_999])
+
+        assert m[1] == 1 and 2 in m and 10_000 not in m
+        assert changed[1] == "one" and 2 not in changed and changed[10_000] == "new"
+        assert len(changed) == len(m)
+        assert changed._buckets[0] is not m._buckets[0]
+        assert changed._buckets[1] is m._buckets[1]
+        assert changed._buckets[2] is m._buckets[2]
+
+    def test_emptied_bucket_is_dropped(self) -> None:
+        """Test deleting every ID of a bucket removes the bucket."""
+        m = ChunkedMap([(1, "a"), (300, "b")])
+
+        changed = m.updated({}, deleted=[300])
+
+        assert list(changed) == [1]
+        assert len(changed._buckets) == 1
+
+
+class TestSnapshotPublisher:
+    """Test cases for SnapshotPublisher class."""
+
+    @pytest.fixture
+    def repo(self) -> Repo:
+        """Create a repo with two teams and a game between them."""
+        repo = Repo()
+        home = repo.create(type="team", name="Home")
+        away = repo.create(type="team", name="Away")
+        repo.create(type="game", home=repo.get(home), away=repo.get(away), datetime=datetime.now())
+        return repo
+
+    def test_add_renders_only_new_object(self, repo: Repo) -> None:
+        """Test a created object is rendered alone and joins the IDs."""
+        render = Renderer()
+        publisher = SnapshotPublisher(render)
+        publisher.refresh(repo)
+        render.calls.clear()
+
+        tid = repo.create(type="team", name="Late")
+        snapshot = publisher.refresh(repo)
+
+        assert render.calls == [tid]
+        assert tid in snapshot.ids and tid in snapshot.ids_by_type["team"]
+        assert_same(snapshot, rebuilt(repo))
+
+    def test_update_rerenders_changed_objects(self, repo: Repo) -> None:
+        """Test a rename re-renders the team and its games, and keeps the IDs."""
+        render = Renderer()
+        publisher = SnapshotPublisher(render)
+        before = publisher.refresh(repo)
+        render.calls.clear()
+
+        repo.get(1).update(name="Renamed")
+        repo.changed(1, renamed=True)
+        snapshot = publisher.refresh(repo)
+
+        assert sorted(render.calls) == [1, 3]
+        assert snapshot.ids is before.ids
+        assert snapshot.entries[2] is before.entries[2]
+        assert_same(snapshot, rebuilt(repo))
+
+    def test_game_notification_rerenders_game(self, repo: Repo) -> None:
+        """Test a game change reaches the snapshot through the change log."""
+        publisher = SnapshotPublisher(Renderer())
+        before = publisher.refresh(repo)
+
+        repo.get(3).start()
+        snapshot = publisher.refresh(repo)
+
+        assert snapshot.entries[3] != before.entries[3]
+        assert_same(snapshot, rebuilt(repo))
+
+    def test_delete_removes_object(self, repo: Repo) -> None:
+        """Test a deleted object leaves the entries and the IDs."""
+        publisher = SnapshotPublisher(Renderer())
+        publisher.refresh(repo)
+
+        repo.delete(3)
+        snapshot = publisher.refresh(repo)
+
+        assert 3 not in snapshot.entries
+        assert 3 not in snapshot.ids and snapshot.ids_by_type["game"] == ()
+        assert_same(snapshot, rebuilt(repo))
+
+    def test_cup_games_follow_cups(self, repo: Repo) -> None:
+        """Test a cup's game IDs are added with the cup and removed with it."""
+        publisher = SnapshotPublisher(Renderer())
+        publisher.refresh(repo)
+        teams = [repo.get(repo.create(type="team", name=f"C{n}")) for n in range(4)]
+
+        cid = repo.create(type="cup", teams=teams, cup_type="LEAGUE", interval=timedelta(days=1))
+        snapshot = publisher.refresh(repo)
+
+        assert snapshot.cup_games[cid] == tuple(g.id() for g in repo.get(cid).games)
+        assert all(gid in snapshot.entries for gid in snapshot.cup_games[cid])
+        assert_same(snapshot, rebuilt(repo))
+
+        repo.delete(cid)
+        snapshot = publisher.refresh(repo)
+
+        assert cid not in snapshot.cup_games
+        assert_same(snapshot, rebuilt(repo))
+
+    def test_unchanged_repo_returns_same_snapshot(self, repo: Repo) -> None:
+        """Test nothing is rendered while the change sequence stays put."""
+        render = Renderer()
+        publisher = SnapshotPublisher(render)
+        first = publisher.refresh(repo)
+        render.calls.clear()
+
+        assert publisher.refresh(repo) is first
+        assert render.calls == []
+
+    def test_rebuilds_when_log_no_longer_reaches_back(self, repo: Repo) -> None:
+        """Test a snapshot older than the change log's floor is rebuilt in full."""
+        render = Renderer()
+        publisher = SnapshotPublisher(render)
+        publisher.refresh(repo)
+        repo.changes.limit = 2
+        for n in range(4):
+            repo.create(type="team", name=f"T{n}")
+        render.calls.clear()
+
+        snapshot = publisher.refresh(repo)
+
+        assert sorted(render.calls) == sorted(repo._objects)
+        assert_same(snapshot, rebuilt(repo))
+
+    def test_many_changes_match_full_rebuild(self) -> None:
+        """Test incremental snapshots across bucket boundaries match a full rebuild."""
+        repo = Repo()
+        publisher = SnapshotPublisher(Renderer())
+        ids = [repo.create(type="team", name=f"T{n}") for n in range(2 * ChunkedMap.BUCKET_SIZE + 10)]
+        publisher.refresh(repo)
+
+        for oid in ids[::7]:
+            repo.delete(oid)
+        for oid in ids[1::5]:
+            if oid in repo._objects:
+                repo.get(oid).update(name=f"R{oid}")
+                repo.changed(oid, renamed=True)
+        repo.create(type="team", name="Last")
+
+        assert_same(publisher.refresh(repo), rebuilt(repo))
+
+    def test_old_snapshot_stays_stable_while_writer_publishes(self, repo: Repo) -> None:
+        """Test a published snapshot does not change while a writer keeps publishing newer ones."""
+        publisher = SnapshotPublisher(Renderer())
+        old = publisher.refresh(repo)
+        expected = (dict(old.entries), old.ids, dict(old.ids_by_type), dict(old.cup_games))
+        done = threading.Event()
+
+        def write():
+            try:
+                for n in range(300):
+                    tid = repo.create(type="team", name=f"W{n}")
+                    repo.get(tid).update(name=f"W{n}b")
+                    repo.changed(tid, renamed=True)
+                    if n % 3 == 0:
+                        repo.delete(tid)
+                    publisher.refresh(repo)
+            finally:
+                done.set()
+
+        writer = threading.Thread(target=write, daemon=True)
+        writer.start()
+        while not done.is_set():
+            assert (dict(old.entries), old.ids, dict(old.ids_by_type), dict(old.cup_games)) == expected
+        writer.join(5)
+
+        assert (dict(old.entries), old.ids, dict(old.ids_by_type), dict(old.cup_games)) == expected
+        assert publisher.current.seq > old.seq
+        assert_same(publisher.current, rebuilt(repo))
+
+
+class TestCurrentSnapshot:
+    """Test cases for the server's current_snapshot after a restart."""
+
+    @pytest.fixture
+    def server(self, tmp_path, monkeypatch):
+        """Fresh server module whose state files live in a temporary directory."""
+        monkeypatch.chdir(tmp_path)
+        module = importlib.reload(server_module)
+        module.load_state()
+        return module
+
+    def create_team(self, server, name):
+        """Creates a team through the server and returns its ID."""
+        session = server.Session(FakeWebSocket())
+        session.running = False
+        response = session.process_command({"command": "CREATE_TEAM", "name": name})
+        assert response["status"] == "OK", response
+        return response["id"]
+
+    def test_snapshot_of_replaced_repository_is_not_reused(self, server) -> None:
+        """Test a snapshot of the repository from before load_state is replaced, even at the same sequence."""
+        self.create_team(server, "Before")
+        stale = server.current_snapshot()
+        late = self.create_team(server, "Late")
+
+        server.load_state()  # A restart in place: new repository, published snapshot kept.
+
+        snapshot = server.current_snapshot()
+        assert snapshot is not stale
+        assert snapshot.repo is server.repository
+        assert late in snapshot.entries
+        assert_same(snapshot, rebuilt(server.repository, server.snapshot_entry))
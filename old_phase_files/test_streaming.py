@@ -0,0 +1,148 @@
+# test_streaming.py
+"""Unit tests for streamed listings: CHUNK and END framing."""
+
+import importlib
+import json
+from typing import Iterator
+
+import pytest
+
+import server as server_module
+
+
+class FakeWebSocket:
+    """Stands in for a client connection; keeps what the server sends."""
+
+    remote_address = ("test", 0)
+
+    def __init__(self) -> None:
+        self.sent = []
+
+    def send(self, message, text=None) -> None:
+        self.sent.append(message)
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    """Fresh server module whose state files live in a temporary directory."""
+    monkeypatch.chdir(tmp_path)
+    module = importlib.reload(server_module)
+    module.load_state()
+    return module
+
+
+@pytest.fixture
+def session(server):
+    """A session that is not connected to a running notification thread."""
+    session = server.Session(FakeWebSocket())
+    session.running = False
+    return session
+
+
+def run(session, **req):
+    """Runs one command and asserts it succeeded."""
+    response = session.process_command(req)
+    assert response["status"] == "OK", response
+    return response
+
+
+def stream(session, **req):
+    """Runs a streamed command and returns its decoded frames."""
+    response = session.process_command({"stream": True, **req})
+    assert isinstance(response, Iterator), response
+    return [json.loads(frame) for frame in response]
+
+
+def make_games(session, count):
+    """Creates two teams and `count` games between them; returns the game IDs."""
+    home = run(session, command="CREATE_TEAM", name="Home")["id"]
+    away = run(session, command="CREATE_TEAM", name="Away")["id"]
+    return [run(session, command="CREATE_GAME", home_id=home, away_id=away)["id"] for _ in range(count)]
+
+
+class TestStreamFrames:
+    """Test cases for stream_frames."""
+
+    def test_empty_list_is_only_end(self, server) -> None:
+        """Test an empty listing yields no CHUNK, just an END frame with zero counts."""
+        frames = [json.loads(f) for f in server.stream_frames(7, "games", [], lambda oid: {"id": oid}, 3)]
+
+        assert frames == [{"type": "END", "requestId": 7, "status": "OK", "chunks": 0, "total": 0}]
+
+    def test_exact_multiple_has_no_empty_chunk(self, server) -> None:
+        """Test a listing that fills its last chunk exactly is not followed by an empty one."""
+        frames = [json.loads(f) for f in server.stream_frames("r", "items", [1, 2, 3, 4, 5, 6], lambda oid: {"id": oid}, 3)]
+
+        assert [f["type"] for f in frames] == ["CHUNK", "CHUNK", "END"]
+        assert [f["seq"] for f in frames[:2]] == [0, 1]
+        assert [[e["id"] for e in f["items"]] for f in frames[:2]] == [[1, 2, 3], [4, 5, 6]]
+        assert frames[-1] == {"type": "END", "requestId": "r", "status": "OK", "chunks": 2, "total": 6}
+
+    def test_partial_last_chunk(self, server) -> None:
+        """Test the last chunk holds the remainder."""
+        frames = [json.loads(f) for f in server.stream_frames(None, "items", list(range(7)), lambda oid: {"id": oid}, 3)]
+
+        assert [len(f["items"]) for f in frames[:-1]] == [3, 3, 1]
+        assert frames[-1]["chunks"] == 3 and frames[-1]["total"] == 7
+
+    def test_failure_ends_stream_with_error(self, server) -> None:
+        """Test an entry that cannot be built ends the stream with an ERROR frame after the sent chunks."""
+        def build(oid):
+            if oid == 4:
+                raise KeyError(oid)
+            return {"id": oid}
+
+        frames = [json.loads(f) for f in server.stream_frames(1, "items", [1, 2, 3, 4], build, 2)]
+
+        assert [f["type"] for f in frames] == ["CHUNK", "END"]
+        assert frames[-1]["status"] == "ERROR" and "after 1 chunks" in frames[-1]["message"]
+
+
+class TestStreamedCommands:
+    """Test cases for streamed GET_GAMES, GET_CUP_GAMES and LIST."""
+
+    def test_empty_listing(self, session) -> None:
+        """Test streaming a listing with nothing in it answers with a lone END frame."""
+        frames = stream(session, command="GET_GAMES", requestId="q1")
+
+        assert frames == [{"type": "END", "requestId": "q1", "status": "OK", "chunks": 0, "total": 0}]
+
+    def test_exact_multiple_of_chunk_size(self, session) -> None:
+        """Test four games in chunks of two arrive as two full chunks in ID order, then END."""
+        ids = make_games(session, 4)
+
+        frames = stream(session, command="GET_GAMES", chunk_size=2, requestId=5)
+
+        assert [f["type"] for f in frames] == ["CHUNK", "CHUNK", "END"]
+        assert all(f["requestId"] == 5 for f in frames)
+        assert [g["id"] for f in frames[:-1] for g in f["games"]] == ids
+        assert frames[-1]["chunks"] == 2 and frames[-1]["total"] == 4
+
+    def test_stream_matches_unstreamed_listing(self, session) -> None:
+        """Test the streamed entries equal the ones of the plain response."""
+        make_games(session, 5)
+
+        frames = stream(session, command="LIST", chunk_size=2, fields="desc")
+
+        assert [i for f in frames[:-1] for i in f["items"]] == run(session, command="LIST", fields="desc")["items"]
+        assert frames[-1]["total"] == 7  # Two teams and five games.
+
+    def test_cup_games(self, session) -> None:
+        """Test a cup's games stream in its own order, and an unknown cup is an error."""
+        teams = [run(session, command="CREATE_TEAM", name=f"T{n}")["id"] for n in range(4)]
+        cup_id = run(session, command="CREATE_CUP", cup_type="LEAGUE", team_ids=teams)["id"]
+        expected = [g["id"] for g in run(session, command="GET_CUP_GAMES", id=cup_id)["games"]]
+
+        frames = stream(session, command="GET_CUP_GAMES", id=cup_id, chunk_size=4)
+
+        assert [g["id"] for f in frames[:-1] for g in f["games"]] == expected
+        assert session.process_command({"command": "GET_CUP_GAMES", "id": 999, "stream": True})["status"] == "ERROR"
+
+    @pytest.mark.parametrize("params", [{"chunk_size": 0}, {"chunk_size": "big"}, {"fields": "nickname"}, {"fields": 3}])
+    def test_invalid_parameters_answer_error(self, session, params) -> None:
+        """Test a bad chunk size or fields gets an ERROR response, not a stream or an exception."""
+        make_games(session, 1)
+
+        response = session.process_command({"command": "GET_GAMES", "stream": True, **params})
+
+        assert isinstance(response, dict) and response["status"] == "ERROR"
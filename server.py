@@ -2,25 +2,75 @@ import sys
 import threading
 import pickle
 import os
-import queue
 import json
+import asyncio
+import struct
+import zlib
+import weakref
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Any, List, Dict, Tuple
+from time import monotonic
+from typing import Any, Callable, FrozenSet, Iterator, List, Dict, Optional, Sequence, Set, Tuple, Union
+from concurrent.futures import ThreadPoolExecutor
 from websockets.sync.server import serve
+from websockets.asyncio.server import serve as serve_async
 from websockets.exceptions import ConnectionClosedError, ConnectionClosedOK
 
-from sports_lib import Repo, Game, Team, Cup, GameState
+from sports_lib import Repo, Game, Team, Cup, GameState, EventBus, RWLock, RepoSnapshot, SnapshotPublisher
+from sports_lib.repo import paginate
 
 # --- Configuration & Globals ---
 HOST = '0.0.0.0'  # Listen on all available interfaces.
 PORT = 8888
 SAVE_FILE = 'server_state.pkl'  # File for object persistence.
+JOURNAL_FILE = 'server_state.journal'  # Append-only mutation log replayed on top of SAVE_FILE.
+JOURNAL_ENABLED = True  # When False, every mutation rewrites the full SAVE_FILE snapshot.
+JOURNAL_COMPACT_THRESHOLD = 1000  # Journal records appended before they are folded into a snapshot.
+PERSIST_MAX_LATENCY = 0.05  # Seconds a mutation may wait for other writes to share its commit.
+PERSIST_MAX_BATCH = 256  # Journal records that trigger a commit before the latency budget runs out.
+EVENT_BUS_ENABLED = True  # Deliver game notifications on a dispatcher thread, outside the handlers.
+# Commands that read state derived from notifications (cup tables, brackets) wait for queued ones first.
+EVENT_BARRIER_COMMANDS = frozenset({"GET_STANDINGS", "GET_GAMETREE", "GET_CUP_GAMES", "SEARCH", "SEARCH_GAMES", "GENERATE_PLAYOFFS", "SAVE",
+                                    "SYNC_SINCE", "LOGIN", "GET_GAMES", "GET_CUPS", "LIST"})
+EVENT_FLUSH_TIMEOUT = 5.0  # Seconds such a command waits for the dispatcher before answering from current state.
+NOTIFY_COALESCE = False  # Default for sessions: a newer update of a game replaces its undelivered one.
+NOTIFY_FLUSH_INTERVAL = 0.1  # Seconds between notification flushes to a coalescing session.
+NOTIFY_QUEUE_LIMIT = 1000  # Notifications a session may have pending before the overflow policy applies.
+NOTIFY_OVERFLOW_POLICY = 'drop_oldest'  # 'drop_oldest', 'coalesce' or 'disconnect' (evict the client).
+SERVER_MODE = 'threads'  # 'threads': one thread per client; 'asyncio': single event loop (also: --async).
+ASYNC_EXECUTOR_WORKERS = 8  # Worker threads for the commands asyncio mode keeps off the event loop.
+# Commands that neither take repo_lock nor wait for the event dispatcher; asyncio mode runs
+# them on the event loop and every other command in the executor.
+ASYNC_LOOP_COMMANDS = frozenset({"USER", "SERVER_STATS"})
+# Listings a client may request with "stream": true, as chunk frames and a terminal frame.
+STREAM_COMMANDS = frozenset({"GET_GAMES", "GET_CUP_GAMES", "LIST"})
+STREAM_CHUNK_SIZE = 200  # Default entries per chunk frame.
+# Fields a 'fields' projection may name, per kind of listed item. Teams also list their
+# custom attributes, so their listings accept any name.
+GAME_FIELDS = frozenset({"id", "home", "away", "home_id", "away_id", "state", "score", "scorers", "timeline",
+                         "datetime", "group"})
+CUP_FIELDS = frozenset({"id", "name", "type", "teams", "gameCount", "desc"})
+LIST_FIELDS = frozenset({"id", "desc"})
+# Read-only commands a session may have running concurrently; replies are tagged with requestId.
+PIPELINED_COMMANDS = frozenset({
+    "GET_TEAMS", "GET_CUPS", "GET_GAMES", "GET_CUP_GAMES", "GET_GAME_STATS", "GET_PLAYERS",
+    "GET_STANDINGS", "GET_GAMETREE", "GET_WATCHED_GAMES", "GET_WATCHED_CUPS", "LIST",
+    "LIST_ATTACHED", "SEARCH", "SEARCH_GAMES", "SYNC_SINCE", "SERVER_STATS",
+})
+PIPELINE_WORKERS = 16  # Threads shared by all sessions for pipelined commands (threaded mode).
+SESSION_MAX_INFLIGHT = 8  # Pipelined commands per session before it stops reading new ones.
+BATCH_MAX_COMMANDS = 10000  # Sub-commands a single BATCH may carry.
+# Commands a BATCH may not contain: barriers wait for the event dispatcher, which needs repo_lock.
+BATCH_EXCLUDED_COMMANDS = EVENT_BARRIER_COMMANDS | {"BATCH"}
+CHANGE_LOG_LIMIT = 10000  # Objects the change log remembers for SYNC_SINCE before falling back to a full snapshot.
 
 # The global repository holds the application's state. It is shared across all threads.
 # The `repo_lock` is crucial to prevent race conditions when multiple clients
-# modify the repository concurrently.
+# modify the repository concurrently. `with repo_lock:` takes it exclusively;
+# read-only commands take `repo_lock.read()` and run in parallel with each other.
 repository = Repo()
-repo_lock = threading.RLock()
+repository.changes.limit = CHANGE_LOG_LIMIT
+repo_lock = RWLock()
 
 # User management: Store registered users
 registered_users = set()  # Set of usernames
@@ -28,6 +78,235 @@ user_watches = {}  # Username -> Set[int]
 cup_watch_sources = {}  # Username -> Dict[game_id, cup_id] - tracks which games are auto-watched from cups
 users_lock = threading.RLock()
 
+# Serialized GET_STANDINGS / GET_GAMETREE responses: (command, cup_id) -> (cup version, JSON).
+response_cache: Dict[Tuple[str, int], Tuple[int, str]] = {}
+response_cache_lock = threading.Lock()
+
+
+class Journal:
+    """
+    Append-only write-ahead log of mutation records.
+    Every record is framed as <length><crc32><pickle payload>, so a torn write at the
+    tail (e.g. a crash in the middle of an append) is detected and discarded on replay.
+    The log only holds the changes made since the last snapshot in SAVE_FILE.
+    """
+    HEADER = struct.Struct('>II')
+
+    def __init__(self, path: str):
+        self.path = path
+        self.seq = 0  # Sequence number of the last record appended or replayed.
+        self.pending = 0  # Records written since the last compaction.
+        self._file = None
+        self._lock = threading.Lock()
+
+    def encode(self, records: List[Tuple[str, Dict[str, Any]]]) -> bytes:
+        """
+        Assigns sequence numbers to the given (kind, data) records and frames them.
+        Must be called while the recorded objects cannot change (i.e. under `repo_lock`),
+        since the images are captured by value here and written later.
+        """
+        frames = []
+        with self._lock:
+            for kind, data in records:
+                self.seq += 1
+                payload = pickle.dumps((self.seq, kind, data), protocol=pickle.HIGHEST_PROTOCOL)
+                frames.append(self.HEADER.pack(len(payload), zlib.crc32(payload)) + payload)
+        return b''.join(frames)
+
+    def write(self, frames: bytes, count: int) -> None:
+        """Durably appends already encoded frames holding `count` records to the log."""
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, 'ab')
+            self._file.write(frames)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self.pending += count
+
+    def replay(self, after_seq: int):
+        """
+        Yields (seq, kind, data) for every intact record newer than `after_seq`.
+        A truncated or corrupt tail is cut off so that new appends start on a clean frame.
+        """
+        self.seq = after_seq
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'rb') as f:
+            data = f.read()
+
+        offset = 0
+        while offset + self.HEADER.size <= len(data):
+            length, crc = self.HEADER.unpack_from(data, offset)
+            start = offset + self.HEADER.size
+            payload = data[start:start + length]
+            if len(payload) < length or zlib.crc32(payload) != crc:
+                break
+            seq, kind, record = pickle.loads(payload)
+            offset = start + length
+            if seq > after_seq:
+                self.seq = seq
+                self.pending += 1
+                yield seq, kind, record
+
+        if offset < len(data):
+            print(f"Discarding {len(data) - offset} bytes of torn journal tail.")
+            with open(self.path, 'r+b') as f:
+                f.truncate(offset)
+
+    def truncate(self) -> None:
+        """Empties the log once its records are covered by a snapshot."""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+            self._file = open(self.path, 'wb')
+            self.pending = 0
+
+
+journal = Journal(JOURNAL_FILE)
+
+
+class PersistenceScheduler:
+    """
+    Background thread that turns the dirty signals raised by command handlers into
+    group commits. Handlers only queue their journal frames (or a snapshot request)
+    and return; the thread writes whatever accumulated within `max_latency` seconds,
+    or `max_batch` records, with a single fsync. The cost of durability is therefore
+    shared by every client in the batch instead of being paid inside `repo_lock`.
+    """
+
+    def __init__(self, max_latency: float, max_batch: int):
+        self.max_latency = max_latency
+        self.max_batch = max_batch
+        self.running = False
+        self._cond = threading.Condition()
+        self._commit_lock = threading.Lock()
+        self._frames: List[bytes] = []
+        self._records = 0
+        self._snapshot = False
+        self._first_dirty = 0.0
+        self._urgent = False  # Set by flush() so waiting callers skip the latency budget.
+        self._submitted = 0  # Ticket of the latest submission.
+        self._committed = 0  # Ticket of the latest submission that is durable on disk.
+        self._thread = None
+
+    def start(self) -> None:
+        self.running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Writes out everything pending and stops the background thread."""
+        self.flush()
+        with self._cond:
+            self.running = False
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+
+    def submit(self, frames: bytes = b'', count: int = 0, snapshot: bool = False) -> int:
+        """Queues journal frames and/or a full snapshot request. Returns a ticket number."""
+        with self._cond:
+            if not self._frames and not self._snapshot:
+                self._first_dirty = monotonic()
+            if frames:
+                self._frames.append(frames)
+                self._records += count
+            self._snapshot = self._snapshot or snapshot
+            self._submitted += 1
+            ticket = self._submitted
+            self._cond.notify_all()
+
+        # Without the background thread (e.g. scripts importing this module) commit inline.
+        if not self.running:
+            self._commit()
+        return ticket
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Barrier: blocks until everything submitted so far has been fsynced."""
+        if not self.running:
+            self._commit()
+            return True
+        with self._cond:
+            target = self._submitted
+            self._urgent = True
+            self._cond.notify_all()
+            return self._cond.wait_for(lambda: self._committed >= target, timeout)
+
+    def _has_work(self) -> bool:
+        return bool(self._frames) or self._snapshot
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._has_work() or self._urgent or not self.running)
+                if not self.running and not self._has_work():
+                    return
+
+                # Give concurrent writers a chance to join this commit.
+                deadline = self._first_dirty + self.max_latency
+                while self.running and not self._urgent and self._records < self.max_batch:
+                    remaining = deadline - monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+
+            self._commit()
+
+    def _commit(self) -> None:
+        with self._commit_lock:
+            with self._cond:
+                frames, self._frames = self._frames, []
+                records, self._records = self._records, 0
+                snapshot, self._snapshot = self._snapshot, False
+                ticket = self._submitted
+                self._urgent = False
+
+            try:
+                if frames and not snapshot:
+                    try:
+                        journal.write(b''.join(frames), records)
+                        snapshot = journal.pending >= JOURNAL_COMPACT_THRESHOLD
+                    except Exception as e:
+                        print(f"Error appending to journal: {e}. Falling back to a full snapshot.")
+                        snapshot = True
+                if snapshot:
+                    # The snapshot covers every frame queued so far, so those are simply dropped.
+                    save_state()
+            finally:
+                with self._cond:
+                    self._committed = max(self._committed, ticket)
+                    self._cond.notify_all()
+
+
+persistence = PersistenceScheduler(PERSIST_MAX_LATENCY, PERSIST_MAX_BATCH)
+
+
+class GameEventBus(EventBus):
+    """
+    Event bus for game notifications. Observers run under `repo_lock` on the
+    dispatcher thread, so SCORE/START/END release the lock right after the change.
+    """
+
+    def deliver(self, game: Any) -> None:
+        last_id = repository._last_id
+        super().deliver(game)
+        if repository._last_id != last_id:
+            # Ending the last group game generated the playoff bracket, which is
+            # structural and therefore snapshotted in full. Until the snapshot is
+            # written, the journal records where the bracket was generated, after
+            # the game that completed the group stage (inline delivery runs before
+            # the handler's own record of it).
+            for cid, cup in repository.cups():
+                if last_id + 1 in cup._games_by_id:
+                    persist(game_record(game.id()), ("playoffs", {"id": cid, "last_id": last_id}))
+            persist(snapshot=True)
+
+
+events = GameEventBus(lock=repo_lock)
+# Runs the PIPELINED_COMMANDS of threaded sessions; asyncio mode uses the loop's executor.
+request_workers = ThreadPoolExecutor(max_workers=PIPELINE_WORKERS, thread_name_prefix="request")
+Game.event_bus = events
+
 
 class SocketObserver:
     """
@@ -36,7 +315,7 @@ class SocketObserver:
     format the update as a JSON notification and put it into a session-specific queue.
     """
 
-    def __init__(self, message_queue: queue.Queue):
+    def __init__(self, message_queue: "NotificationQueue"):
         self.message_queue = message_queue
 
     def __getstate__(self):
@@ -48,26 +327,468 @@ class SocketObserver:
         self.message_queue = None
 
     def update(self, game: Any) -> None:
-        """Constructs a game update notification and adds it to the client's message queue."""
+        """Adds the game's update notification to the client's message queue."""
         if not getattr(self, 'message_queue', None):
             return
 
         try:
-            payload = {
-                "type": "NOTIFICATION",
-                "game_id": game.id(),
-                "home": game.home().team_name,
-                "away": game.away().team_name,
-                "state": game.state.name,
-                "score": {
-                    "home": game.home_score,
-                    "away": game.away_score
-                }
-            }
-            self.message_queue.put(json.dumps(payload))
+            # Keyed by game so the queue can replace a stale update of the same game.
+            self.message_queue.put(encode_notification(game), key=game.id())
         except Exception as e:
             error_payload = {"type": "ERROR", "message": f"Notification failed: {str(e)}"}
-            self.message_queue.put(json.dumps(error_payload))
+            self.message_queue.put(json.dumps(error_payload).encode())
+
+
+# Totals over all sessions, reported by SERVER_STATS.
+notify_stats = {"dropped": 0, "coalesced": 0, "evicted": 0}
+notify_stats_lock = threading.Lock()
+
+
+def count_notify_stat(name: str, n: int = 1) -> None:
+    with notify_stats_lock:
+        notify_stats[name] += n
+
+
+class NotificationQueue:
+    """
+    Bounded per-session notification queue. Producers are observers running under
+    repo_lock, so `put` never blocks; once `limit` messages are pending, `policy`
+    decides what gives way:
+
+    - 'drop_oldest': the oldest pending message is discarded.
+    - 'coalesce': a pending message of the same game is replaced, otherwise the
+      oldest pending message is discarded.
+    - 'disconnect': everything pending is discarded and `on_overflow` is called
+      to evict the session.
+
+    With `coalesce=True` a message always replaces the pending one of the same
+    game (latest state wins) and keeps its place in line. Consumers take all
+    pending messages at most once per `flush_interval`; `wakeup` is called after
+    each put for consumers that cannot block on the queue (asyncio).
+    """
+
+    POLICIES = ('drop_oldest', 'coalesce', 'disconnect')
+
+    def __init__(self, limit: int, policy: str, coalesce: bool = False, flush_interval: float = 0.0,
+                 wakeup=None, on_overflow=None):
+        if policy not in self.POLICIES:
+            raise ValueError(f"Unknown notification overflow policy '{policy}'")
+        self.limit = limit
+        self.policy = policy
+        self.coalesce = coalesce
+        self.flush_interval = flush_interval
+        self.wakeup = wakeup
+        self.on_overflow = on_overflow
+        self.dropped = 0  # Messages discarded because the queue was full.
+        self.coalesced = 0  # Messages replaced by a newer one before they were delivered.
+        self.overflowed = False  # Set once the 'disconnect' policy evicted the session.
+        self._cond = threading.Condition()
+        self._pending: "OrderedDict[Any, bytes | None]" = OrderedDict()
+        self._unkeyed = 0
+        self._last_flush = 0.0
+
+    def put(self, msg: bytes | None, key: Any = None) -> None:
+        """Queues a message; `None` is the stop sentinel and is always accepted."""
+        dropped = coalesced = 0
+        overflow = False
+        with self._cond:
+            full = len(self._pending) >= self.limit
+            if msg is not None and self.overflowed:
+                dropped = 1
+            elif msg is not None and key in self._pending and self.coalesce:
+                self._pending[key] = msg
+                coalesced = 1
+            elif msg is not None and key in self._pending and full and self.policy == 'coalesce':
+                # Without coalescing the game may have newer messages queued behind this
+                # one, so the new message goes to the back to keep the order.
+                del self._pending[key]
+                self._pending[key] = msg
+                coalesced = 1
+            else:
+                if msg is not None and full:
+                    if self.policy == 'disconnect':
+                        dropped = len(self._pending) + 1
+                        self._pending.clear()
+                        self.overflowed = overflow = True
+                        msg = None  # Stops the notification agent.
+                    else:
+                        self._pending.popitem(last=False)
+                        dropped = 1
+                if key is None or key in self._pending or msg is None:
+                    self._unkeyed += 1
+                    key = (None, self._unkeyed)  # Never collides with a game id.
+                self._pending[key] = msg
+            self.dropped += dropped
+            self.coalesced += coalesced
+            self._cond.notify()
+
+        if dropped:
+            count_notify_stat("dropped", dropped)
+        if coalesced:
+            count_notify_stat("coalesced")
+        if overflow:
+            count_notify_stat("evicted")
+            if self.on_overflow is not None:
+                self.on_overflow()
+        if self.wakeup is not None:
+            self.wakeup()
+
+    def qsize(self) -> int:
+        with self._cond:
+            return len(self._pending)
+
+    def delay(self) -> float:
+        """Seconds until the next flush is due."""
+        return max(0.0, self._last_flush + self.flush_interval - monotonic())
+
+    def take(self) -> List[bytes | None]:
+        """Removes and returns everything pending, in order."""
+        with self._cond:
+            batch = list(self._pending.values())
+            self._pending.clear()
+            self._last_flush = monotonic()
+            return batch
+
+    def get_batch(self) -> List[bytes | None]:
+        """Blocks until something is pending and the flush interval has passed, then takes it."""
+        with self._cond:
+            self._cond.wait_for(lambda: self._pending)
+        delay = self.delay()
+        if delay:
+            threading.Event().wait(delay)
+        return self.take()
+
+
+# Last encoded notification per game: game -> ((game.version, home name, away name), UTF-8 JSON).
+# Renaming a team does not bump its games' versions, so the names are part of the key.
+notification_cache: "weakref.WeakKeyDictionary[Any, Tuple[Tuple[int, str, str], bytes]]" = weakref.WeakKeyDictionary()
+
+
+def encode_notification(game: Any) -> bytes:
+    """
+    Returns the NOTIFICATION message for the game's current version. It is encoded
+    once per mutation and the same buffer is queued for every watching session.
+    """
+    key = (game.version, game.home().team_name, game.away().team_name)
+    cached = notification_cache.get(game)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+
+    payload = {
+        "type": "NOTIFICATION",
+        "game_id": game.id(),
+        "home": key[1],
+        "away": key[2],
+        "state": game.state.name,
+        "score": {
+            "home": game.home_score,
+            "away": game.away_score
+        }
+    }
+    msg = json.dumps(payload).encode()
+    notification_cache[game] = (key, msg)
+    return msg
+
+
+def format_standings(raw_standings: Any) -> Any:
+    """Converts Cup.standings() output into the dicts expected by the frontend."""
+    # Transform standings to frontend format
+    if isinstance(raw_standings, list):
+        # LEAGUE format: list of tuples (team, won, draw, lost, gf, ga, points)
+        standings = []
+        for row in raw_standings:
+            standings.append({
+                "team": row[0],
+                "played": row[1] + row[2] + row[3],  # won + draw + lost
+                "won": row[1],
+                "draw": row[2],
+                "lost": row[3],
+                "gf": row[4],
+                "ga": row[5],
+                "points": row[6]
+            })
+    elif isinstance(raw_standings, dict):
+        # GROUP format: nested dict with {Groups: {A: [...], B: [...]}, Playoffs: {...}}
+        standings = {}
+        for top_level_key, top_level_value in raw_standings.items():
+            if isinstance(top_level_value, dict):
+                # This is Groups or similar nested structure
+                standings[top_level_key] = {}
+                for group_name, group_standings in top_level_value.items():
+                    if isinstance(group_standings, list):
+                        standings[top_level_key][group_name] = []
+                        for row in group_standings:
+                            standings[top_level_key][group_name].append({
+                                "team": row[0],
+                                "played": row[1] + row[2] + row[3],
+                                "won": row[1],
+                                "draw": row[2],
+                                "lost": row[3],
+                                "gf": row[4],
+                                "ga": row[5],
+                                "points": row[6]
+                            })
+                    else:
+                        standings[top_level_key][group_name] = group_standings
+            elif isinstance(top_level_value, list):
+                # Direct list of tuples
+                standings[top_level_key] = []
+                for row in top_level_value:
+                    standings[top_level_key].append({
+                        "team": row[0],
+                        "played": row[1] + row[2] + row[3],
+                        "won": row[1],
+                        "draw": row[2],
+                        "lost": row[3],
+                        "gf": row[4],
+                        "ga": row[5],
+                        "points": row[6]
+                    })
+            else:
+                standings[top_level_key] = top_level_value
+    else:
+        standings = raw_standings
+
+    return standings
+
+
+def cached_response(cmd: str, oid: int, version: int, build) -> str:
+    """
+    Returns the serialized OK response for `cmd` on object `oid` at `version`.
+    The JSON is only rebuilt (via `build()`, which returns the payload fields) when
+    the object's version moved on, so repeated polls reuse the same string.
+    """
+    key = (cmd, oid)
+    with response_cache_lock:
+        cached = response_cache.get(key)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    response = json.dumps({"status": "OK", "version": version, **build()})
+    with response_cache_lock:
+        response_cache[key] = (version, response)
+    return response
+
+
+def page_params(req: Dict[str, Any]) -> Tuple[Optional[int], Optional[int]]:
+    """
+    Reads the optional 'limit' and 'cursor' paging parameters of a request.
+
+    Raises:
+        ValueError: If 'limit' is not a positive integer or 'cursor' not an integer ID.
+    """
+    limit = req.get("limit")
+    cursor = req.get("cursor")
+    try:
+        limit = int(limit) if limit is not None else None
+        valid = limit is None or limit >= 1
+    except (TypeError, ValueError):
+        valid = False
+    if not valid:
+        raise ValueError("'limit' must be a positive integer.")
+    try:
+        cursor = int(cursor) if cursor is not None else None
+    except (TypeError, ValueError):
+        raise ValueError(f"'cursor' must be the integer ID of the previous page's last item, not {cursor!r}.") from None
+    return limit, cursor
+
+
+def field_params(req: Dict[str, Any], known: Optional[FrozenSet[str]] = None) -> Optional[Set[str]]:
+    """
+    Reads the optional 'fields' projection of a request: a list or a comma-separated string.
+
+    Raises:
+        ValueError: If 'fields' is neither, or names a field not in `known` (when given).
+    """
+    fields = req.get("fields")
+    if fields is None:
+        return None
+    if isinstance(fields, str):
+        fields = fields.split(",")
+    if not isinstance(fields, list) or not all(isinstance(f, str) for f in fields):
+        raise ValueError("'fields' must be a list of field names or a comma-separated string.")
+    fields = {f.strip() for f in fields}
+    if known is not None and fields - known:
+        raise ValueError(f"Unknown fields: {sorted(fields - known)}. Valid: {sorted(known)}")
+    return fields
+
+
+def project(item: Dict[str, Any], fields: Optional[Set[str]]) -> Dict[str, Any]:
+    """Keeps only the requested fields of a listed item; its 'id' is always kept."""
+    if fields is None:
+        return item
+    return {k: v for k, v in item.items() if k == "id" or k in fields}
+
+
+def team_summary(oid: int, team: Team, fields: Optional[Set[str]] = None) -> Dict[str, Any]:
+    """Builds the client view of a team as listed by GET_TEAMS."""
+    players = {}
+    for pid, pdata in team.players.items():
+        players[pdata['name']] = {"no": pdata['no']}
+
+    team_data = {
+        "id": oid,
+        "name": team.team_name,
+        "players": players
+    }
+
+    # Add custom fields (generic attributes)
+    for key, value in team._generic_attrs.items():
+        team_data[key] = value
+    return project(team_data, fields)
+
+
+def cup_summary(oid: int, c: Cup, fields: Optional[Set[str]] = None) -> Dict[str, Any]:
+    """Builds the client view of a cup as listed by GET_CUPS."""
+    # Get cup name from metadata
+    cup_name = repository._objects[oid].get('metadata', {}).get('name', f"Tournament #{oid}")
+
+    # Get team IDs
+    team_ids = []
+    for team in c.teams:
+        tid = repository.id_of(team)
+        if tid is not None:
+            team_ids.append(tid)
+
+    return project({
+        "id": oid,
+        "name": cup_name,
+        "type": c.cup_type,
+        "teams": team_ids,
+        "gameCount": len(c.games),
+        "desc": str(c)
+    }, fields)
+
+
+def game_summary(oid: int, g: Game, fields: Optional[Set[str]] = None) -> Dict[str, Any]:
+    """
+    Builds the client view of a game as listed by GET_GAMES and SEARCH_GAMES.
+    Scorers and the timeline are the bulk of it, so they are only computed when
+    `fields` asks for them (or is None).
+    """
+    summary = {
+        "id": oid,
+        "home": g.home().team_name,
+        "away": g.away().team_name,
+        # Find team IDs (None for unresolved placeholder teams)
+        "home_id": repository.id_of(g.home_),
+        "away_id": repository.id_of(g.away_),
+        "state": g.state.name,
+        "score": {"home": g.home_score, "away": g.away_score},
+    }
+
+    if fields is None or "scorers" in fields:
+        # Extract scorers from players (those with score > 0)
+        stats = g.stats()
+        home_scorers = []
+        away_scorers = []
+
+        for player_name, score in stats['Home']['Players'].items():
+            if score > 0:
+                home_scorers.append({"name": player_name, "goals": score})
+
+        for player_name, score in stats['Away']['Players'].items():
+            if score > 0:
+                away_scorers.append({"name": player_name, "goals": score})
+        summary["scorers"] = {"home": home_scorers, "away": away_scorers}
+
+    if fields is None or "timeline" in fields:
+        summary["timeline"] = g.timeline
+    summary["datetime"] = g.datetime.isoformat() if g.datetime and hasattr(g.datetime, 'isoformat') else str(g.datetime) if g.datetime else None
+    summary["group"] = g.group
+    return project(summary, fields)
+
+
+def snapshot_entry(oid: int, obj: Any) -> Tuple[str, str, Dict[str, Any]]:
+    """Renders an object for the repository snapshot as (type, LIST description, full client view)."""
+    if isinstance(obj, Team):
+        return "team", str(obj), team_summary(oid, obj)
+    if isinstance(obj, Game):
+        view = game_summary(oid, obj)
+        view["timeline"] = list(view["timeline"])  # The game keeps appending to its own list.
+        return "game", str(obj), view
+    if isinstance(obj, Cup):
+        return "cup", str(obj), cup_summary(oid, obj)
+    return type(obj).__name__.lower(), str(obj), {"id": oid}
+
+
+# Latest immutable view of the repository, served to listings without holding repo_lock.
+snapshots = SnapshotPublisher(snapshot_entry)
+
+
+def current_snapshot() -> RepoSnapshot:
+    """
+    Returns the repository snapshot as of now. While nothing changed since the last
+    one was published it is returned without taking any lock; otherwise it is brought
+    up to date under a shared `repo_lock`, rendering only the objects that changed.
+    Game changes reach the change log through notifications, so callers flush the
+    event bus first (see EVENT_BARRIER_COMMANDS).
+    """
+    snapshot = snapshots.current
+    if snapshot is not None and snapshot.repo is repository and snapshot.seq == repository.changes.seq:
+        return snapshot
+    with repo_lock.read():
+        return snapshots.refresh(repository)
+
+
+def stream_frames(request_id: Any, key: str, ids: Sequence[int],
+                  build: Callable[[int], Dict[str, Any]], chunk_size: int) -> Iterator[str]:
+    """
+    Yields a streamed listing as serialized frames: a CHUNK frame per `chunk_size`
+    IDs, holding their entries under `key`, then an END frame. Every frame carries
+    the request's `requestId`. Entries are built chunk by chunk from a repository
+    snapshot, so the stream is consistent and takes no lock at all.
+    """
+    total = 0
+    chunks = 0
+    try:
+        for start in range(0, len(ids), chunk_size):
+            entries = [build(oid) for oid in ids[start:start + chunk_size]]
+            total += len(entries)
+            yield json.dumps({"type": "CHUNK", "requestId": request_id, "seq": chunks, key: entries})
+            chunks += 1
+    except Exception as e:
+        yield json.dumps({"type": "END", "requestId": request_id, "status": "ERROR",
+                          "message": f"Stream aborted after {chunks} chunks: {str(e)}"})
+        return
+    yield json.dumps({"type": "END", "requestId": request_id, "status": "OK", "chunks": chunks, "total": total})
+
+
+def encode_response(response: Union[Dict[str, Any], str], request_id: Any) -> str:
+    """Serializes a command response, tagged with the request's requestId if it had one."""
+    if request_id is None:
+        return response if isinstance(response, str) else json.dumps(response)
+    if isinstance(response, str):
+        # Cached responses are serialized objects; splice the tag in after the brace.
+        return '{"requestId": ' + json.dumps(request_id) + ', ' + response[1:]
+    return json.dumps({"requestId": request_id, **response})
+
+
+def resolve_refs(value: Any, results: List[Dict[str, Any]]) -> Any:
+    """
+    Replaces every {"$ref": n} in a BATCH sub-command with the ID created by its
+    n-th sub-command, searching nested lists and objects.
+
+    Raises:
+        ValueError: If n does not name an earlier sub-command that returned an ID.
+    """
+    if isinstance(value, dict):
+        if value.keys() == {"$ref"}:
+            n = value["$ref"]
+            if not isinstance(n, int) or isinstance(n, bool) or not 0 <= n < len(results):
+                raise ValueError(f"Reference {json.dumps(value)} does not name an earlier command of the batch.")
+            if results[n].get("status") != "OK" or "id" not in results[n]:
+                raise ValueError(f"Command {n} of the batch did not create an object.")
+            return results[n]["id"]
+        return {k: resolve_refs(v, results) for k, v in value.items()}
+    if isinstance(value, list):
+        return [resolve_refs(v, results) for v in value]
+    return value
+
+
+def is_pipelined(request: Dict[str, Any]) -> bool:
+    """Tells whether a request may run concurrently with the session's other requests."""
+    return str(request.get("command", "")).upper() in PIPELINED_COMMANDS
 
 
 class Session:
@@ -75,24 +796,70 @@ class Session:
     Represents a single client session.
     In Phase 4, this class manages the state for a WebSocket connection.
     """
-    def __init__(self, websocket):
+    def __init__(self, websocket, coalesce: bool | None = None):
         self.websocket = websocket
         self.client_address = websocket.remote_address
         self.user = "Anonymous"  # Default user, can be changed with the USER command.
+        self.coalesce = NOTIFY_COALESCE if coalesce is None else coalesce
 
         # This queue is the bridge between the game logic (which calls observer.update)
         # and the notification agent (which sends to the socket). This handles asynchronous notifications.
-        self.output_queue: queue.Queue[str | None] = queue.Queue()
+        self.output_queue = self.create_output_queue()
         self.observer = SocketObserver(self.output_queue)
 
         self.watched_ids: List[int] = []  # IDs of objects this session is watching.
         self.attached_ids: List[int] = [] # IDs of objects this session has interacted with.
         self.running = True
+        # Pipelined commands in flight; the reader blocks once SESSION_MAX_INFLIGHT run.
+        self.inflight = threading.BoundedSemaphore(SESSION_MAX_INFLIGHT)
 
-        # Start the background thread for sending notifications.
+        self.start_notification_agent()
+
+    def create_output_queue(self) -> NotificationQueue:
+        """Returns the queue the observer puts notifications into."""
+        return NotificationQueue(NOTIFY_QUEUE_LIMIT, NOTIFY_OVERFLOW_POLICY, coalesce=self.coalesce,
+                                 flush_interval=NOTIFY_FLUSH_INTERVAL if self.coalesce else 0.0,
+                                 on_overflow=self.evict)
+
+    def start_notification_agent(self) -> None:
+        """Starts the background thread for sending notifications."""
         self.agent_thread = threading.Thread(target=self.notification_agent, daemon=True)
         self.agent_thread.start()
 
+    def handle_request(self, request: Dict[str, Any]) -> None:
+        """Runs a request and sends its response (or its stream frames) to the client."""
+        response = self.process_command(request)
+        if isinstance(response, Iterator):
+            # Streamed listing: send each frame as soon as it is built.
+            for frame in response:
+                self.websocket.send(frame)
+        elif response:
+            self.websocket.send(encode_response(response, request.get("requestId")))
+
+    def pipeline_request(self, request: Dict[str, Any]) -> None:
+        """
+        Runs a read-only request on the worker pool, so slow reads do not hold up the
+        requests behind them. Writes stay on the reader thread and keep their order;
+        since they run to completion there, a read always sees the writes sent before it.
+        """
+        self.inflight.acquire()
+
+        def run():
+            try:
+                self.handle_request(request)
+            except (ConnectionClosedError, ConnectionClosedOK):
+                pass
+            except Exception as e:
+                print(f"Error in pipelined request for {self.client_address}: {e}")
+            finally:
+                self.inflight.release()
+
+        try:
+            request_workers.submit(run)
+        except RuntimeError:
+            self.inflight.release()  # Pool shut down; the server is stopping.
+            raise
+
     def find_game(self, game_id: int):
         """Find a game by ID in repository or cups.
         
@@ -114,22 +881,40 @@ class Session:
         """
         while self.running:
             try:
-                msg = self.output_queue.get()
-                if msg is None:  # A `None` message is a sentinel to stop the thread.
-                    break
-                # WebSockets are message-based; manual delimiters like '\n' are unnecessary.
-                self.websocket.send(msg)
+                for msg in self.output_queue.get_batch():
+                    if msg is None:  # A `None` message is a sentinel to stop the thread.
+                        return
+                    # WebSockets are message-based; manual delimiters like '\n' are unnecessary.
+                    # Notifications are pre-encoded UTF-8 JSON, sent as text frames.
+                    self.websocket.send(msg, text=True)
             except (ConnectionClosedError, ConnectionClosedOK):
                 break # Stop if the socket is closed.
             except Exception as e:
                 print(f"Notification error: {e}")
                 break
 
-    def process_command(self, req: Dict[str, Any]) -> Dict[str, Any]:
-        """Parses the JSON request and executes the corresponding action."""
+    def evict(self) -> None:
+        """
+        Disconnects a client whose notification queue overflowed. Called from the
+        producer, so the (possibly slow) close handshake runs on its own thread.
+        """
+        print(f"Evicting slow client {self.client_address}")
+        threading.Thread(target=self.websocket.close, args=(1008, "Notification queue overflow"),
+                         daemon=True).start()
+
+    def process_command(self, req: Dict[str, Any]) -> Union[Dict[str, Any], str]:
+        """
+        Parses the JSON request and executes the corresponding action.
+        Returns a response dict, or an already serialized JSON string for cached responses.
+        """
         cmd = req.get("command", "").upper()
+        if cmd in EVENT_BARRIER_COMMANDS:
+            events.flush(EVENT_FLUSH_TIMEOUT)
 
         try:
+            if req.get("stream") and cmd in STREAM_COMMANDS:
+                return self.stream_response(cmd, req)
+
             if cmd == "LOGIN":
                 username = req.get("username", "").strip()
                 if not username:
@@ -137,9 +922,9 @@ class Session:
 
                 with users_lock:
                     # Add user to registered users if not already present
-                    if username not in registered_users:
+                    is_new_user = username not in registered_users
+                    if is_new_user:
                         registered_users.add(username)
-                        save_state()  # Persist user data
 
                     # Set the session user
                     self.user = username
@@ -148,6 +933,17 @@ class Session:
                     watches = user_watches.get(self.user, set()).copy()
                     print(f"DEBUG: Restoring watches for user '{self.user}': {watches}")
 
+                if is_new_user:
+                    persist(user_record(username))  # Persist user data
+
+                # A reconnecting client passes the sequence (and epoch) of its last sync;
+                # only the watched games that changed since then are replayed to it.
+                since = req.get("since")
+                with repo_lock.read():
+                    changed = repository.changes.since(int(since), req.get("epoch")) if since is not None else None
+                    replay = None if changed is None else {oid for oid, _ in changed}
+                    sequence, epoch = repository.changes.seq, repository.changes.epoch
+
                 if watches:
                     with repo_lock:
                         for oid in watches:
@@ -163,17 +959,55 @@ class Session:
                                         self.watched_ids.append(oid)
 
                                         # Send immediate update
-                                        if isinstance(instance, Game):
+                                        if isinstance(instance, Game) and (replay is None or oid in replay):
                                             self.observer.update(instance)
                                         if isinstance(instance, Cup):
                                             for game in instance.games:
-                                                self.observer.update(game)
+                                                if replay is None or game.id() in replay:
+                                                    self.observer.update(game)
 
                 return {
                     "status": "OK", 
                     "username": username, 
                     "message": f"Logged in as {username}",
-                    "watched_ids": self.watched_ids
+                    "watched_ids": self.watched_ids,
+                    "sequence": sequence,
+                    "epoch": epoch
+                }
+
+            elif cmd == "SYNC_SINCE":
+                since = req.get("since")
+                if since is None: return {"status": "ERROR", "message": "Missing 'since' parameter for SYNC_SINCE command."}
+                fields = field_params(req)
+
+                with repo_lock.read():
+                    # The snapshot and the change log are read at the same sequence number.
+                    snapshot = snapshots.refresh(repository)
+                    changed = repository.changes.since(int(since), req.get("epoch"))
+                    epoch = repository.changes.epoch
+                if changed is None:
+                    # The log does not reach back that far: send everything.
+                    ids, deleted = snapshot.ids, []
+                else:
+                    ids = [oid for oid, is_deleted in changed if not is_deleted]
+                    deleted = [oid for oid, is_deleted in changed if is_deleted]
+
+                listed = {"team": [], "game": [], "cup": []}
+                for oid in ids:
+                    entry = snapshot.entries.get(oid)
+                    if entry is not None and entry[0] in listed:
+                        listed[entry[0]].append(project(entry[2], fields))
+                teams, games, cups = listed["team"], listed["game"], listed["cup"]
+
+                return {
+                    "status": "OK",
+                    "sequence": snapshot.seq,
+                    "epoch": epoch,
+                    "full": changed is None,
+                    "teams": teams,
+                    "games": games,
+                    "cups": cups,
+                    "deleted": deleted
                 }
 
             elif cmd == "USER":
@@ -181,100 +1015,31 @@ class Session:
                 return {"status": "OK", "message": f"User set to {self.user}"}
 
             elif cmd == "GET_TEAMS":
-                with repo_lock:
-                    teams = []
-                    for oid, data in repository._objects.items():
-                        if isinstance(data['instance'], Team):
-                            team = data['instance']
-                            players = {}
-                            for pid, pdata in team.players.items():
-                                players[pdata['name']] = {"no": pdata['no']}
-
-                            team_data = {
-                                "id": oid,
-                                "name": team.team_name,
-                                "players": players
-                            }
-
-                            # Add custom fields (generic attributes)
-                            for key, value in team._generic_attrs.items():
-                                team_data[key] = value
-
-                            teams.append(team_data)
-                return {"status": "OK", "teams": teams}
+                limit, cursor = page_params(req)
+                fields = field_params(req)
+                snapshot = current_snapshot()
+                ids, next_cursor = paginate(snapshot.ids_by_type["team"], limit, cursor)
+                teams = [project(snapshot.entries[oid][2], fields) for oid in ids]
+                total = len(snapshot.ids_by_type["team"])
+                return {"status": "OK", "teams": teams, "total": total, "next_cursor": next_cursor}
 
             elif cmd == "GET_CUPS":
-                with repo_lock:
-                    cups = []
-                    for oid, data in repository._objects.items():
-                        if isinstance(data['instance'], Cup):
-                            c = data['instance']
-
-                            # Get cup name from metadata
-                            cup_name = data.get('metadata', {}).get('name', f"Tournament #{oid}")
-
-                            # Get team IDs
-                            team_ids = []
-                            for team in c.teams:
-                                for tid, tdata in repository._objects.items():
-                                    if tdata['instance'] is team:
-                                        team_ids.append(tid)
-                                        break
-
-                            cups.append({
-                                "id": oid,
-                                "name": cup_name,
-                                "type": c.cup_type,
-                                "teams": team_ids,
-                                "gameCount": len(c.games),
-                                "desc": str(c)
-                            })
-                return {"status": "OK", "cups": cups}
+                limit, cursor = page_params(req)
+                fields = field_params(req, CUP_FIELDS)
+                snapshot = current_snapshot()
+                ids, next_cursor = paginate(snapshot.ids_by_type["cup"], limit, cursor)
+                cups = [project(snapshot.entries[oid][2], fields) for oid in ids]
+                total = len(snapshot.ids_by_type["cup"])
+                return {"status": "OK", "cups": cups, "total": total, "next_cursor": next_cursor}
 
             elif cmd == "GET_GAMES":
-                with repo_lock:
-                    games = []
-                    for oid, data in repository._objects.items():
-                        if isinstance(data['instance'], Game):
-                            g = data['instance']
-
-                            # Find team IDs by searching repository for team objects
-                            home_id = None
-                            away_id = None
-                            for tid, tdata in repository._objects.items():
-                                if tdata['instance'] is g.home_:
-                                    home_id = tid
-                                if tdata['instance'] is g.away_:
-                                    away_id = tid
-
-                            # Get scorers from stats
-                            stats = g.stats()
-                            home_scorers = []
-                            away_scorers = []
-
-                            # Extract scorers from players (those with score > 0)
-                            for player_name, score in stats['Home']['Players'].items():
-                                if score > 0:
-                                    home_scorers.append({"name": player_name, "goals": score})
-
-                            for player_name, score in stats['Away']['Players'].items():
-                                if score > 0:
-                                    away_scorers.append({"name": player_name, "goals": score})
-
-                            games.append({
-                                "id": oid,
-                                "home": g.home().team_name,
-                                "away": g.away().team_name,
-                                "home_id": home_id,
-                                "away_id": away_id,
-                                "state": g.state.name,
-                                "score": {"home": g.home_score, "away": g.away_score},
-                                "scorers": {"home": home_scorers, "away": away_scorers},
-                                "timeline": g.timeline,
-                                "datetime": g.datetime.isoformat() if g.datetime and hasattr(g.datetime, 'isoformat') else str(g.datetime) if g.datetime else None,
-                                "group": g.group
-                            })
-                return {"status": "OK", "games": games}
+                limit, cursor = page_params(req)
+                fields = field_params(req, GAME_FIELDS)
+                snapshot = current_snapshot()
+                ids, next_cursor = paginate(snapshot.ids_by_type["game"], limit, cursor)
+                games = [project(snapshot.entries[oid][2], fields) for oid in ids]
+                total = len(snapshot.ids_by_type["game"])
+                return {"status": "OK", "games": games, "total": total, "next_cursor": next_cursor}
 
             elif cmd == "SEARCH_GAMES":
                 # Get search parameters
@@ -284,115 +1049,57 @@ class Session:
                 end_date = req.get("end_date")  # ISO format string
                 cup_id = req.get("cup_id")  # Optional: search within specific cup
 
-                with repo_lock:
-                    # Collect all games matching the criteria
-                    all_matching_games = []
+                limit, cursor = page_params(req)
+                fields = field_params(req, GAME_FIELDS)
 
-                    # If cup_id is provided, search only in that cup
+                # Parse dates if provided
+                between = None
+                if start_date and end_date:
+                    # Parse ISO format and convert to naive datetime (no timezone info)
+                    start_dt = datetime.fromisoformat(start_date.replace('Z', '+00:00')).replace(tzinfo=None)
+                    end_dt = datetime.fromisoformat(end_date.replace('Z', '+00:00')).replace(tzinfo=None)
+                    between = (start_dt, end_dt)
+
+                with repo_lock.read():
+                    # If cup_id is provided, search only in that cup, otherwise in all cups
                     if cup_id is not None:
                         cup_obj = repository._objects.get(int(cup_id))
-                        if cup_obj and isinstance(cup_obj['instance'], Cup):
-                            cup = cup_obj['instance']
-
-                            # Parse dates if provided
-                            between = None
-                            if start_date and end_date:
-                                from datetime import datetime
-                                # Parse ISO format and convert to naive datetime (no timezone info)
-                                start_dt = datetime.fromisoformat(start_date.replace('Z', '+00:00')).replace(tzinfo=None)
-                                end_dt = datetime.fromisoformat(end_date.replace('Z', '+00:00')).replace(tzinfo=None)
-                                between = (start_dt, end_dt)
-
-                            # Use Cup.search method
-                            matching_games = cup.search(tname=tname, group=group, between=between)
-
-                            # Find game IDs
-                            for game in matching_games:
-                                for gid, gdata in repository._objects.items():
-                                    if gdata['instance'] is game:
-                                        all_matching_games.append((gid, game))
-                                        break
+                        cups = [cup_obj['instance']] if cup_obj and isinstance(cup_obj['instance'], Cup) else []
                     else:
-                        # Search in all cups
-                        for oid, data in repository._objects.items():
-                            if isinstance(data['instance'], Cup):
-                                cup = data['instance']
-
-                                # Parse dates if provided
-                                between = None
-                                if start_date and end_date:
-                                    from datetime import datetime
-                                    # Parse ISO format and convert to naive datetime (no timezone info)
-                                    start_dt = datetime.fromisoformat(start_date.replace('Z', '+00:00')).replace(tzinfo=None)
-                                    end_dt = datetime.fromisoformat(end_date.replace('Z', '+00:00')).replace(tzinfo=None)
-                                    between = (start_dt, end_dt)
-
-                                # Use Cup.search method
-                                matching_games = cup.search(tname=tname, group=group, between=between)
-
-                                # Find game IDs
-                                for game in matching_games:
-                                    for gid, gdata in repository._objects.items():
-                                        if gdata['instance'] is game:
-                                            all_matching_games.append((gid, game))
-                                            break
+                        cups = [cup for _, cup in repository.cups()]
+
+                    # Cup.search answers from the cup's indexes; collect matches by game ID
+                    matching = {}
+                    for cup in cups:
+                        for game in cup.search(tname=tname, group=group, between=between):
+                            gid = repository.id_of(game)
+                            if gid is not None:
+                                matching[gid] = game
+                    page, next_cursor = paginate(sorted(matching), limit, cursor)
 
                     # Build response with game details
-                    games = []
-                    for gid, g in all_matching_games:
-                        # Find team IDs
-                        home_id = None
-                        away_id = None
-                        for tid, tdata in repository._objects.items():
-                            if tdata['instance'] is g.home_:
-                                home_id = tid
-                            if tdata['instance'] is g.away_:
-                                away_id = tid
-
-                        # Get scorers from stats
-                        stats = g.stats()
-                        home_scorers = []
-                        away_scorers = []
-
-                        for player_name, score in stats['Home']['Players'].items():
-                            if score > 0:
-                                home_scorers.append({"name": player_name, "goals": score})
-
-                        for player_name, score in stats['Away']['Players'].items():
-                            if score > 0:
-                                away_scorers.append({"name": player_name, "goals": score})
-
-                        games.append({
-                            "id": gid,
-                            "home": g.home().team_name,
-                            "away": g.away().team_name,
-                            "home_id": home_id,
-                            "away_id": away_id,
-                            "state": g.state.name,
-                            "score": {"home": g.home_score, "away": g.away_score},
-                            "scorers": {"home": home_scorers, "away": away_scorers},
-                            "timeline": g.timeline,
-                            "datetime": g.datetime.isoformat() if g.datetime and hasattr(g.datetime, 'isoformat') else str(g.datetime) if g.datetime else None,
-                            "group": g.group
-                        })
+                    games = [game_summary(gid, matching[gid], fields) for gid in page]
 
-                    return {"status": "OK", "games": games, "count": len(games)}
+                    return {"status": "OK", "games": games, "count": len(games), "total": len(matching), "next_cursor": next_cursor}
 
             elif cmd == "SEARCH":
                 query = req.get("query")
                 if not query: return {"status": "ERROR", "message": "Missing 'query' parameter for SEARCH command."}
+                match = req.get("match", "substring")  # 'substring' or 'prefix'
+                limit, cursor = page_params(req)
 
-                with repo_lock:
+                with repo_lock.read():
+                    ids = repository.search(query, match=match)
+                    page, next_cursor = paginate(ids, limit, cursor)
                     results = []
-                    for oid, data in repository._objects.items():
-                        obj = data['instance']
-                        if query.lower() in str(obj).lower():
-                            results.append({
-                                "id": oid,
-                                "type": type(obj).__name__,
-                                "desc": str(obj)
-                            })
-                return {"status": "OK", "results": results}
+                    for oid in page:
+                        obj = repository._objects[oid]['instance']
+                        results.append({
+                            "id": oid,
+                            "type": type(obj).__name__,
+                            "desc": str(obj)
+                        })
+                return {"status": "OK", "results": results, "total": len(ids), "next_cursor": next_cursor}
 
             elif cmd == "CREATE_TEAM":
                 name = req.get("name")
@@ -402,7 +1109,7 @@ class Session:
                     tid = repository.create(type="team", name=name)
                     repository.attach(tid, self.user)
                     self.attached_ids.append(tid)
-                    save_state()
+                    persist(team_record(tid), attach_record(tid))
                 return {"status": "OK", "id": tid, "message": "Team created"}
             
             elif cmd == "UPDATE_TEAM":
@@ -413,8 +1120,13 @@ class Session:
                 with repo_lock:
                     obj = repository._objects.get(int(tid))
                     if obj and isinstance(obj['instance'], Team):
+                        old_name = obj['instance'].team_name
                         obj['instance'].update(**updates)
-                        save_state()
+                        renamed = obj['instance'].team_name != old_name
+                        if renamed:
+                            touch_cups_with(obj['instance'])
+                        repository.changed(int(tid), renamed=renamed)
+                        persist(team_record(int(tid)))
                         return {"status": "OK", "message": f"Team {tid} updated"}
                     return {"status": "ERROR", "message": f"Team with ID {tid} not found for UPDATE_TEAM command."}
 
@@ -428,7 +1140,8 @@ class Session:
                     obj = repository._objects.get(int(tid))
                     if obj and isinstance(obj['instance'], Team):
                         pid = obj['instance'].addplayer(pname, int(pno))
-                        save_state()
+                        repository.changed(int(tid))
+                        persist(team_record(int(tid)))
                         return {"status": "OK", "message": f"Player added with ID {pid}"}
                     return {"status": "ERROR", "message": f"Team with ID {tid} not found for ADD_PLAYER command."}
 
@@ -441,7 +1154,8 @@ class Session:
                     obj = repository._objects.get(int(tid))
                     if obj and isinstance(obj['instance'], Team):
                         obj['instance'].delplayer(pname)
-                        save_state()
+                        repository.changed(int(tid))
+                        persist(team_record(int(tid)))
                         return {"status": "OK", "message": f"Player {pname} removed"}
                     return {"status": "ERROR", "message": f"Team with ID {tid} not found for REMOVE_PLAYER command."}
 
@@ -455,7 +1169,8 @@ class Session:
                     if obj and isinstance(obj['instance'], Team):
                         try:
                             delattr(obj['instance'], field_key)
-                            save_state()
+                            repository.changed(int(tid))
+                            persist(team_record(int(tid)))
                             return {"status": "OK", "message": f"Custom field '{field_key}' deleted"}
                         except AttributeError:
                             return {"status": "ERROR", "message": f"Custom field '{field_key}' not found"}
@@ -464,7 +1179,7 @@ class Session:
             elif cmd == "GET_PLAYERS":
                 tid = req.get("team_id")
                 if tid is None: return {"status": "ERROR", "message": "Missing 'team_id' parameter for GET_PLAYERS command."}
-                with repo_lock:
+                with repo_lock.read():
                     obj = repository._objects.get(int(tid))
                     if obj and isinstance(obj['instance'], Team):
                         # Team.players is Dict[int, Dict[str, Any]] -> {id: {"name": str, "no": int}}
@@ -490,20 +1205,21 @@ class Session:
                         away=a_data['instance'],
                         datetime=datetime.now()
                     )
-                    save_state()
+                    persist(game_record(gid))
                 return {"status": "OK", "id": gid, "message": "Game created"}
             
             elif cmd == "UPDATE_GAME":
                 gid = req.get("id")
                 if gid is None: return {"status": "ERROR", "message": "Missing 'id' parameter for UPDATE_GAME command."}
                 
-                updates = {k: v for k, v in req.items() if k not in ["command", "id"]}
+                updates = {k: v for k, v in req.items() if k not in ["command", "id", "requestId"]}
                 
                 # Handle datetime conversion if present
                 if "datetime" in updates:
                     try:
-                        updates["datetime"] = datetime.fromisoformat(updates["datetime"])
-                    except (ValueError, TypeError):
+                        # Stored naive, like the SEARCH_GAMES bounds, so all game times compare
+                        updates["datetime"] = datetime.fromisoformat(updates["datetime"].replace('Z', '+00:00')).replace(tzinfo=None)
+                    except (ValueError, TypeError, AttributeError):
                         return {"status": "ERROR", "message": "Invalid datetime format for UPDATE_GAME command (use ISO format)."}
 
                 with repo_lock:
@@ -522,7 +1238,7 @@ class Session:
                     game = self.find_game(int(gid))
                     if game:
                         game.update(**updates)
-                        save_state()
+                        persist(game_record(int(gid)))
                         return {"status": "OK", "message": f"Game {gid} updated"}
                     return {"status": "ERROR", "message": f"Game with ID {gid} not found for UPDATE_GAME command."}
 
@@ -553,7 +1269,6 @@ class Session:
                                 if self.user not in user_watches:
                                     user_watches[self.user] = set()
                                 user_watches[self.user].add(oid)
-                                save_state()
 
                         # If it's a game, send immediate update so client has initial state
                         if isinstance(instance, Game):
@@ -563,12 +1278,7 @@ class Session:
                         if isinstance(instance, Cup):
                             auto_watched_games = []
                             for game in instance.games:
-                                # Find game ID
-                                game_id = None
-                                for gid, gdata in repository._objects.items():
-                                    if gdata['instance'] is game:
-                                        game_id = gid
-                                        break
+                                game_id = repository.id_of(game)
 
                                 if game_id is not None:
                                     # Watch the game
@@ -592,12 +1302,15 @@ class Session:
                                             if self.user not in user_watches:
                                                 user_watches[self.user] = set()
                                             user_watches[self.user].add(game_id)
-                                            save_state()
 
                                     auto_watched_games.append(game_id)
                                     # Send immediate update
                                     self.observer.update(game)
 
+                        if self.user != "Anonymous":
+                            persist(user_record(self.user))
+
+                        if isinstance(instance, Cup):
                             return {"status": "OK", "message": f"Watching {oid}", "auto_watched_games": auto_watched_games}
 
                         return {"status": "OK", "message": f"Watching {oid}"}
@@ -655,33 +1368,26 @@ class Session:
                                             # Remove from cup_watch_sources
                                             del cup_watch_sources[self.user][game_id]
 
-                                        save_state()
-
                         # Remove persistence
                         if self.user != "Anonymous":
                             with users_lock:
                                 if self.user in user_watches and oid in user_watches[self.user]:
                                     user_watches[self.user].remove(oid)
-                                    save_state()
+                            persist(user_record(self.user))
 
                         return {"status": "OK", "message": f"Unwatched {oid}"}
                     return {"status": "ERROR", "message": f"Object with ID {oid} is not watchable (must implement 'unwatch' method)."}
 
             elif cmd == "GET_WATCHED_GAMES":
-                with repo_lock:
+                with repo_lock.read():
                     watched_games = []
                     for oid in self.watched_ids:
                         if oid in repository._objects:
                             instance = repository._objects[oid]['instance']
                             if isinstance(instance, Game):
                                 # Find team IDs
-                                home_id = None
-                                away_id = None
-                                for tid, tdata in repository._objects.items():
-                                    if tdata['instance'] is instance.home_:
-                                        home_id = tid
-                                    if tdata['instance'] is instance.away_:
-                                        away_id = tid
+                                home_id = repository.id_of(instance.home_)
+                                away_id = repository.id_of(instance.away_)
 
                                 # Get scorers from stats
                                 stats = instance.stats()
@@ -719,7 +1425,7 @@ class Session:
                     return {"status": "OK", "games": watched_games}
 
             elif cmd == "GET_WATCHED_CUPS":
-                with repo_lock:
+                with repo_lock.read():
                     watched_cups = []
                     for oid in self.watched_ids:
                         if oid in repository._objects:
@@ -744,7 +1450,7 @@ class Session:
             elif cmd == "GET_GAME_STATS":
                 gid = req.get("id")
                 if gid is None: return {"status": "ERROR", "message": "Missing 'id' parameter for GET_GAME_STATS command."}
-                with repo_lock:
+                with repo_lock.read():
                     game = self.find_game(int(gid))
                     if game:
                         return {"status": "OK", "stats": game.stats()}
@@ -761,7 +1467,7 @@ class Session:
                             return {"status": "ERROR", "message": f"Cannot start game {gid} because it has already ended."}
 
                         game.start()
-                        save_state()
+                        persist(game_record(int(gid)))
                         return {
                             "status": "OK",
                             "message": f"Game started: {game.home().team_name} vs {game.away().team_name}"
@@ -776,7 +1482,7 @@ class Session:
                     game = self.find_game(int(gid))
                     if game:
                         game.pause()
-                        save_state()
+                        persist(game_record(int(gid)))
                         return {
                             "status": "OK",
                             "message": f"Game paused: {game.home().team_name} vs {game.away().team_name}"
@@ -791,7 +1497,7 @@ class Session:
                     game = self.find_game(int(gid))
                     if game:
                         game.resume()
-                        save_state()
+                        persist(game_record(int(gid)))
                         return {
                             "status": "OK",
                             "message": f"Game resumed: {game.home().team_name} vs {game.away().team_name}"
@@ -814,7 +1520,7 @@ class Session:
 
                         team_obj = game.home() if side == "HOME" else game.away()
                         game.score(int(pts), team_obj, player=player)
-                        save_state()
+                        persist(game_record(int(gid)))
                         return {
                             "status": "OK",
                             "message": f"Score updated: {game.home().team_name} {game.home_score} - {game.away_score} {game.away().team_name}"
@@ -860,11 +1566,14 @@ class Session:
                         if 'metadata' not in repository._objects[cid]:
                             repository._objects[cid]['metadata'] = {}
                         repository._objects[cid]['metadata']['name'] = c_name
+                        repository.changed(cid)
 
                         # Attach user to the new Cup
                         repository.attach(cid, self.user)
                         self.attached_ids.append(cid)
-                        save_state()
+                        # Cup generation shuffles teams and creates many games at once,
+                        # so it is snapshotted in full rather than journaled.
+                        persist(snapshot=True)
 
                     except ValueError as e:
                         return {"status": "ERROR", "message": f"Error creating cup: {str(e)}"}
@@ -876,7 +1585,7 @@ class Session:
                 if cid is None:
                     return {"status": "ERROR", "message": "Missing 'id' parameter for GET_STANDINGS command."}
 
-                with repo_lock:
+                with repo_lock.read():
                     obj_data = repository._objects.get(int(cid))
                     if not obj_data:
                         return {"status": "ERROR", "message": f"Object with ID {cid} not found for GET_STANDINGS command."}
@@ -885,78 +1594,26 @@ class Session:
                     if not isinstance(cup, Cup):
                         return {"status": "ERROR", "message": f"Object with ID {cid} is not a Cup (found {type(cup).__name__}) for GET_STANDINGS command."}
 
-                    # Calculate standings
-                    raw_standings = cup.standings()
-
-                    # Transform standings to frontend format
-                    if isinstance(raw_standings, list):
-                        # LEAGUE format: list of tuples (team, won, draw, lost, gf, ga, points)
-                        standings = []
-                        for row in raw_standings:
-                            standings.append({
-                                "team": row[0],
-                                "played": row[1] + row[2] + row[3],  # won + draw + lost
-                                "won": row[1],
-                                "draw": row[2],
-                                "lost": row[3],
-                                "gf": row[4],
-                                "ga": row[5],
-                                "points": row[6]
-                            })
-                    elif isinstance(raw_standings, dict):
-                        # GROUP format: nested dict with {Groups: {A: [...], B: [...]}, Playoffs: {...}}
-                        standings = {}
-                        for top_level_key, top_level_value in raw_standings.items():
-                            if isinstance(top_level_value, dict):
-                                # This is Groups or similar nested structure
-                                standings[top_level_key] = {}
-                                for group_name, group_standings in top_level_value.items():
-                                    if isinstance(group_standings, list):
-                                        standings[top_level_key][group_name] = []
-                                        for row in group_standings:
-                                            standings[top_level_key][group_name].append({
-                                                "team": row[0],
-                                                "played": row[1] + row[2] + row[3],
-                                                "won": row[1],
-                                                "draw": row[2],
-                                                "lost": row[3],
-                                                "gf": row[4],
-                                                "ga": row[5],
-                                                "points": row[6]
-                                            })
-                                    else:
-                                        standings[top_level_key][group_name] = group_standings
-                            elif isinstance(top_level_value, list):
-                                # Direct list of tuples
-                                standings[top_level_key] = []
-                                for row in top_level_value:
-                                    standings[top_level_key].append({
-                                        "team": row[0],
-                                        "played": row[1] + row[2] + row[3],
-                                        "won": row[1],
-                                        "draw": row[2],
-                                        "lost": row[3],
-                                        "gf": row[4],
-                                        "ga": row[5],
-                                        "points": row[6]
-                                    })
-                            else:
-                                standings[top_level_key] = top_level_value
-                    else:
-                        standings = raw_standings
+                    # Polls while nothing changed are answered without recomputing anything.
+                    if req.get("if_version") == cup.version:
+                        return {"status": "NOT_MODIFIED", "version": cup.version}
 
-                return {"status": "OK", "standings": standings}
+                    return cached_response(cmd, int(cid), cup.version, lambda: {"standings": format_standings(cup.standings())})
 
             elif cmd == "GET_GAMETREE":
                 cid = req.get("id")
                 if cid is None: return {"status": "ERROR", "message": "Missing 'id' parameter for GET_GAMETREE command."}
-                with repo_lock:
+                with repo_lock.read():
                     obj = repository._objects.get(int(cid))
                     if not obj or not isinstance(obj['instance'], Cup):
                         return {"status": "ERROR", "message": f"Cup with ID {cid} not found for GET_GAMETREE command."}
+
+                    cup = obj['instance']
+                    if req.get("if_version") == cup.version:
+                        return {"status": "NOT_MODIFIED", "version": cup.version}
+
                     try:
-                        tree = obj['instance'].gametree()
-                        return {"status": "OK", "gametree": tree}
+                        return cached_response(cmd, int(cid), cup.version, lambda: {"gametree": cup.gametree()})
                     except ValueError as e:
                         return {"status": "ERROR", "message": f"Error retrieving gametree for cup {cid}: {str(e)}"}
 
@@ -964,54 +1621,11 @@ class Session:
                 cid = req.get("id")
                 if cid is None: return {"status": "ERROR", "message": "Missing 'id' parameter for GET_CUP_GAMES command."}
 
-                with repo_lock:
-                    obj = repository._objects.get(int(cid))
-                    if not obj or not isinstance(obj['instance'], Cup):
-                        return {"status": "ERROR", "message": f"Cup with ID {cid} not found for GET_CUP_GAMES command."}
-
-                    cup = obj['instance']
-                    games_data = []
-                    for g in cup.games:
-                        try:
-                            gid = g.id()
-                            
-                            # Find team IDs
-                            home_id = None
-                            away_id = None
-                            for tid, tdata in repository._objects.items():
-                                if tdata['instance'] is g.home_:
-                                    home_id = tid
-                                if tdata['instance'] is g.away_:
-                                    away_id = tid
-                            
-                            # Get scorers
-                            stats = g.stats()
-                            home_scorers = []
-                            away_scorers = []
-                            for player_name, score in stats['Home']['Players'].items():
-                                if score > 0:
-                                    home_scorers.append({"name": player_name, "goals": score})
-                            for player_name, score in stats['Away']['Players'].items():
-                                if score > 0:
-                                    away_scorers.append({"name": player_name, "goals": score})
-
-                            games_data.append({
-                                "id": gid,
-                                "home": g.home().team_name,
-                                "away": g.away().team_name,
-                                "home_id": home_id,
-                                "away_id": away_id,
-                                "state": g.state.name,
-                                "score": {"home": g.home_score, "away": g.away_score},
-                                "scorers": {"home": home_scorers, "away": away_scorers},
-                                "timeline": g.timeline,
-                                "datetime": g.datetime.isoformat() if g.datetime and hasattr(g.datetime, 'isoformat') else str(g.datetime) if g.datetime else None,
-                                "group": g.group
-                            })
-                        except Exception as e:
-                            print(f"Error processing game {g} in cup {cid}: {e}")
-                            continue
-
+                snapshot = current_snapshot()
+                game_ids = snapshot.cup_games.get(int(cid))
+                if game_ids is None:
+                    return {"status": "ERROR", "message": f"Cup with ID {cid} not found for GET_CUP_GAMES command."}
+                games_data = [snapshot.entries[gid][2] for gid in game_ids if gid in snapshot.entries]
                 return {"status": "OK", "games": games_data}
 
             elif cmd == "GENERATE_PLAYOFFS":
@@ -1028,17 +1642,20 @@ class Session:
                     try:
                         # Capture the number of games before generation
                         count_before = len(cup.games)
+                        last_id = repository._last_id
                         cup.generate_playoffs()
                         new_games = len(cup.games) - count_before
 
-                        save_state()
+                        persist(("playoffs", {"id": int(cid), "last_id": last_id}))
+                        persist(snapshot=True)
 
                         return {"status": "OK", "message": f"Playoffs generated. {new_games} new games created."}
                     except ValueError as e:
                         return {"status": "ERROR", "message": f"Error generating playoffs for cup {cid}: {str(e)}"}
 
             elif cmd == "SAVE":
-                save_state()
+                persist(snapshot=True)
+                persistence.flush()
                 return {"status": "OK", "message": "State saved"}
 
             elif cmd == "END":
@@ -1049,6 +1666,7 @@ class Session:
                     game = self.find_game(int(gid))
                     if game:
                         game.end()
+                        persist(game_record(int(gid)))
                         return {
                             "status": "OK", 
                             "message": f"Game ended: {game.home().team_name} {game.home_score} - {game.away_score} {game.away().team_name}"
@@ -1056,13 +1674,16 @@ class Session:
                     return {"status": "ERROR", "message": f"Game with ID {gid} not found for END command."}
 
             elif cmd == "LIST":
-                with repo_lock:
-                    results = repository.list()
-                    items = [{"id": r[0], "desc": r[1]} for r in results]
-                return {"status": "OK", "items": items}
+                limit, cursor = page_params(req)
+                fields = field_params(req, LIST_FIELDS)
+                snapshot = current_snapshot()
+                ids, next_cursor = paginate(snapshot.ids, limit, cursor)
+                items = [project({"id": oid, "desc": snapshot.entries[oid][1]}, fields) for oid in ids]
+                total = len(snapshot.ids)
+                return {"status": "OK", "items": items, "total": total, "next_cursor": next_cursor}
 
             elif cmd == "LIST_ATTACHED":
-                with repo_lock:
+                with repo_lock.read():
                     results = repository.listattached(self.user)
                     items = [{"id": r[0], "desc": r[1]} for r in results]
                 return {"status": "OK", "items": items}
@@ -1091,6 +1712,19 @@ class Session:
                     except ValueError as e:
                         return {"status": "ERROR", "message": f"Error detaching from object {oid}: {str(e)}"}
 
+            elif cmd == "BATCH":
+                commands = req.get("commands")
+                if not isinstance(commands, list) or not commands:
+                    return {"status": "ERROR", "message": "Missing 'commands' list for BATCH command."}
+                if len(commands) > BATCH_MAX_COMMANDS:
+                    return {"status": "ERROR", "message": f"A batch may hold at most {BATCH_MAX_COMMANDS} commands."}
+                return self.run_batch(commands, bool(req.get("continue_on_error", False)))
+
+            elif cmd == "SERVER_STATS":
+                with notify_stats_lock:
+                    notifications = dict(notify_stats)
+                return {"status": "OK", "notifications": notifications, "repo_lock": repo_lock.stats()}
+
             elif cmd == "DELETE":
                 oid = req.get("id")
                 if oid is None: return {"status": "ERROR", "message": "Missing 'id' parameter for DELETE command."}
@@ -1104,12 +1738,10 @@ class Session:
                             game_ids_to_delete = []
 
                             # Find all game IDs that belong to this cup
-                            for gid, gdata in repository._objects.items():
-                                if isinstance(gdata['instance'], Game):
-                                    game = gdata['instance']
-                                    # Check if this game is in the cup's games list
-                                    if game in cup.games:
-                                        game_ids_to_delete.append(gid)
+                            for game in cup.games:
+                                gid = repository.id_of(game)
+                                if gid is not None:
+                                    game_ids_to_delete.append(gid)
 
                             # Delete all games first
                             for gid in game_ids_to_delete:
@@ -1141,6 +1773,9 @@ class Session:
                             self.attached_ids.remove(int(oid))
 
                         repository.delete(int(oid))
+                        with response_cache_lock:
+                            response_cache.pop(("GET_STANDINGS", int(oid)), None)
+                            response_cache.pop(("GET_GAMETREE", int(oid)), None)
 
                         if int(oid) in self.watched_ids:
                             self.watched_ids.remove(int(oid))
@@ -1151,7 +1786,7 @@ class Session:
                                 if int(oid) in u_watches:
                                     u_watches.discard(int(oid))
 
-                        save_state()
+                        persist(snapshot=True)
                         return {"status": "OK", "message": "Object deleted"}
                     except ValueError as e:
                         return {"status": "ERROR", "message": f"Error deleting object {oid}: {str(e)}"}
@@ -1164,6 +1799,84 @@ class Session:
         except Exception as e:
             return {"status": "ERROR", "message": f"Internal Server Error processing command '{cmd}': {str(e)}"}
 
+    def run_batch(self, commands: List[Any], continue_on_error: bool = False) -> Dict[str, Any]:
+        """
+        Runs the sub-commands of a BATCH in order under a single `repo_lock` acquisition,
+        so no other client's write interleaves with them. Their persistence is deferred
+        and submitted as one commit when the batch ends, before the lock is released.
+        The batch is not atomic: it stops at the first failing sub-command (or carries
+        on with `continue_on_error`), and the sub-commands that ran stay applied.
+        """
+        results: List[Dict[str, Any]] = []
+        failed: Optional[int] = None
+        with repo_lock:
+            deferred_persist.batch = {"records": [], "snapshot": False}
+            try:
+                for i, sub in enumerate(commands):
+                    try:
+                        if not isinstance(sub, dict):
+                            raise ValueError("Batch commands must be JSON objects.")
+                        name = str(sub.get("command", "")).upper()
+                        if name in BATCH_EXCLUDED_COMMANDS:
+                            raise ValueError(f"Command '{name}' cannot be batched.")
+                        sub = resolve_refs(sub, results)
+                        sub.pop("stream", None)
+                        result = self.process_command(sub)
+                        if isinstance(result, str):
+                            result = json.loads(result)
+                    except ValueError as e:
+                        result = {"status": "ERROR", "message": str(e)}
+                    results.append(result)
+                    if result.get("status") == "ERROR" and failed is None:
+                        failed = i
+                        if not continue_on_error:
+                            break
+            finally:
+                batch = deferred_persist.batch
+                deferred_persist.batch = None
+                # The records refer to the live objects, so they are encoded before
+                # the lock is released and other writers can change them.
+                if batch["snapshot"]:
+                    persist(snapshot=True)
+                elif batch["records"]:
+                    persist(*batch["records"])
+
+        if failed is not None:
+            return {"status": "ERROR", "message": f"Command {failed} of the batch failed: {results[failed].get('message')}",
+                    "failed": failed, "results": results}
+        return {"status": "OK", "results": results}
+
+    def stream_response(self, cmd: str, req: Dict[str, Any]) -> Union[Dict[str, Any], Iterator[str]]:
+        """
+        Starts a streamed GET_GAMES, GET_CUP_GAMES or LIST. The stream lists the
+        repository snapshot taken now, so it shows the objects as they were when it
+        was requested; the returned generator then yields the frames (see `stream_frames`).
+        """
+        fields = field_params(req, LIST_FIELDS if cmd == "LIST" else GAME_FIELDS)
+        chunk_size = int(req.get("chunk_size", STREAM_CHUNK_SIZE))
+        if chunk_size < 1:
+            return {"status": "ERROR", "message": "'chunk_size' must be a positive integer."}
+
+        snapshot = current_snapshot()
+        entries = snapshot.entries
+        if cmd == "GET_GAMES":
+            key, ids = "games", snapshot.ids_by_type["game"]
+        elif cmd == "GET_CUP_GAMES":
+            cid = req.get("id")
+            if cid is None: return {"status": "ERROR", "message": "Missing 'id' parameter for GET_CUP_GAMES command."}
+            game_ids = snapshot.cup_games.get(int(cid))
+            if game_ids is None:
+                return {"status": "ERROR", "message": f"Cup with ID {cid} not found for GET_CUP_GAMES command."}
+            key, ids = "games", [gid for gid in game_ids if gid in entries]
+        else:
+            key, ids = "items", snapshot.ids
+
+        if key == "games":
+            build = lambda oid: project(entries[oid][2], fields)
+        else:
+            build = lambda oid: project({"id": oid, "desc": entries[oid][1]}, fields)
+        return stream_frames(req.get("requestId"), key, ids, build, chunk_size)
+
     def cleanup(self):
         """
         Crucial for graceful shutdown. Detaches this session's observer from all
@@ -1171,11 +1884,8 @@ class Session:
         to a closed connection.
         """
         with repo_lock:
-            for oid in self.watched_ids:
-                if oid in repository._objects:
-                    obj = repository._objects[oid]['instance']
-                    if hasattr(obj, 'unwatch'):
-                        obj.unwatch(self.observer)
+            # One pass over this observer's own subscriptions (games, cups and teams).
+            repository.subscriptions.unsubscribe_all(self.observer)
             for oid in self.attached_ids:
                 if oid in repository._objects:
                     repository.detach(oid, self.user)
@@ -1184,6 +1894,8 @@ def agent(websocket):
     """
     The main handler for a WebSocket connection.
     This function is called in a new thread for each client by `server.serve`.
+    Writes are run here one by one; PIPELINED_COMMANDS are handed to the worker
+    pool and answer out of order, tagged with their requestId.
     """
     session = Session(websocket)
     print(f"Accepted connection from {session.client_address}")
@@ -1198,9 +1910,10 @@ def agent(websocket):
         for message in websocket:
             try:
                 request = json.loads(message)
-                response = session.process_command(request)
-                if response:
-                    websocket.send(json.dumps(response))
+                if is_pipelined(request):
+                    session.pipeline_request(request)
+                else:
+                    session.handle_request(request)
             except json.JSONDecodeError:
                 err = {"status": "ERROR", "message": "Invalid JSON format received from client."}
                 websocket.send(json.dumps(err))
@@ -1216,12 +1929,139 @@ def agent(websocket):
         session.cleanup()
         print(f"Session cleaned up for {session.client_address}")
 
+class AsyncSession(Session):
+    """
+    Session used by the asyncio server. Notifications are drained by a task on the
+    event loop instead of a dedicated thread; producers on other threads wake it up
+    through the loop.
+    """
+
+    def create_output_queue(self) -> NotificationQueue:
+        self.loop = asyncio.get_running_loop()
+        self.pending_event = asyncio.Event()
+        output_queue = super().create_output_queue()
+        output_queue.wakeup = self.wake_agent
+        return output_queue
+
+    def wake_agent(self) -> None:
+        try:
+            self.loop.call_soon_threadsafe(self.pending_event.set)
+        except RuntimeError:
+            pass  # Loop already closed; the session is gone.
+
+    def evict(self) -> None:
+        print(f"Evicting slow client {self.client_address}")
+        self.loop.call_soon_threadsafe(
+            lambda: self.loop.create_task(self.websocket.close(1008, "Notification queue overflow")))
+
+    def start_notification_agent(self) -> None:
+        self.agent_task = self.loop.create_task(self.async_notification_agent())
+
+    async def next_batch(self) -> List[bytes | None]:
+        await self.pending_event.wait()
+        self.pending_event.clear()
+        await asyncio.sleep(self.output_queue.delay())
+        return self.output_queue.take()
+
+    async def handle_request_async(self, request: Dict[str, Any]) -> None:
+        """Runs a request (on the executor unless it never blocks) and sends its response."""
+        loop = asyncio.get_running_loop()
+        if str(request.get("command", "")).upper() in ASYNC_LOOP_COMMANDS:
+            response = self.process_command(request)
+        else:
+            response = await loop.run_in_executor(None, self.process_command, request)
+        if isinstance(response, Iterator):
+            # Chunks are serialized from the snapshot without repo_lock, but encoding a
+            # large one is still CPU work, so build them in the executor.
+            while (frame := await loop.run_in_executor(None, next, response, None)) is not None:
+                await self.websocket.send(frame)
+        elif response:
+            await self.websocket.send(encode_response(response, request.get("requestId")))
+
+    async def async_notification_agent(self) -> None:
+        """Sends queued notifications to the client until the `None` sentinel arrives."""
+        while True:
+            for msg in await self.next_batch():
+                if msg is None:
+                    return
+                try:
+                    await self.websocket.send(msg, text=True)
+                except (ConnectionClosedError, ConnectionClosedOK):
+                    return
+                except Exception as e:
+                    print(f"Notification error: {e}")
+                    return
+
+
+async def async_agent(websocket):
+    """
+    Connection handler for the asyncio server. Writes from one client are handled
+    in order, each awaited on the executor before the next is read, so waiting for
+    repo_lock or the event dispatcher does not stall every other connection on the
+    loop; only ASYNC_LOOP_COMMANDS run on the loop itself. PIPELINED_COMMANDS run as
+    concurrent tasks on the executor and answer out of order, tagged with their requestId.
+    """
+    session = AsyncSession(websocket)
+    print(f"Accepted connection from {session.client_address}")
+    # Pipelined (read-only) commands run as tasks; writes are awaited in arrival order.
+    inflight = asyncio.Semaphore(SESSION_MAX_INFLIGHT)
+    pipelined = set()
+
+    async def run_pipelined(request):
+        try:
+            await session.handle_request_async(request)
+        except (ConnectionClosedError, ConnectionClosedOK):
+            pass
+        except Exception as e:
+            print(f"Error in pipelined request for {session.client_address}: {e}")
+        finally:
+            inflight.release()
+
+    try:
+        welcome = {"type": "INFO", "message": "Connected to Sports Tracker (WebSocket Mode)"}
+        await websocket.send(json.dumps(welcome))
+
+        async for message in websocket:
+            try:
+                request = json.loads(message)
+                if is_pipelined(request):
+                    await inflight.acquire()
+                    task = asyncio.create_task(run_pipelined(request))
+                    pipelined.add(task)
+                    task.add_done_callback(pipelined.discard)
+                else:
+                    await session.handle_request_async(request)
+            except json.JSONDecodeError:
+                err = {"status": "ERROR", "message": "Invalid JSON format received from client."}
+                await websocket.send(json.dumps(err))
+
+    except (ConnectionClosedError, ConnectionClosedOK):
+        print(f"Connection closed normally for {session.client_address}")
+    except Exception as e:
+        print(f"Unexpected error for {session.client_address}: {e}")
+    finally:
+        session.running = False
+        session.output_queue.put(None)
+        # cleanup() takes repo_lock for writing, which must not block the loop.
+        await asyncio.get_running_loop().run_in_executor(None, session.cleanup)
+        print(f"Session cleaned up for {session.client_address}")
+
+
+async def serve_asyncio():
+    """Runs the asyncio server until cancelled."""
+    loop = asyncio.get_running_loop()
+    loop.set_default_executor(ThreadPoolExecutor(max_workers=ASYNC_EXECUTOR_WORKERS))
+    async with serve_async(async_agent, HOST, PORT) as server:
+        await server.serve_forever()
+
+
 def load_state():
     """
     Implements persistency by loading the entire repository from a pickle file.
     This is done once at server startup.
     """
     global repository, registered_users, user_watches, cup_watch_sources
+    snapshot_seq = 0
     if os.path.exists(SAVE_FILE):
         try:
             with repo_lock:
@@ -1237,6 +2077,7 @@ def load_state():
                             registered_users = saved_data.get('users', set())
                             user_watches = saved_data.get('user_watches', {})
                             cup_watch_sources = saved_data.get('cup_watch_sources', {})
+                        snapshot_seq = saved_data.get('journal_seq', 0)
                     else:
                         repository = Repo()
 
@@ -1248,54 +2089,262 @@ def load_state():
                         repository._last_id = max_id
 
                 # Restore repo references for objects that need them (e.g. Cups)
-                for data in repository._objects.values():
-                    if isinstance(data['instance'], Cup):
-                        data['instance'].repo = repository
+                for _, cup in repository.cups():
+                    cup.repo = repository
+                repository.changes.limit = CHANGE_LOG_LIMIT
 
             print(f"DEBUG: Loaded state. Users: {len(registered_users)}, Watches: {sum(len(v) for v in user_watches.values())}")
             print("Server state loaded from 'server_state.pkl'.")
         except Exception as e:
             print(f"Could not load state: {e}. Starting with a new repository.")
 
+    if JOURNAL_ENABLED:
+        replay_journal(snapshot_seq)
 
-def save_state():
+    # The replay numbers its changes afresh, so a cursor handed out before the
+    # restart may name a different point in the history now. Clients that send the
+    # epoch are caught by it; for those that do not, start the change log past every
+    # sequence number the loaded state has used.
+    with repo_lock:
+        repository.changes.seq += 1
+        repository.changes.floor = repository.changes.seq
+
+
+def replay_journal(snapshot_seq: int) -> None:
     """
-    Implements persistency by saving the entire repository to a pickle file.
-    This can be triggered by a client command or on server shutdown.
+    Re-applies every journal record written after the loaded snapshot.
+    The records are already durable, so nothing is persisted while they are applied;
+    the recovered state is snapshotted once at the end, which also empties the journal.
     """
+    global replaying
+    replayed = 0
     with repo_lock:
+        replaying, Cup.auto_playoffs = True, False
         try:
-            # Use a temporary file for atomic write to prevent corruption
-            temp_file = f"{SAVE_FILE}.tmp"
-            with open(temp_file, 'wb') as f:
-                # Save both repository and registered users
-                with users_lock:
-                    saved_data = {
-                        'repository': repository,
-                        'users': registered_users,
-                        'user_watches': user_watches,
-                        'cup_watch_sources': cup_watch_sources
-                    }
-                pickle.dump(saved_data, f)
-            print(f"DEBUG: Saved state. Users: {len(registered_users)}, Watches: {sum(len(v) for v in user_watches.values())}")
-            os.replace(temp_file, SAVE_FILE)
-            print(f"Server state saved to '{SAVE_FILE}'.")
+            for _, kind, data in journal.replay(snapshot_seq):
+                apply_record(kind, data)
+                replayed += 1
         except Exception as e:
-            print(f"Error saving state: {e}")
+            print(f"Could not replay journal: {e}. Continuing with the state recovered so far.")
+        finally:
+            replaying, Cup.auto_playoffs = False, True
+    if replayed:
+        print(f"Replayed {replayed} journal record(s) from '{JOURNAL_FILE}'.")
+        save_state()
+
+
+def team_record(tid: int) -> Tuple[str, Dict[str, Any]]:
+    """Captures the current image of a team for the journal."""
+    team = repository._objects[tid]['instance']
+    return ('team', {
+        'id': tid,
+        'name': team.team_name,
+        'players': team.players,
+        'player_id_counter': team._player_id_counter,
+        'attrs': team._generic_attrs,
+    })
+
+
+def game_record(gid: int) -> Tuple[str, Dict[str, Any]]:
+    """Captures the current image of a game for the journal."""
+    game = repository._objects[gid]['instance']
+    return ('game', {
+        'id': gid,
+        # Placeholder teams are not registered in the repository, so their ID is None.
+        'home_id': repository.id_of(game.home_),
+        'away_id': repository.id_of(game.away_),
+        'datetime': game.datetime,
+        'group': game.group,
+        'state': game.state.name,
+        'total_time': game.total_time + (monotonic() - game.gametime) if game.state == GameState.RUNNING else game.total_time,
+        'home_score': game.home_score,
+        'away_score': game.away_score,
+        'home_players': game.home_players,
+        'away_players': game.away_players,
+        'timeline': game.timeline,
+    })
+
+
+def user_record(username: str) -> Tuple[str, Dict[str, Any]]:
+    """Captures a user's registration and watch lists for the journal."""
+    with users_lock:
+        return ('user', {
+            'name': username,
+            'watches': set(user_watches.get(username, set())),
+            'cup_sources': dict(cup_watch_sources.get(username, {})),
+        })
+
+
+def attach_record(oid: int) -> Tuple[str, Dict[str, Any]]:
+    """Captures the set of users attached to an object for the journal."""
+    return ('attach', {'id': oid, 'users': set(repository._attachments.get(oid, set()))})
+
+
+def apply_record(kind: str, data: Dict[str, Any]) -> None:
+    """Applies a single journal record to the in-memory state. Used during replay."""
+    if kind == 'team':
+        tid = data['id']
+        if tid not in repository._objects:
+            if repository.create(type="team", name=data['name']) != tid:
+                raise ValueError(f"Journal is out of sync with the snapshot at team {tid}.")
+        team = repository._objects[tid]['instance']
+        renamed = team.team_name != data['name']
+        team.team_name = data['name']
+        if renamed:
+            touch_cups_with(team)
+        team.players = data['players']
+        team._player_id_counter = data['player_id_counter']
+        team._generic_attrs = data['attrs']
+        repository.changed(tid, renamed=renamed)
+
+    elif kind == 'game':
+        gid = data['id']
+        home = repository._objects.get(data['home_id'], {}).get('instance')
+        away = repository._objects.get(data['away_id'], {}).get('instance')
+        if gid not in repository._objects:
+            if repository.create(type="game", home=home, away=away, datetime=data['datetime']) != gid:
+                raise ValueError(f"Journal is out of sync with the snapshot at game {gid}.")
+        game = repository._objects[gid]['instance']
+
+        if home is not None:
+            game.home_ = home
+        if away is not None:
+            game.away_ = away
+        game.datetime = data['datetime']
+        game.group = data['group']
+        game.home_score = data['home_score']
+        game.away_score = data['away_score']
+        game.home_players = data['home_players']
+        game.away_players = data['away_players']
+        game.timeline = data['timeline']
+
+        state = GameState[data['state']]
+        if state == GameState.ENDED and game.state != GameState.ENDED:
+            # Ending goes through the game itself so the owning cup re-runs bracket propagation.
+            game.state = GameState.PAUSED
+            game.end()
+        else:
+            game.state = state
+        game.total_time = data['total_time']
+        game.gametime = monotonic()
+        if state != GameState.ENDED:
+            # Live mutations notify observers too; keeps cup versions and standings in step.
+            game._notify()
+
+    elif kind == 'playoffs':
+        # Cup.auto_playoffs is off during the replay, so the bracket is generated
+        # here, after the same records as when it was first generated.
+        if repository._last_id != data['last_id']:
+            raise ValueError(f"Journal is out of sync with the snapshot at the playoffs of cup {data['id']}.")
+        repository._objects[data['id']]['instance'].generate_playoffs()
+
+    elif kind == 'user':
+        with users_lock:
+            registered_users.add(data['name'])
+            user_watches[data['name']] = data['watches']
+            cup_watch_sources[data['name']] = data['cup_sources']
+
+    elif kind == 'attach':
+        if data['id'] in repository._objects:
+            repository._attachments[data['id']] = data['users']
+
+    else:
+        raise ValueError(f"Unknown journal record kind '{kind}'")
+
+
+def touch_cups_with(team: Team) -> None:
+    """Bumps the version of every cup the team plays in, since cached views show its name."""
+    for _, cup in repository.cups():
+        if any(t is team for t in cup.teams):
+            cup.touch()
+
+
+# Per-thread persistence collected while a BATCH runs: {"records": [...], "snapshot": bool}.
+deferred_persist = threading.local()
+replaying = False  # Set while replay_journal applies records that are already durable.
+
+
+def persist(*records: Tuple[str, Dict[str, Any]], snapshot: bool = False) -> None:
+    """
+    Schedules a mutation to be made durable by the persistence thread. With the journal
+    enabled only the given records are written, so the cost of a write does not depend
+    on the size of the repository. Structural changes pass `snapshot=True` instead.
+    Inside a BATCH the mutation is collected and submitted once the batch ends.
+    """
+    if replaying:
+        return
+    batch = getattr(deferred_persist, "batch", None)
+    if batch is not None:
+        batch["records"].extend(records)
+        batch["snapshot"] = batch["snapshot"] or snapshot or not JOURNAL_ENABLED
+        return
+    with repo_lock:
+        if snapshot or not JOURNAL_ENABLED:
+            persistence.submit(snapshot=True)
+        else:
+            persistence.submit(journal.encode(list(records)), len(records))
+
+
+def save_state():
+    """
+    Implements persistency by saving the entire repository to a pickle file.
+    This can be triggered by a client command or on server shutdown.
+    With the journal enabled this also acts as compaction: the snapshot covers
+    every record appended so far, so the journal is emptied afterwards.
+    Only the pickling holds `repo_lock` (shared); writes carry on while the file
+    is written and fsynced, as their journal records follow the snapshot.
+    """
+    try:
+        with repo_lock.read():
+            # Save both repository and registered users
+            with users_lock:
+                saved_data = {
+                    'repository': repository,
+                    'users': registered_users,
+                    'user_watches': user_watches,
+                    'cup_watch_sources': cup_watch_sources,
+                    'journal_seq': journal.seq
+                }
+                payload = pickle.dumps(saved_data)
+                users, watches = len(registered_users), sum(len(v) for v in user_watches.values())
+
+        # Use a temporary file for atomic write to prevent corruption
+        temp_file = f"{SAVE_FILE}.tmp"
+        with open(temp_file, 'wb') as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        print(f"DEBUG: Saved state. Users: {users}, Watches: {watches}")
+        os.replace(temp_file, SAVE_FILE)
+        if JOURNAL_ENABLED:
+            journal.truncate()
+        print(f"Server state saved to '{SAVE_FILE}'.")
+    except Exception as e:
+        print(f"Error saving state: {e}")
 
 
 if __name__ == "__main__":
     load_state()
-    
-    # Starts the WebSocket server; 'serve' spawns a new thread for each client connection.
-    print(f"WebSocket Server listening on {HOST}:{PORT}...")
+    persistence.start()
+    if EVENT_BUS_ENABLED:
+        events.start()
+
+    mode = 'asyncio' if '--async' in sys.argv[1:] else SERVER_MODE
+    print(f"WebSocket Server listening on {HOST}:{PORT} ({mode} mode)...")
     try:
-        # The 'serve' context manager handles connection listening and thread dispatching.
-        with serve(agent, HOST, PORT) as server:
-            server.serve_forever()
+        if mode == 'asyncio':
+            # One event loop serves every connection; see async_agent.
+            asyncio.run(serve_asyncio())
+        else:
+            # Starts the WebSocket server; 'serve' spawns a new thread for each client connection.
+            # The 'serve' context manager handles connection listening and thread dispatching.
+            with serve(agent, HOST, PORT) as server:
+                server.serve_forever()
     except KeyboardInterrupt:
         print("\nServer shutting down.")
     finally:
+        events.stop()
+        persistence.stop()
         save_state()
         # Force exit to prevent hanging on non-daemon threads from the websocket server.
         os._exit(0)
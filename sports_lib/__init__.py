@@ -2,4 +2,7 @@ from .repo import Repo
 from .team import Team, PlaceholderTeam
 from .game import Game
 from .cup import Cup
+from .events import EventBus
+from .rwlock import RWLock
+from .snapshot import RepoSnapshot, SnapshotPublisher
 from .constants import GameState, CupType, GameSettings
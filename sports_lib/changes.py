@@ -0,0 +1,72 @@
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class ChangeLog:
+    """Global mutation sequence and a bounded log of which objects changed when.
+
+    Every change takes the next sequence number. The log keeps only the latest
+    change of each object, oldest first, so it holds at most one entry per
+    object; beyond `limit` entries the oldest are forgotten, and `since()` then
+    reports that it can no longer answer for older sequence numbers.
+
+    Only the sequence number survives pickling: a restored log starts empty,
+    so clients that synced before the restart are sent a full snapshot. Every
+    log, restored ones included, gets a new random `epoch`; a cursor that
+    carries the epoch of another run is never answered from the log, even
+    where the sequence numbers coincide.
+    """
+
+    def __init__(self, limit: int = 10000) -> None:
+        """Initializes an empty log holding at most `limit` objects."""
+        self.limit = limit
+        self.seq = 0
+        self.floor = 0  # Every change after this sequence number is in the log.
+        self.epoch = uuid.uuid4().hex  # Identifies this run's sequence numbers.
+        self._log: "OrderedDict[int, Tuple[int, bool]]" = OrderedDict()  # ID -> (seq, deleted)
+
+    def __len__(self) -> int:
+        return len(self._log)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """Keeps the sequence number only; the entries are not worth persisting."""
+        return {"limit": self.limit, "seq": self.seq}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        """Restores an empty log that continues the sequence."""
+        self.__init__(state["limit"])
+        self.seq = self.floor = state["seq"]
+
+    def record(self, oid: int, deleted: bool = False) -> int:
+        """Records a change (or the deletion) of an object and returns its sequence number."""
+        self.seq += 1
+        self._log[oid] = (self.seq, deleted)
+        self._log.move_to_end(oid)
+        while len(self._log) > self.limit:
+            _, (seq, _) = self._log.popitem(last=False)
+            self.floor = seq
+        return self.seq
+
+    def since(self, seq: int, epoch: Optional[str] = None) -> Optional[List[Tuple[int, bool]]]:
+        """Returns the objects changed after `seq` as (ID, deleted) pairs, oldest change first.
+
+        Args:
+            seq: Sequence number the caller is up to date with.
+            epoch: The `epoch` that came with `seq`, if the caller kept it.
+
+        Returns:
+            Optional[List[Tuple[int, bool]]]: None if the log no longer reaches back to
+            `seq`, if `seq` is ahead of the log, or if it belongs to another epoch
+            (e.g. from before a restart).
+        """
+        if seq < self.floor or seq > self.seq or (epoch is not None and epoch != self.epoch):
+            return None
+        changed: List[Tuple[int, bool]] = []
+        for oid in reversed(self._log):
+            entry_seq, deleted = self._log[oid]
+            if entry_seq <= seq:
+                break
+            changed.append((oid, deleted))
+        changed.reverse()
+        return changed
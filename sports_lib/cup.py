@@ -1,17 +1,149 @@
 # cup.py
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Set, Tuple
 from datetime import datetime, timedelta
+from bisect import bisect_left, bisect_right, insort
 from itertools import combinations
 from .constants import GameState, CupType
 from .game import Game
 from .team import Team, PlaceholderTeam
+from .pubsub import SubscriptionRegistry, topic
 import random
 import string
+import threading
+
+
+class WatchFilter:
+    """Cup watch parameters compiled once into a predicate over games."""
+
+    def __init__(
+        self,
+        tname: Optional[str] = None,
+        group: Optional[str] = None,
+        between: Optional[Tuple[datetime, datetime]] = None,
+    ) -> None:
+        """Compiles the parameters accepted by `Cup.watch`.
+
+        An empty value (e.g. tname="") sets no condition, just like a missing one.
+        """
+        tname, group, between = tname or None, group or None, between or None
+        self.params = {
+            key: value
+            for key, value in (("tname", tname), ("group", group), ("between", between))
+            if value is not None
+        }
+        self.tname = tname.casefold() if tname is not None else None
+        self.group = group
+        self.between = between
+
+    def bucket(self) -> str:
+        """Returns the index key of the filter: its most selective condition."""
+        if self.tname is not None:
+            return f"team:{self.tname}"
+        if self.group is not None:
+            return f"group:{self.group}"
+        return "all"
+
+    def matches(self, game: Game) -> bool:
+        """Checks whether the game satisfies every condition of the filter."""
+        if self.tname is not None and (
+            game.home().team_name.casefold() != self.tname
+            and game.away().team_name.casefold() != self.tname
+        ):
+            return False
+        if self.group is not None and game.group != self.group:
+            return False
+        if self.between is not None and not (self.between[0] <= game.datetime <= self.between[1]):
+            return False
+        return True
+
+
+class GameSearchIndex:
+    """Team-name, group and date indexes over a cup's games, used by `Cup.search`.
+
+    Games are identified by their position in `Cup.games`, which only grows, so
+    results come back in the cup's game order. `sync` indexes newly appended
+    games and `refresh` re-indexes a game whose teams, group or date changed.
+    """
+
+    def __init__(self) -> None:
+        """Initializes an empty index."""
+        self.count = 0  # Games of the cup indexed so far.
+        self.positions: Dict[int, int] = {}  # Game ID -> position in Cup.games.
+        self.keys: Dict[int, Tuple[Tuple[str, str], Any, datetime]] = {}  # Position -> indexed keys.
+        self.by_team: Dict[str, Set[int]] = {}  # Case-folded team name -> positions.
+        self.by_group: Dict[Any, Set[int]] = {}
+        self.dates: List[Tuple[datetime, int]] = []  # (datetime, position), sorted.
+
+    @staticmethod
+    def _keys_of(game: Game) -> Tuple[Tuple[str, str], Any, datetime]:
+        names = (game.home().team_name.casefold(), game.away().team_name.casefold())
+        return names, game.group, game.datetime
+
+    def _add(self, position: int, game: Game) -> None:
+        keys = self._keys_of(game)
+        names, group, when = keys
+        self.keys[position] = keys
+        for name in names:
+            self.by_team.setdefault(name, set()).add(position)
+        self.by_group.setdefault(group, set()).add(position)
+        insort(self.dates, (when, position))
+
+    def _remove(self, position: int) -> None:
+        names, group, when = self.keys.pop(position)
+        for name in names:
+            self.by_team[name].discard(position)
+        self.by_group[group].discard(position)
+        del self.dates[bisect_left(self.dates, (when, position))]
+
+    def sync(self, games: List[Game]) -> None:
+        """Indexes the games appended since the last call."""
+        while self.count < len(games):
+            game = games[self.count]
+            self.positions[game.id()] = self.count
+            self._add(self.count, game)
+            self.count += 1
+
+    def refresh(self, game: Game) -> None:
+        """Re-indexes a game after a change, if it is indexed and its keys moved."""
+        position = self.positions.get(game.id())
+        if position is None or self.keys[position] == self._keys_of(game):
+            return
+        self._remove(position)
+        self._add(position, game)
+
+    def search(
+        self,
+        tname: Optional[str],
+        group: Optional[str],
+        between: Optional[Tuple[datetime, datetime]],
+    ) -> List[int]:
+        """Returns the sorted positions of the games matching every given condition."""
+        candidates: List[Any] = []
+        if tname is not None:
+            candidates.append(self.by_team.get(tname.casefold(), set()))
+        if group is not None:
+            candidates.append(self.by_group.get(group, set()))
+        if between is not None:
+            start, end = between
+            low = bisect_left(self.dates, (start,))
+            high = bisect_right(self.dates, (end, float("inf")))
+            candidates.append({position for _, position in self.dates[low:high]})
+        if not candidates:
+            return list(range(self.count))
+
+        # Walk the smallest candidate set and probe the others.
+        candidates.sort(key=len)
+        smallest, rest = candidates[0], candidates[1:]
+        return sorted(p for p in smallest if all(p in other for other in rest))
 
 
 class Cup:
     """A container for a collection of games (e.g., a tournament)."""
 
+    # When False, finishing the group stage no longer generates the playoffs by
+    # itself; the caller does it (e.g. a journal replay, at the recorded point).
+    auto_playoffs: bool = True
+
     def __init__(
         self,
         teams: List[Team],
@@ -29,9 +161,22 @@ class Cup:
         self.cup_type = cup_type
         self.interval = interval
         self.games: List[Game] = []
-        self._observers: List[Any] = []
+        self._games_by_id: Dict[int, Game] = {}  # Game ID -> Game, for O(1) lookups.
+        # Bracket dependency graph: source game ID -> [(dependent game ID, "home"/"away")].
+        self._dependents: Dict[int, List[Tuple[int, str]]] = {}
+        # Memoized placeholder resolutions: placeholder -> resolved Team or description.
+        self._resolved: Dict[PlaceholderTeam, Team | str] = {}
+        # Search indexes, built on the first search and then kept up to date.
+        self._search_index: Optional[GameSearchIndex] = None
+        # Guards the state built lazily by reads (search index, standings,
+        # placeholder resolutions), so concurrent readers do not build it twice.
+        self._derived_lock = threading.RLock()
+        # Cup watchers subscribe under topic "cup:<id>" with their search parameters.
+        self.subscriptions: SubscriptionRegistry = kwargs.get("subscriptions") or SubscriptionRegistry()
         self._game_id_counter = 1
         self._current_date = datetime.now()
+        # Seeds the playoff draw, so generating the playoffs again gives the same bracket.
+        self.seed: int = kwargs.get("seed", random.randrange(2**32))
 
         # Elimination-specific structure to hold rounds of games.
         self.rounds: List[List[Game]] = []
@@ -43,6 +188,14 @@ class Cup:
         self.group_games: Dict[str, List[Game]] = {}
         self.playoff_games: List[Game] = []
 
+        # Incremental standings, built lazily from the games and then kept up to date
+        # by game notifications. Keyed by group name (None for a league table).
+        self._standings_rows: Optional[Dict[Optional[str], Dict[Team, List[int]]]] = None
+        self._standings_results: Dict[int, Tuple[Any, ...]] = {}
+        self._standings_sorted: Dict[Optional[str], List[Tuple[Team, List[int]]]] = {}
+        self.standings_version = 0  # Bumped whenever a finished result changes a table.
+        self.version = 0  # Bumped by any change to the cup or one of its games.
+
         self._generate_games()
 
     # CRUD Methods
@@ -63,10 +216,34 @@ class Cup:
 
         if "interval" in kw:
             self.interval = kw["interval"]
+            self.touch()
+
+    def topic(self) -> str:
+        """Returns the subscription topic of the cup."""
+        return topic("cup", self.id_)
+
+    def _watch_topic(self, key: str) -> str:
+        """Returns the index topic of cup watch filters with the given bucket key."""
+        return f"{self.topic()}/{key}"
+
+    def touch(self) -> None:
+        """Marks the cup as changed, e.g. after one of its teams was renamed."""
+        self._bump_version()
+        # Team names are indexed, so a rename invalidates the search index.
+        self._search_index = None
+
+    def _bump_version(self) -> None:
+        """Bumps the cup's version and records the change in its repo's change log."""
+        self.version += 1
+        if self.repo is not None:
+            self.repo.changed(self.id_)
 
     def delete(self) -> None:
         """Deletes the cup and cleans up resources."""
-        self._observers.clear()
+        for obj, watch_filters in self.subscriptions.subscriptions(self.topic()):
+            for bucket in {watch_filter.bucket() for watch_filter in watch_filters}:
+                self.subscriptions.unsubscribe(self._watch_topic(bucket), obj)
+        self.subscriptions.drop_topic(self.topic())
         # Cascade deletion to the repository for managed games
         if self.repo:
             for game in list(self.games):
@@ -75,32 +252,63 @@ class Cup:
                 except (ValueError, KeyError):
                     pass
         self.games.clear()
+        self._games_by_id.clear()
+        self._dependents.clear()
+        self._resolved.clear()
+        self._search_index = None
         self.rounds.clear()
         self.groups.clear()
         self.group_games.clear()
+        self._standings_rows = None
 
     def __getitem__(self, gameid: int) -> Game:
         """Provides dictionary-style access to games by their ID."""
-        for game in self.games:
-            if game.id() == gameid:
-                return game
-
-        raise KeyError(f"Game with ID {gameid} not found in this cup")
+        game = self._games_by_id.get(gameid)
+        if game is None:
+            raise KeyError(f"Game with ID {gameid} not found in this cup")
+        return game
 
     # Exclude observers from serialization to prevent pickling errors.
     def __getstate__(self):
         state = self.__dict__.copy()
-        state["_observers"] = []
+        state.pop("subscriptions", None)
+        state.pop("_derived_lock", None)
+        # Standings tables are derived from the games and rebuilt on first use.
+        state["_standings_rows"] = None
+        state["_standings_results"] = {}
+        state["_standings_sorted"] = {}
+        state["_resolved"] = {}
+        state["_search_index"] = None
         return state
 
     # Restore state and re-initialize observers to maintain tournament logic after loading.
     def __setstate__(self, state):
+        state.pop("_observers", None)  # Pre-registry pickles.
         self.__dict__.update(state)
-        if "_observers" not in self.__dict__:
-            self._observers = []
+        # Keep the registry of a repo restored before the cup, if any.
+        self.subscriptions = self.__dict__.get("subscriptions") or SubscriptionRegistry()
+        self.__dict__.setdefault("_standings_rows", None)
+        self.__dict__.setdefault("_standings_results", {})
+        self.__dict__.setdefault("_standings_sorted", {})
+        self.__dict__.setdefault("standings_version", 0)
+        self.__dict__.setdefault("version", 0)
+        self.__dict__.setdefault("_resolved", {})
+        self.__dict__.setdefault("_search_index", None)
+        self.__dict__.setdefault("seed", self.id_)
+        self._derived_lock = threading.RLock()
+
+        # Rebuild the ID map and the bracket graph (older pickles do not have them).
+        self._games_by_id = {game.id(): game for game in self.games}
+        self._dependents = {}
+        for game in self.games:
+            self._register_dependencies(game)
 
-        # Re-subscribe to games to continue monitoring for group completion and bracket updates.
-        
+        for game in self.games:
+            game.subscriptions = self.subscriptions
+        self._watch_games()
+
+    def _watch_games(self) -> None:
+        """(Re-)subscribes the cup to its games for group completion and bracket updates."""
         for game in self.games:
             try:
                 game.watch(self)
@@ -202,42 +410,30 @@ class Cup:
                 id_=self._game_id_counter,
                 datetime=datetime,
                 group=group,
+                subscriptions=self.subscriptions,
             )
             self._game_id_counter += 1
 
+        self._games_by_id[game.id()] = game
+
         # Attach existing cup observers to the new game
         # This ensures that if games are generated dynamically (e.g. Playoffs),
-        # existing observers start watching them immediately.
-        for entry in self._observers:
-            observer = entry["observer"]
-            params = entry["params"]
-
-            # Check if game matches params
-            matches = True
-            if params:
-                tname = params.get("tname")
-                group_param = params.get("group")
-                between = params.get("between")
-
-                if tname:
-                    if not (game.home().team_name.lower() == tname.lower() or
-                            game.away().team_name.lower() == tname.lower()):
-                        matches = False
-
-                if group_param and matches:
-                    if game.group != group_param:
-                        matches = False
-
-                if between and matches:
-                    s, e = between
-                    if not (s <= game.datetime <= e):
-                        matches = False
-
-            if matches:
-                try:
-                    game.watch(observer)
-                except ValueError:
-                    pass
+        # existing observers start watching them immediately. Only the filters
+        # indexed under the game's teams, its group or "all" can match.
+        keys = [f"team:{game.home().team_name.casefold()}"]
+        if game.away().team_name.casefold() != game.home().team_name.casefold():
+            keys.append(f"team:{game.away().team_name.casefold()}")
+        if game.group is not None:
+            keys.append(f"group:{game.group}")
+        keys.append("all")
+
+        for key in keys:
+            for observer, watch_filters in self.subscriptions.subscriptions(self._watch_topic(key)):
+                if any(watch_filter.matches(game) for watch_filter in watch_filters):
+                    try:
+                        game.watch(observer)
+                    except ValueError:
+                        pass
 
         # The Cup itself must watch the game to handle bracket progression (placeholders)
         # and group stage completion triggers.
@@ -254,31 +450,17 @@ class Cup:
         group: Optional[str] = None,
         between: Optional[Tuple[datetime, datetime]] = None,
     ) -> List[Game]:
-        """Filters and returns games based on specified criteria."""
-        results: List[Game] = []
-
-        for game in self.games:
-            matches = True
-
-            if tname is not None:
-                home_match = game.home().team_name.lower() == tname.lower()
-                away_match = game.away().team_name.lower() == tname.lower()
-                if not (home_match or away_match):
-                    matches = False
-
-            if between is not None and matches:
-                start_date, end_date = between
-                if not (start_date <= game.datetime <= end_date):
-                    matches = False
+        """Filters and returns games based on specified criteria.
 
-            if group is not None and matches:
-                if game.group != group:
-                    matches = False
-
-            if matches:
-                results.append(game)
-
-        return results
+        Team names are compared case-insensitively. Uses the cup's search indexes,
+        so a query costs O(log n + k) for k candidate games.
+        """
+        with self._derived_lock:
+            if self._search_index is None:
+                self._search_index = GameSearchIndex()
+            self._search_index.sync(self.games)
+            positions = self._search_index.search(tname, group, between)
+        return [self.games[p] for p in positions]
 
     def standings(
         self,
@@ -314,67 +496,8 @@ class Cup:
     def _calculate_league_standings(
         self,
     ) -> List[Tuple[str, int, int, int, int, int, int]]:
-        """Calculates a sorted league table based on game results."""
-        stats: Dict[str, Dict[str, int]] = {}
-
-        for team in self.teams:
-            stats[team.team_name] = {
-                "won": 0,
-                "draw": 0,
-                "lost": 0,
-                "goals_for": 0,
-                "goals_against": 0,
-                "points": 0,
-            }
-
-        for game in self.games:
-            # Standings should only reflect completed games.
-            if game.state != GameState.ENDED:
-                continue
-
-            home_team = game.home().team_name
-            away_team = game.away().team_name
-            home_score = game.home_score
-            away_score = game.away_score
-
-            stats[home_team]["goals_for"] += home_score
-            stats[home_team]["goals_against"] += away_score
-            stats[away_team]["goals_for"] += away_score
-            stats[away_team]["goals_against"] += home_score
-
-            if home_score > away_score:
-                stats[home_team]["won"] += 1
-                stats[home_team]["points"] += 2
-                stats[away_team]["lost"] += 1
-            elif home_score < away_score:
-                stats[away_team]["won"] += 1
-                stats[away_team]["points"] += 2
-                stats[home_team]["lost"] += 1
-            else:
-                # draw
-                stats[home_team]["draw"] += 1
-                stats[home_team]["points"] += 1  # draw = 1 point
-                stats[away_team]["draw"] += 1
-                stats[away_team]["points"] += 1
-
-        standings_list: List[Tuple[str, int, int, int, int, int, int]] = []
-        for team_name, team_stats in stats.items():
-            standings_list.append(
-                (
-                    team_name,
-                    team_stats["won"],
-                    team_stats["draw"],
-                    team_stats["lost"],
-                    team_stats["goals_for"],
-                    team_stats["goals_against"],
-                    team_stats["points"],
-                )
-            )
-
-        # Sort by points, then by goal difference as a tie-breaker.
-        standings_list.sort(key=lambda x: (x[6], x[4] - x[5]), reverse=True)
-
-        return standings_list
+        """Returns the sorted league table, maintained incrementally from game results."""
+        return self._standings_table(None)
 
     def watch(self, obj: Any, **searchparams: Any) -> None:
         """Adds an observer to games matching the given search parameters."""
@@ -386,14 +509,22 @@ class Cup:
         if unknown:
             raise ValueError(f"Unknown search parameters: {unknown}. Valid: {valid_params}")
 
-        observer_entry = {"observer": obj, "params": searchparams}
-        if observer_entry in self._observers:
+        cup_topic = self.topic()
+        watch_filter = WatchFilter(**searchparams)
+        current = self.subscriptions.params(cup_topic, obj) or ()
+        if any(existing.params == watch_filter.params for existing in current):
             raise ValueError(f"Observer {obj} is already watching Cup {self.id_} with these parameters.")
 
-        self._observers.append(observer_entry)
+        # Each parameter set adds a filter; the subscription parameters are the
+        # observer's filters, and each filter is also indexed under its most
+        # selective condition, for matching new games.
+        self.subscriptions.subscribe(cup_topic, obj, current + (watch_filter,))
+        bucket_topic = self._watch_topic(watch_filter.bucket())
+        bucket = self.subscriptions.params(bucket_topic, obj) or ()
+        self.subscriptions.subscribe(bucket_topic, obj, bucket + (watch_filter,))
 
         # Attach the observer to all existing and future games that match.
-        matching_games = self.search(**searchparams)
+        matching_games = self.search(**watch_filter.params)
         for game in matching_games:
             try:
                 game.watch(obj)
@@ -401,21 +532,18 @@ class Cup:
                 pass
 
     def unwatch(self, obj: Any) -> None:
-        """Removes an observer from all games in the cup."""
-        is_watching = any(entry["observer"] == obj for entry in self._observers)
-        if not is_watching:
+        """Removes an observer, with all its filters, from all games in the cup."""
+        watch_filters = self.subscriptions.params(self.topic(), obj) or ()
+        if not self.subscriptions.unsubscribe(self.topic(), obj):
             raise ValueError(f"Observer {obj} is not watching Cup {self.id_}.")
+        for bucket in {watch_filter.bucket() for watch_filter in watch_filters}:
+            self.subscriptions.unsubscribe(self._watch_topic(bucket), obj)
 
-        self._observers = [
-            entry for entry in self._observers if entry["observer"] != obj
-        ]
-
-        # Remove the observer from all games
-        for game in self.games:
-            try:
-                game.unwatch(obj)
-            except ValueError:
-                pass
+        # Remove the observer from all games, going by its own subscriptions.
+        for name in self.subscriptions.topics_of(obj):
+            kind, _, oid = name.partition(":")
+            if kind == "game" and int(oid) in self._games_by_id:
+                self.subscriptions.unsubscribe(name, obj)
 
     def _generate_elimination(self, double: bool = False) -> None:
         """Generates a multi-round elimination (knockout) bracket.
@@ -506,6 +634,7 @@ class Cup:
             game = self._create_game_instance(
                 home=home_team, away=away_team, datetime=current_date
             )
+            self._register_dependencies(game)
             round_games.append(game)
             current_date += self.interval
 
@@ -515,11 +644,19 @@ class Cup:
                     away=home_team,
                     datetime=current_date,
                 )
+                self._register_dependencies(game2)
                 round_games.append(game2)
                 current_date += self.interval
 
         return round_games
 
+    def _register_dependencies(self, game: Game) -> None:
+        """Adds bracket edges from the source games of a game's placeholder slots."""
+        for side, team in (("home", game.home_), ("away", game.away_)):
+            if isinstance(team, PlaceholderTeam):
+                for source_id in team.source_games:
+                    self._dependents.setdefault(source_id, []).append((game.id(), side))
+
     def gametree(self) -> Dict[str, List[Dict[str, Any]]]:
         """Generates a structured view of the tournament bracket.
 
@@ -751,67 +888,110 @@ class Cup:
     def _calculate_group_standings(
         self, group_name: str
     ) -> List[Tuple[str, int, int, int, int, int, int]]:
-        """Calculates the league table for a single group."""
-        group_teams = self.groups[group_name]
-
-        stats: Dict[str, Dict[str, int]] = {}
-        for team in group_teams:
-            stats[team.team_name] = {
-                "won": 0,
-                "draw": 0,
-                "lost": 0,
-                "goals_for": 0,
-                "goals_against": 0,
-                "points": 0,
-            }
-
-        group_games = self.group_games[group_name]
-
-        for game in group_games:
-            if game.state != GameState.ENDED:
-                continue
+        """Returns the league table for a single group, maintained incrementally."""
+        return self._standings_table(group_name)
 
-            home_team = game.home().team_name
-            away_team = game.away().team_name
-            home_score = game.home_score
-            away_score = game.away_score
-
-            stats[home_team]["goals_for"] += home_score
-            stats[home_team]["goals_against"] += away_score
-            stats[away_team]["goals_for"] += away_score
-            stats[away_team]["goals_against"] += home_score
-
-            if home_score > away_score:
-                stats[home_team]["won"] += 1
-                stats[home_team]["points"] += 2
-                stats[away_team]["lost"] += 1
-            elif home_score < away_score:
-                stats[away_team]["won"] += 1
-                stats[away_team]["points"] += 2
-                stats[home_team]["lost"] += 1
-            else:
-                stats[home_team]["draw"] += 1
-                stats[home_team]["points"] += 1
-                stats[away_team]["draw"] += 1
-                stats[away_team]["points"] += 1
-
-        standings_list: List[Tuple[str, int, int, int, int, int, int]] = []
-        for team_name, team_stats in stats.items():
-            standings_list.append(
-                (
-                    team_name,
-                    team_stats["won"],
-                    team_stats["draw"],
-                    team_stats["lost"],
-                    team_stats["goals_for"],
-                    team_stats["goals_against"],
-                    team_stats["points"],
-                )
-            )
+    def _standings_key(self, game: Game) -> Tuple[bool, Optional[str]]:
+        """Returns (counts, table key) telling whether and where a game affects standings."""
+        if self.cup_type in [CupType.LEAGUE, CupType.LEAGUE2]:
+            return True, None
+        if self.cup_type in [CupType.GROUP, CupType.GROUP2] and game.group in self.groups:
+            return True, game.group
+        return False, None
+
+    def _rebuild_standings(self) -> None:
+        """Builds every standings table from scratch out of the current game results."""
+        self._standings_rows = {}
+        self._standings_results = {}
+        self._standings_sorted = {}
+
+        if self.cup_type in [CupType.LEAGUE, CupType.LEAGUE2]:
+            self._standings_rows[None] = {team: [0] * 6 for team in self.teams}
+        elif self.cup_type in [CupType.GROUP, CupType.GROUP2]:
+            for group_name, group_teams in self.groups.items():
+                self._standings_rows[group_name] = {team: [0] * 6 for team in group_teams}
+
+        for game in self.games:
+            self._update_standings(game)
+
+    def _update_standings(self, game: Game) -> None:
+        """Applies the change in a game's finished result to its standings table.
+
+        Each game remembers the result it contributed, so a game that ends (or a
+        finished game whose result is corrected) costs a constant-time delta.
+        """
+        counts, key = self._standings_key(game)
+        new_result = None
+        if counts and game.state == GameState.ENDED:
+            new_result = (key, game.home(), game.away(), game.home_score, game.away_score)
+
+        old_result = self._standings_results.get(game.id())
+        if old_result == new_result:
+            return
+
+        if old_result is not None:
+            self._apply_standings_delta(old_result, -1)
+            del self._standings_results[game.id()]
+        if new_result is not None:
+            self._apply_standings_delta(new_result, 1)
+            self._standings_results[game.id()] = new_result
+        self.standings_version += 1
+
+    def _apply_standings_delta(self, result: Tuple[Any, ...], sign: int) -> None:
+        """Adds (sign=1) or removes (sign=-1) one finished result from a table.
+
+        Row layout: [won, draw, lost, goals_for, goals_against, points].
+        """
+        key, home, away, home_score, away_score = result
+        table = self._standings_rows.setdefault(key, {})
+        home_row = table.setdefault(home, [0] * 6)
+        away_row = table.setdefault(away, [0] * 6)
+
+        home_row[3] += sign * home_score
+        home_row[4] += sign * away_score
+        away_row[3] += sign * away_score
+        away_row[4] += sign * home_score
+
+        if home_score > away_score:
+            home_row[0] += sign
+            home_row[5] += sign * 2
+            away_row[2] += sign
+        elif home_score < away_score:
+            away_row[0] += sign
+            away_row[5] += sign * 2
+            home_row[2] += sign
+        else:
+            # draw = 1 point each
+            home_row[1] += sign
+            home_row[5] += sign
+            away_row[1] += sign
+            away_row[5] += sign
 
-        standings_list.sort(key=lambda x: (x[6], x[4] - x[5]), reverse=True)
+        self._standings_sorted.pop(key, None)
 
-        return standings_list
+    def _standings_table(
+        self, key: Optional[str]
+    ) -> List[Tuple[str, int, int, int, int, int, int]]:
+        """Returns a table as (team, won, draw, lost, gf, ga, points) tuples.
+
+        The sort order is cached until the next result changes the table, so a read
+        only costs rendering the rows.
+        """
+        with self._derived_lock:
+            if self._standings_rows is None:
+                self._rebuild_standings()
+
+            ordered = self._standings_sorted.get(key)
+            if ordered is None:
+                # Sort by points, then by goal difference as a tie-breaker.
+                ordered = sorted(
+                    self._standings_rows.get(key, {}).items(),
+                    key=lambda item: (item[1][5], item[1][3] - item[1][4]),
+                    reverse=True,
+                )
+                self._standings_sorted[key] = ordered
+
+        return [(team.team_name, *row) for team, row in ordered]
 
     def generate_playoffs(self) -> None:
         """Generates the COMPLETE playoff bracket after group stage.
@@ -873,7 +1053,9 @@ class Cup:
                 wild_cards.append((team, grp))
 
         # Create cross-group seeded bracket
-        playoff_teams = self._create_cross_group_seeding(qualified_by_position, wild_cards)
+        playoff_teams = self._create_cross_group_seeding(
+            qualified_by_position, wild_cards, random.Random(self.seed)
+        )
 
         print(f"\n   Total playoff teams: {len(playoff_teams)}.")
 
@@ -884,11 +1066,13 @@ class Cup:
 
         # Generate COMPLETE playoff bracket (all rounds)
         self._generate_playoff_bracket(playoff_teams, double)
+        self.touch()
 
     def _create_cross_group_seeding(
         self,
         qualified_by_position: Dict[int, List[Tuple[Team, str]]],
-        wild_cards: List[Tuple[Team, str]]
+        wild_cards: List[Tuple[Team, str]],
+        rng: random.Random,
     ) -> List[Team]:
         """Creates a seeded playoff bracket with cross-group matchups.
 
@@ -898,6 +1082,7 @@ class Cup:
         Args:
             qualified_by_position: Teams organized by their group position
             wild_cards: Wild card teams with their group names
+            rng: Random generator for the shuffles, seeded from the cup
 
         Returns:
             List of teams in seeded order for bracket creation
@@ -915,8 +1100,8 @@ class Cup:
         other_qualified.extend(wild_cards)
 
         # Shuffle within same-position teams to add variety
-        random.shuffle(first_place)
-        random.shuffle(other_qualified)
+        rng.shuffle(first_place)
+        rng.shuffle(other_qualified)
 
         # Create cross-group pairings
         # Strategy: Pair 1st place from one group with 2nd/wild from different group
@@ -1109,6 +1294,8 @@ class Cup:
         """Resolves a placeholder team to actual winner if game is played.
 
         Recursively resolves nested placeholders (e.g., Winner of Winner of Game X).
+        Resolutions are memoized per placeholder until one of the games upstream
+        of it changes (see _invalidate_resolutions).
 
         Args:
             team: Team object (could be PlaceholderTeam or real Team)
@@ -1116,12 +1303,28 @@ class Cup:
         Returns:
             Team name (either real team name or placeholder description)
         """
-        # If real team, return its name
-        if not isinstance(team, PlaceholderTeam):
-            return team.team_name
+        resolved = self._resolve_placeholder_team(team)
+        return resolved.team_name if isinstance(resolved, Team) else resolved
+
+    def _resolve_placeholder_team(self, team: Team) -> Team | str:
+        """Returns the real team a placeholder stands for, or its description if unknown.
 
-        # If placeholder, check its source games
-        placeholder: PlaceholderTeam = team
+        The resolved Team (not its name) is cached so renaming a team stays visible.
+        """
+        # If real team, return it
+        if not isinstance(team, PlaceholderTeam):
+            return team
+
+        # Reads fill the memo while holding repo_lock only for reading.
+        with self._derived_lock:
+            cached = self._resolved.get(team)
+            if cached is None:
+                cached = self._compute_placeholder(team)
+                self._resolved[team] = cached
+        return cached
+
+    def _compute_placeholder(self, placeholder: PlaceholderTeam) -> Team | str:
+        """Resolves a placeholder from the results of its source games."""
         source_games = placeholder.source_games
 
         # If single game source
@@ -1132,7 +1335,7 @@ class Cup:
             if source_game and source_game.state == GameState.ENDED:
                 winner = self._get_game_winner(source_game)
                 if winner:
-                    return self._resolve_placeholder(winner)
+                    return self._resolve_placeholder_team(winner)
 
             return f"Winner of Game {game_id}"
 
@@ -1170,28 +1373,63 @@ class Cup:
                     score_b += g2.away_score
 
                 if score_a > score_b:
-                    return self._resolve_placeholder(team_a)
+                    return self._resolve_placeholder_team(team_a)
                 elif score_b > score_a:
-                    return self._resolve_placeholder(team_b)
+                    return self._resolve_placeholder_team(team_b)
 
             return f"Winner of Games [{game_ids_str}]"
 
+    def _invalidate_resolutions(self, game: Game) -> None:
+        """Drops memoized resolutions that may depend on the given game.
+
+        A placeholder only reads the games upstream of its slot, so it is enough to
+        walk the bracket graph forward from the changed game.
+        """
+        if not self._resolved:
+            return
+
+        stack = [game.id()]
+        visited = set(stack)
+        while stack:
+            source_id = stack.pop()
+            for game_id, side in self._dependents.get(source_id, []):
+                dependent = self._games_by_id.get(game_id)
+                if dependent is None:
+                    continue
+                slot = dependent.home_ if side == "home" else dependent.away_
+                if isinstance(slot, PlaceholderTeam):
+                    self._resolved.pop(slot, None)
+                if game_id not in visited:
+                    visited.add(game_id)
+                    stack.append(game_id)
+
     def _handle_game_notification(self, game: Game) -> None:
-        """Internal observer handler to trigger playoffs when group stage ends."""
+        """Internal observer handler to keep standings current and drive the bracket."""
+        self._bump_version()
+        self._invalidate_resolutions(game)
+
+        if self._standings_rows is not None:
+            self._update_standings(game)
+
         if game.state == GameState.ENDED:
             # Update any downstream games that depend on this game's winner
             self._update_downstream_games(game)
 
-            if self.cup_type in [CupType.GROUP, CupType.GROUP2] and not self.playoff_games:
+            if self.auto_playoffs and self.cup_type in [CupType.GROUP, CupType.GROUP2] and not self.playoff_games:
                 # Check if all group games are finished
                 if all(g.state == GameState.ENDED for g in self.games if g.group):
                     self.generate_playoffs()
 
+        # Last, so a failure here cannot keep the tournament from advancing.
+        if self._search_index is not None:
+            self._search_index.refresh(game)
+
     def _update_downstream_games(self, completed_game: Game) -> None:
         """Updates any games that have this game as a placeholder source.
 
-        When a game finishes, finds all downstream games that reference this game
-        in their PlaceholderTeam and replaces the placeholder with the actual winner.
+        When a game finishes, follows the bracket edges out of this game to the
+        downstream slots that reference it in a PlaceholderTeam and replaces the
+        placeholder with the actual winner.
         """
         completed_game_id = completed_game.id()
         winner = self._get_game_winner(completed_game)
@@ -1200,36 +1438,30 @@ class Cup:
             # Draw or no winner, cannot update downstream
             return
 
-        # Find all games that depend on this game's winner
-        for game in self.games:
-            updated = False
+        # Only the games that depend on this game's winner are visited
+        updated_games: List[Game] = []
+        for game_id, side in self._dependents.get(completed_game_id, []):
+            game = self._games_by_id.get(game_id)
+            if game is None:
+                continue
 
-            # Check home team
-            if isinstance(game.home_, PlaceholderTeam):
-                placeholder: PlaceholderTeam = game.home_
-                if completed_game_id in placeholder.source_games:
-                    # This game's home team is waiting for our completed game's winner
+            slot = game.home_ if side == "home" else game.away_
+            if isinstance(slot, PlaceholderTeam) and completed_game_id in slot.source_games:
+                # This slot is still waiting for our completed game's winner
+                if side == "home":
                     game.update(home=winner)
-                    updated = True
-
-            # Check away team
-            if isinstance(game.away_, PlaceholderTeam):
-                placeholder: PlaceholderTeam = game.away_
-                if completed_game_id in placeholder.source_games:
-                    # This game's away team is waiting for our completed game's winner
+                else:
                     game.update(away=winner)
-                    updated = True
+                if game not in updated_games:
+                    updated_games.append(game)
 
-            # Notify observers if game was updated
-            if updated:
-                game._notify()
+        # Notify observers of the updated games
+        for game in updated_games:
+            game._notify()
 
     def _find_game_by_id(self, game_id: int) -> Optional[Game]:
         """Finds a game by its ID in the cup's games list."""
-        for game in self.games:
-            if game.id() == game_id:
-                return game
-        return None
+        return self._games_by_id.get(game_id)
 
     def _get_game_winner(self, game: Game) -> Optional[Team]:
         """Returns the winner of a completed game.
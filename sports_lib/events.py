@@ -0,0 +1,124 @@
+import sys
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple
+
+
+class EventBus:
+    """Delivers game notifications to observers on a background thread.
+
+    When installed as `Game.event_bus`, `Game._notify` only queues the game and
+    returns, so the code that mutated the game is not held up by its observers
+    (including cups re-computing standings or generating brackets). A single
+    dispatcher thread delivers events in publication order, which keeps the
+    order of events of each game intact.
+
+    Until `start()` is called, events are delivered inline, exactly like
+    without a bus.
+    """
+
+    def __init__(self, lock: Optional[Any] = None) -> None:
+        """Initializes the bus.
+
+        Args:
+            lock: Optional lock held while observers run, e.g. the lock that
+                guards the objects the observers read and modify.
+        """
+        self.lock = lock
+        self.running = False
+        self._cond = threading.Condition()
+        # Queued (game, origin) pairs. The origin is the number of the publication
+        # the event goes back to: its own, or that of the event whose observers
+        # published it while being delivered.
+        self._events: Deque[Tuple[Any, int]] = deque()
+        self._published = 0
+        self._undelivered: Dict[int, int] = {}  # Origin -> events queued or in delivery, oldest first.
+        self._delivering: Optional[int] = None  # Origin of the event being delivered.
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Starts the dispatcher thread."""
+        self.running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Delivers everything still queued and stops the dispatcher thread."""
+        self.flush()
+        with self._cond:
+            self.running = False
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def publish(self, game: Any) -> None:
+        """Queues a notification for the game's observers."""
+        if not self.running:
+            self._deliver_locked(game)
+            return
+        with self._cond:
+            if self._delivering is not None and threading.current_thread() is self._thread:
+                origin = self._delivering  # Published by an observer: part of that delivery.
+            else:
+                self._published += 1
+                origin = self._published
+            self._events.append((game, origin))
+            self._undelivered[origin] = self._undelivered.get(origin, 0) + 1
+            self._cond.notify_all()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Blocks until every event published before the call has been delivered.
+
+        Events that observers publish while delivering those (e.g. a cup scheduling
+        the next round when a game ends) are waited for as well, but events published
+        afterwards by other threads are not, so a steady stream of them cannot hold
+        the caller up.
+
+        Must not be called from an observer or while holding `lock`.
+
+        Returns:
+            bool: False if the timeout expired first.
+        """
+        with self._cond:
+            target = self._published
+            return self._cond.wait_for(
+                # Origins are queued in increasing order, so the first is the oldest.
+                lambda: not self._undelivered or next(iter(self._undelivered)) > target or not self.running,
+                timeout,
+            )
+
+    def deliver(self, game: Any) -> None:
+        """Runs the game's observers. Subclasses may extend this."""
+        game._dispatch()
+
+    def _deliver_locked(self, game: Any) -> None:
+        try:
+            if self.lock is None:
+                self.deliver(game)
+            else:
+                with self.lock:
+                    self.deliver(game)
+        except Exception as e:
+            # A failing delivery must not stop the dispatcher
+            print(f"Error delivering event for game {game}: {e}", file=sys.stderr)
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._events or not self.running)
+                if not self._events:
+                    return
+                game, origin = self._events.popleft()
+                self._delivering = origin
+
+            self._deliver_locked(game)
+
+            with self._cond:
+                self._delivering = None
+                left = self._undelivered[origin] - 1
+                if left:
+                    self._undelivered[origin] = left
+                else:
+                    del self._undelivered[origin]
+                self._cond.notify_all()
@@ -4,6 +4,7 @@ from typing import Any, Dict, List, Tuple, Optional
 import sys
 
 from .team import Team
+from .pubsub import SubscriptionRegistry, topic
 from .constants import GameState, GameSettings
 from .helpers import TimeHelper, PlayerHelper, ScoreHelper
 
@@ -14,6 +15,9 @@ class Game:
     Updated to include Observer pattern and CRUD methods.
     """
 
+    # When set, notifications are queued on this EventBus instead of delivered inline.
+    event_bus: Optional[Any] = None
+
     def __init__(
         self,
         home: Team,
@@ -30,7 +34,9 @@ class Game:
         self.state = kwargs.get("state", GameState.READY)
         self.group = kwargs.get("group", None)
 
-        self._observers: List[Any] = []
+        # Observers are kept in a registry under topic "game:<id>"; Repo and Cup pass a shared one.
+        self.subscriptions: SubscriptionRegistry = kwargs.get("subscriptions") or SubscriptionRegistry()
+        self.version = 0  # Bumped on every notification, i.e. once per mutation.
 
         self.total_time = GameSettings.DEFAULT_TIME
         self.gametime = GameSettings.DEFAULT_TIME
@@ -65,31 +71,57 @@ class Game:
         """Returns the away team object."""
         return self.away_
 
+    def topic(self) -> str:
+        """Returns the subscription topic of the game."""
+        return topic("game", self.id_)
+
     def watch(self, obj: Any) -> None:
         """Adds the obj as an observer for the game."""
         if not hasattr(obj, "update"):
             raise TypeError(f"Observer {obj} must have an 'update' method.")
-        if obj in self._observers:
+        if not self.subscriptions.subscribe(self.topic(), obj):
             raise ValueError(f"Observer {obj} is already watching Game {self.id_}.")
-        self._observers.append(obj)
 
     def unwatch(self, obj: Any) -> None:
         """Remove the obj from list of observers."""
-        if obj not in self._observers:
+        if not self.subscriptions.unsubscribe(self.topic(), obj):
             raise ValueError(f"Observer {obj} is not watching Game {self.id_}.")
-        self._observers.remove(obj)
 
     # new
     def _notify(self) -> None:
-        """Notifies all observers of an update."""
-        # Iterate over a copy to allow observers to unwatch themselves during update
-        for observer in list(self._observers):
-            if observer in self._observers and hasattr(observer, "update"):
-                try:
-                    observer.update(self)
-                except Exception as e:
-                    # Prevent a failing observer from crashing the game logic
-                    print(f"Error notifying observer {observer}: {e}", file=sys.stderr)
+        """Notifies all observers of an update, through the event bus if one is set."""
+        self.version += 1
+        if Game.event_bus is not None:
+            Game.event_bus.publish(self)
+        else:
+            self._dispatch()
+
+    def _dispatch(self) -> None:
+        """Calls `update` on every observer of the game and of its two teams."""
+        registry = self.subscriptions
+        names = [self.topic()] + [
+            team.topic() for team in (self.home_, self.away_) if team.id_ >= 0
+        ]
+        groups = [(name, registry.subscribers(name)) for name in names]
+        groups = [(name, observers) for name, observers in groups if observers]
+        # Someone watching both the game and a team gets a single update.
+        notified = set() if len(groups) > 1 else None
+
+        for name, observers in groups:
+            for observer in observers:
+                # The tuple is a snapshot; skip observers removed during this dispatch.
+                if not registry.is_subscribed(name, observer):
+                    continue
+                if notified is not None:
+                    if observer in notified:
+                        continue
+                    notified.add(observer)
+                if hasattr(observer, "update"):
+                    try:
+                        observer.update(self)
+                    except Exception as e:
+                        # Prevent a failing observer from crashing the game logic
+                        print(f"Error notifying observer {observer}: {e}", file=sys.stderr)
 
     def start(self) -> None:
         """Transitions the game from READY to RUNNING state.
@@ -268,9 +300,20 @@ class Game:
         return str(self.stats())
 
     def update(self, **kw: Any) -> None:
-        """Updates the game with new values."""
+        """Updates the game with new values.
+
+        Raises:
+            TypeError: If `datetime` is not a datetime.
+            ValueError: If `datetime` carries a timezone; game times are naive, so
+                they stay comparable with each other.
+        """
         if "datetime" in kw:
-            self.datetime = kw["datetime"]
+            when = kw["datetime"]
+            if not isinstance(when, datetime):
+                raise TypeError(f"Game datetime must be a datetime, not {type(when).__name__}.")
+            if when.tzinfo is not None:
+                raise ValueError("Game datetime must be naive (no timezone).")
+            self.datetime = when
         if "group" in kw:
             self.group = kw["group"]
         
@@ -292,7 +335,7 @@ class Game:
 
     def delete(self) -> None:
         """Deletes the item by clearing its internal data."""
-        self._observers.clear()
+        self.subscriptions.drop_topic(self.topic())
         self.timeline.clear()
         self.home_players.clear()
         self.away_players.clear()
@@ -303,12 +346,14 @@ class Game:
         return self.id_
 
     # For pickle
+    # Subscriptions are live connections and are not persisted; a Repo re-shares its registry on load.
     def __getstate__(self):
         state = self.__dict__.copy()
-        state["_observers"] = []
+        state.pop("subscriptions", None)
         return state
 
     def __setstate__(self, state):
+        state.pop("_observers", None)  # Pre-registry pickles.
         self.__dict__.update(state)
-        if "_observers" not in self.__dict__:
-            self._observers = []
+        self.subscriptions = SubscriptionRegistry()
+        self.__dict__.setdefault("version", 0)
@@ -7,7 +7,7 @@ management.
 """
 
 from time import monotonic
-from typing import Tuple
+from typing import Any, Tuple
 
 from .constants import GameSettings, GameState
 
@@ -0,0 +1,114 @@
+import threading
+from typing import Any, Dict, List, Set, Tuple
+
+
+def topic(kind: str, oid: int) -> str:
+    """Returns the topic name of an object, e.g. topic("game", 7) -> "game:7"."""
+    return f"{kind}:{oid}"
+
+
+class SubscriptionRegistry:
+    """Central topic -> subscribers map used by Game, Cup and Team.
+
+    Topics are strings like "game:<id>", "cup:<id>" and "team:<id>", so the IDs
+    must be unique among the objects sharing a registry (a Repo shares one
+    across everything it creates). Membership is set-based, and a reverse index
+    from subscriber to topics lets a subscriber be removed everywhere in time
+    proportional to its own subscriptions.
+
+    Each subscription can carry parameters of any type, which the registry
+    stores without looking at them (a cup keeps a tuple of its observer's
+    watch filters there).
+    """
+
+    def __init__(self) -> None:
+        """Initializes an empty registry."""
+        self._lock = threading.RLock()
+        # topic -> {subscriber: params}, in subscription order.
+        self._subscribers: Dict[str, Dict[Any, Any]] = {}
+        # subscriber -> topics it is subscribed to.
+        self._topics: Dict[Any, Set[str]] = {}
+        # topic -> subscribers tuple, cached between changes for cheap publishing.
+        self._snapshots: Dict[str, Tuple[Any, ...]] = {}
+
+    def subscribe(self, topic: str, subscriber: Any, params: Any = None) -> bool:
+        """Subscribes to a topic, or updates the parameters of an existing subscription.
+
+        Returns:
+            bool: True if the subscriber was not subscribed to the topic before.
+        """
+        with self._lock:
+            members = self._subscribers.setdefault(topic, {})
+            is_new = subscriber not in members
+            members[subscriber] = params
+            if is_new:
+                self._topics.setdefault(subscriber, set()).add(topic)
+                self._snapshots.pop(topic, None)
+            return is_new
+
+    def unsubscribe(self, topic: str, subscriber: Any) -> bool:
+        """Removes a subscription.
+
+        Returns:
+            bool: False if the subscriber was not subscribed to the topic.
+        """
+        with self._lock:
+            members = self._subscribers.get(topic)
+            if not members or subscriber not in members:
+                return False
+            del members[subscriber]
+            if not members:
+                del self._subscribers[topic]
+            self._snapshots.pop(topic, None)
+
+            topics = self._topics[subscriber]
+            topics.discard(topic)
+            if not topics:
+                del self._topics[subscriber]
+            return True
+
+    def unsubscribe_all(self, subscriber: Any) -> List[str]:
+        """Removes every subscription of a subscriber and returns the topics it left."""
+        with self._lock:
+            topics = list(self._topics.get(subscriber, ()))
+            for name in topics:
+                self.unsubscribe(name, subscriber)
+            return topics
+
+    def drop_topic(self, topic: str) -> None:
+        """Removes a topic together with all its subscriptions (e.g. on deletion)."""
+        with self._lock:
+            for subscriber in list(self._subscribers.get(topic, ())):
+                self.unsubscribe(topic, subscriber)
+
+    def is_subscribed(self, topic: str, subscriber: Any) -> bool:
+        """Checks whether the subscriber is subscribed to the topic."""
+        members = self._subscribers.get(topic)
+        return members is not None and subscriber in members
+
+    def params(self, topic: str, subscriber: Any) -> Any:
+        """Returns the parameters of a subscription, or None if there are none."""
+        return self._subscribers.get(topic, {}).get(subscriber)
+
+    def subscribers(self, topic: str) -> Tuple[Any, ...]:
+        """Returns the topic's subscribers in subscription order.
+
+        The tuple is a snapshot, so subscriptions may change while it is iterated.
+        """
+        snapshot = self._snapshots.get(topic)
+        if snapshot is None:
+            with self._lock:
+                snapshot = tuple(self._subscribers.get(topic, ()))
+                if snapshot:
+                    self._snapshots[topic] = snapshot
+        return snapshot
+
+    def subscriptions(self, topic: str) -> List[Tuple[Any, Any]]:
+        """Returns (subscriber, params) pairs of the topic in subscription order."""
+        with self._lock:
+            return list(self._subscribers.get(topic, {}).items())
+
+    def topics_of(self, subscriber: Any) -> Set[str]:
+        """Returns the topics the subscriber is subscribed to."""
+        with self._lock:
+            return set(self._topics.get(subscriber, ()))
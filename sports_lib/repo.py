@@ -1,8 +1,55 @@
-from typing import Any, Dict, List, Optional, Tuple, Set
+import threading
+from bisect import bisect_left, bisect_right, insort
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Set
 
 from .cup import Cup
 from .game import Game
 from .team import Team
+from .pubsub import SubscriptionRegistry
+from .search import SearchIndex
+from .changes import ChangeLog
+
+# Several Repo methods take an 'id' parameter that shadows the builtin.
+_identity = id
+
+# Object types that get their own secondary index, in `create(type=...)` naming.
+_TYPE_KEYS: Tuple[Tuple[str, type], ...] = (("team", Team), ("game", Game), ("cup", Cup))
+
+
+def _discard_sorted(ids: List[int], value: int) -> None:
+    """Removes a value from a sorted list, if present."""
+    i = bisect_left(ids, value)
+    if i < len(ids) and ids[i] == value:
+        del ids[i]
+
+
+def _type_key(instance: Any) -> Optional[str]:
+    """Returns the `create()` type name of an instance, or None if it is not indexed."""
+    for key, cls in _TYPE_KEYS:
+        if isinstance(instance, cls):
+            return key
+    return None
+
+
+def paginate(ids: List[int], limit: Optional[int], after: Optional[int]) -> Tuple[List[int], Optional[int]]:
+    """Returns the page of the sorted `ids` that follows the ID `after` (the last ID of
+    the previous page) and the cursor of the next page, or None after the last page.
+    """
+    start = bisect_right(ids, after) if after is not None else 0
+    if limit is None:
+        return ids[start:], None
+    page = ids[start:start + limit]
+    return page, page[-1] if start + limit < len(ids) else None
+
+
+class _ChangeObserver:
+    """Subscribed to every game of a repo, so its game changes reach `Repo.changed`."""
+
+    def __init__(self, repo: "Repo") -> None:
+        self.repo = repo
+
+    def update(self, game: Game) -> None:
+        self.repo.changed(game.id())
 
 
 class Repo:
@@ -16,6 +63,82 @@ class Repo:
         self._objects: Dict[int, Dict[str, Any]] = {}
         self._attachments: Dict[int, Set[str]] = {}
         self._last_id = 0
+        # Reverse index keyed by object identity: id(instance) -> repository ID.
+        self._ids_by_identity: Dict[int, int] = {}
+        # Secondary indexes per object type: type name -> {ID: instance}.
+        self._by_type: Dict[str, Dict[int, Any]] = {key: {} for key, _ in _TYPE_KEYS}
+        # Sorted IDs, overall and per type, for cursor-based paging.
+        self._sorted_ids: List[int] = []
+        self._sorted_ids_by_type: Dict[str, List[int]] = {key: [] for key, _ in _TYPE_KEYS}
+        # Shared by every object created here, so topics are "<type>:<repository ID>".
+        self.subscriptions = SubscriptionRegistry()
+        # Text search index, built on the first search and then kept up to date.
+        self._search_index: Optional[SearchIndex] = None
+        self._search_build_lock = threading.Lock()  # Readers may search concurrently.
+        # Global mutation sequence; every create, change and delete is logged here.
+        self.changes = ChangeLog()
+        self._change_observer = _ChangeObserver(self)
+
+    # Exclude the derived indexes from serialization; id() values do not survive pickling.
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop("_ids_by_identity", None)
+        state.pop("_by_type", None)
+        state.pop("_sorted_ids", None)
+        state.pop("_sorted_ids_by_type", None)
+        state.pop("subscriptions", None)
+        state.pop("_search_index", None)
+        state.pop("_search_build_lock", None)
+        state.pop("_change_observer", None)
+        return state
+
+    # Rebuild the derived indexes for the freshly unpickled instances.
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._ids_by_identity = {}
+        self._by_type = {key: {} for key, _ in _TYPE_KEYS}
+        self._sorted_ids = []
+        self._sorted_ids_by_type = {key: [] for key, _ in _TYPE_KEYS}
+        self._search_index = None
+        self._search_build_lock = threading.Lock()
+        self._change_observer = _ChangeObserver(self)
+        if "changes" not in self.__dict__:
+            self.changes = ChangeLog()  # Pickled before there was a change log.
+        for obj_id, data in self._objects.items():
+            self._index(obj_id, data["instance"])
+
+        # Objects come back with private registries; share one again and let the
+        # cups re-subscribe to their games.
+        self.subscriptions = SubscriptionRegistry()
+        for data in self._objects.values():
+            if hasattr(data["instance"], "subscriptions"):
+                data["instance"].subscriptions = self.subscriptions
+        for _, game in self.games():
+            self.subscriptions.subscribe(game.topic(), self._change_observer)
+        for _, cup in self.cups():
+            # A cup pickled on its own is restored after its repo; it keeps the
+            # registry and re-subscribes in its own __setstate__.
+            cup.subscriptions = self.subscriptions
+            if "games" in cup.__dict__:
+                cup._watch_games()
+
+    def _index(self, obj_id: int, instance: Any) -> None:
+        """Adds an object to the identity and per-type indexes."""
+        self._ids_by_identity[_identity(instance)] = obj_id
+        insort(self._sorted_ids, obj_id)  # New IDs are the largest, so this appends.
+        key = _type_key(instance)
+        if key is not None:
+            self._by_type[key][obj_id] = instance
+            insort(self._sorted_ids_by_type[key], obj_id)
+
+    def _unindex(self, obj_id: int, instance: Any) -> None:
+        """Removes an object from the identity and per-type indexes."""
+        self._ids_by_identity.pop(_identity(instance), None)
+        _discard_sorted(self._sorted_ids, obj_id)
+        key = _type_key(instance)
+        if key is not None:
+            self._by_type[key].pop(obj_id, None)
+            _discard_sorted(self._sorted_ids_by_type[key], obj_id)
 
     def create(self, **kwargs: Any) -> int:
         """Creates and registers an object based on its 'type'.
@@ -33,6 +156,7 @@ class Repo:
         
         # Inject the ID into kwargs so constructors can use/store it
         kwargs["id_"] = new_id
+        kwargs["subscriptions"] = self.subscriptions
 
         try:
             if obj_type == "team":
@@ -52,8 +176,67 @@ class Repo:
 
         self._objects[new_id] = {"instance": new_obj}
         self._attachments[new_id] = set()
+        self._index(new_id, new_obj)
+        if self._search_index is not None:
+            self._search_index.set(new_id, self._search_texts(new_id, new_obj))
+        if isinstance(new_obj, Game):
+            self.subscriptions.subscribe(new_obj.topic(), self._change_observer)
+        self.changes.record(new_id)
         return new_id
 
+    def id_of(self, obj: Any) -> Optional[int]:
+        """Returns the ID of a managed object, or None if it is not in the repository.
+
+        The lookup is by identity (`is`), not equality, and runs in constant time.
+        """
+        return self._ids_by_identity.get(_identity(obj))
+
+    def teams(self) -> Iterator[Tuple[int, Team]]:
+        """Iterates over (ID, Team) pairs without touching other object types."""
+        return iter(list(self._by_type["team"].items()))
+
+    def games(self) -> Iterator[Tuple[int, Game]]:
+        """Iterates over (ID, Game) pairs without touching other object types."""
+        return iter(list(self._by_type["game"].items()))
+
+    def cups(self) -> Iterator[Tuple[int, Cup]]:
+        """Iterates over (ID, Cup) pairs without touching other object types."""
+        return iter(list(self._by_type["cup"].items()))
+
+    def count(self, type: str) -> int:
+        """Returns the number of managed objects of a type ('team', 'game' or 'cup').
+
+        Raises:
+            ValueError: If the type is not indexed.
+        """
+        if type not in self._by_type:
+            raise ValueError(f"Unknown object type '{type}'")
+        return len(self._by_type[type])
+
+    def page(
+        self, type: Optional[str] = None, limit: Optional[int] = None, after: Optional[int] = None
+    ) -> Tuple[List[int], Optional[int]]:
+        """Returns a page of object IDs in ascending order, and the cursor of the next page.
+
+        Args:
+            type: Only objects of this type ('team', 'game' or 'cup'); all objects if None.
+            limit: Maximum page size; the rest of the IDs if None.
+            after: Cursor returned for the previous page (its last ID); None for the first page.
+
+        Returns:
+            Tuple[List[int], Optional[int]]: The IDs, and None after the last page.
+
+        Raises:
+            ValueError: If the type is not indexed.
+        """
+        if type is None:
+            ids = self._sorted_ids
+        elif type in self._sorted_ids_by_type:
+            ids = self._sorted_ids_by_type[type]
+        else:
+            raise ValueError(f"Unknown object type '{type}'")
+        return paginate(ids, limit, after)
+
     def list(self) -> List[Tuple[int, str]]:
         """Returns a list of (ID, description) for all managed objects."""
         results: List[Tuple[int, str]] = []
@@ -124,6 +307,76 @@ class Repo:
         if hasattr(self._objects[id]["instance"], "delete"):
             self._objects[id]["instance"].delete()
 
+        instance = self._objects[id]["instance"]
+        self._unindex(id, instance)
         del self._objects[id]
         if id in self._attachments:
             del self._attachments[id]
+
+        self.changes.record(id, deleted=True)
+        if self._search_index is not None:
+            self._search_index.remove(id)
+        if isinstance(instance, Team):
+            # Its games are now described with the deleted team's name.
+            self._games_changed(instance)
+            # Cups list their teams by ID, and this one no longer has one, so
+            # their cached standings, game trees and search index are stale.
+            for _, cup in self.cups():
+                if any(team is instance for team in cup.teams):
+                    cup.touch()
+
+    def search(self, query: str, match: str = "substring") -> List[int]:
+        """Returns the sorted IDs of the objects whose texts match the query.
+
+        Objects are found by their description, team and cup names, group labels
+        and game dates, case-insensitively. `match` is 'substring' (the query
+        occurs in a text) or 'prefix' (every query word starts a word).
+
+        Raises:
+            ValueError: If the match mode is unknown.
+        """
+        with self._search_build_lock:
+            if self._search_index is None:
+                index = SearchIndex()
+                for obj_id, data in self._objects.items():
+                    index.set(obj_id, self._search_texts(obj_id, data["instance"]))
+                self._search_index = index
+        return self._search_index.match(query, match)
+
+    def changed(self, id: int, renamed: bool = False) -> None:
+        """Records a change of an object in the change log and refreshes its search entry.
+
+        Games report their changes through their notifications and cups through
+        their version bumps; other changes (e.g. to a team, or a cup's name) need
+        this call. Pass `renamed=True` when a team's name changed: its games show
+        the name, so they are recorded and refreshed too.
+        """
+        if id not in self._objects:
+            return
+        self.changes.record(id)
+        instance = self._objects[id]["instance"]
+        if self._search_index is not None:
+            self._search_index.set(id, self._search_texts(id, instance))
+        if renamed and isinstance(instance, Team):
+            self._games_changed(instance)
+
+    def _games_changed(self, team: Team) -> None:
+        for game_id, game in self.games():
+            if game.home_ is team or game.away_ is team:
+                self.changes.record(game_id)
+                if self._search_index is not None:
+                    self._search_index.set(game_id, self._search_texts(game_id, game))
+
+    def _search_texts(self, obj_id: int, instance: Any) -> List[str]:
+        """Returns the texts an object is found by in `search`."""
+        if isinstance(instance, Cup):
+            # The description of a cup carries game counts, which change as it runs.
+            name = self._objects[obj_id].get("metadata", {}).get("name", "")
+            return [f"Cup Tournament: {instance.cup_type}", name, *instance.groups]
+        texts = [str(instance)]
+        if isinstance(instance, Game):
+            if instance.group:
+                texts.append(str(instance.group))
+            if hasattr(instance.datetime, "isoformat"):
+                texts.append(instance.datetime.isoformat()[:10])  # The date part.
+        return texts
@@ -0,0 +1,181 @@
+import threading
+from time import monotonic
+from typing import Any, Dict, Optional
+
+
+class _ReadGuard:
+    """Context manager taking an RWLock for reading."""
+
+    __slots__ = ("_lock",)
+
+    def __init__(self, lock: "RWLock") -> None:
+        self._lock = lock
+
+    def __enter__(self) -> "RWLock":
+        self._lock.acquire_read()
+        return self._lock
+
+    def __exit__(self, *exc: Any) -> None:
+        self._lock.release_read()
+
+
+class RWLock:
+    """Reader-writer lock: shared among readers, exclusive for a writer.
+
+    Used directly as a context manager (`with lock:`) it is taken for writing,
+    so it can stand in for an RLock; `with lock.read():` takes it shared. Both
+    are reentrant, and the writer may take it for reading too, but a reader
+    cannot upgrade to writing (two readers doing so would deadlock) and gets a
+    RuntimeError instead.
+
+    Waiting is phase-fair: once a writer waits, new readers queue behind it, and
+    when a writer releases, every reader waiting by then is let in before the
+    next writer. Neither side starves under a steady stream of the other.
+    Writers take turns in arrival order, so one releasing and re-acquiring in
+    a loop cannot shut out another.
+
+    The time spent waiting is recorded per mode; see `stats()`.
+    """
+
+    def __init__(self) -> None:
+        """Initializes an unlocked lock."""
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = 0  # Threads holding the lock for reading.
+        self._writer: Optional[int] = None  # Ident of the thread holding it for writing.
+        self._write_depth = 0
+        self._waiting_readers = 0
+        self._waiting_writers = 0
+        self._next_ticket = 0  # Writers are served in ticket order.
+        self._serving = 0
+        self._epoch = 0  # Incremented by every write release.
+        self._admit = 0  # Readers let in by the last write release that have not entered yet.
+        self._local = threading.local()  # Read depth of the current thread.
+        self._stats: Dict[str, Dict[str, float]] = {
+            mode: {"acquired": 0, "contended": 0, "wait_total": 0.0, "wait_max": 0.0}
+            for mode in ("read", "write")
+        }
+
+    def read(self) -> _ReadGuard:
+        """Returns a context manager taking the lock for reading."""
+        return _ReadGuard(self)
+
+    def acquire_read(self) -> None:
+        """Takes the lock shared, waiting while a writer holds it or is queued."""
+        depth = getattr(self._local, "depth", 0)
+        if depth:
+            self._local.depth = depth + 1
+            return
+        me = threading.get_ident()
+        with self._cond:
+            if self._writer == me:
+                # Reading inside one's own write section needs no second lock.
+                self._write_depth += 1
+                return
+            stats = self._stats["read"]
+            stats["acquired"] += 1
+            if self._writer is not None or self._waiting_writers:
+                start = monotonic()
+                epoch = self._epoch
+                self._waiting_readers += 1
+                try:
+                    self._cond.wait_for(
+                        lambda: self._writer is None and (not self._waiting_writers or self._epoch != epoch)
+                    )
+                finally:
+                    self._waiting_readers -= 1
+                if self._epoch != epoch and self._admit:
+                    self._admit -= 1
+                    if not self._admit:
+                        self._cond.notify_all()
+                self._record(stats, monotonic() - start)
+            self._readers += 1
+        self._local.depth = 1
+
+    def release_read(self) -> None:
+        """Releases a read acquisition of the current thread."""
+        depth = getattr(self._local, "depth", 0)
+        if depth > 1:
+            self._local.depth = depth - 1
+        elif depth == 1:
+            self._local.depth = 0
+            with self._cond:
+                self._readers -= 1
+                if not self._readers:
+                    self._cond.notify_all()
+        else:
+            # Taken inside the thread's write section.
+            self.release_write()
+
+    def acquire_write(self) -> None:
+        """Takes the lock exclusively.
+
+        Raises:
+            RuntimeError: If the current thread holds the lock for reading.
+        """
+        me = threading.get_ident()
+        with self._cond:
+            if self._writer == me:
+                self._write_depth += 1
+                return
+            if getattr(self._local, "depth", 0):
+                raise RuntimeError("Cannot upgrade a read lock to a write lock.")
+            stats = self._stats["write"]
+            stats["acquired"] += 1
+            ticket = self._next_ticket
+            self._next_ticket += 1
+            if self._serving != ticket or self._writer is not None or self._readers or self._admit:
+                start = monotonic()
+                self._waiting_writers += 1
+                try:
+                    self._cond.wait_for(
+                        lambda: self._serving == ticket and self._writer is None and not self._readers and not self._admit
+                    )
+                finally:
+                    self._waiting_writers -= 1
+                self._record(stats, monotonic() - start)
+            self._writer = me
+            self._write_depth = 1
+
+    def release_write(self) -> None:
+        """Releases a write acquisition of the current thread.
+
+        Raises:
+            RuntimeError: If the current thread does not hold the lock for writing.
+        """
+        with self._cond:
+            if self._writer != threading.get_ident():
+                raise RuntimeError("Cannot release a write lock held by another thread.")
+            self._write_depth -= 1
+            if self._write_depth:
+                return
+            self._writer = None
+            self._serving += 1
+            self._epoch += 1
+            self._admit = self._waiting_readers
+            self._cond.notify_all()
+
+    def __enter__(self) -> "RWLock":
+        self.acquire_write()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.release_write()
+
+    def _record(self, stats: Dict[str, float], waited: float) -> None:
+        stats["contended"] += 1
+        stats["wait_total"] += waited
+        stats["wait_max"] = max(stats["wait_max"], waited)
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns wait metrics per mode plus the current holders and waiters.
+
+        For "read" and "write": acquisitions (reentrant ones not counted), how
+        many of them had to wait, and the total and longest wait in seconds.
+        """
+        with self._cond:
+            result: Dict[str, Any] = {mode: dict(values) for mode, values in self._stats.items()}
+            result["readers"] = self._readers
+            result["writer"] = self._writer is not None
+            result["waiting_readers"] = self._waiting_readers
+            result["waiting_writers"] = self._waiting_writers
+        return result
@@ -0,0 +1,117 @@
+import re
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Set, Tuple
+
+_WORD = re.compile(r"\w+")
+_GRAM = 3
+
+
+def _grams(word: str) -> Set[str]:
+    return {word[i:i + _GRAM] for i in range(len(word) - _GRAM + 1)}
+
+
+class SearchIndex:
+    """Inverted index from words to the IDs of the objects whose texts contain them.
+
+    Each object is indexed under a few case-folded texts (names, labels, dates).
+    Queries are answered from the distinct words instead of the objects:
+
+    - prefix: every query word starts some word of the object, found by bisecting
+      the sorted word list.
+    - substring: the query occurs in one of the object's texts. Candidates are the
+      objects having a word that contains each query word (looked up through a
+      trigram -> words map), then verified against the texts.
+
+    The index is generic; the caller decides which texts an object has and calls
+    `set` again whenever they change.
+    """
+
+    def __init__(self) -> None:
+        """Initializes an empty index."""
+        self._texts: Dict[int, Tuple[str, ...]] = {}  # ID -> case-folded texts.
+        self._postings: Dict[str, Set[int]] = {}  # Word -> IDs.
+        self._words: List[str] = []  # Distinct words, sorted.
+        self._grams: Dict[str, Set[str]] = {}  # Trigram -> words containing it.
+
+    def __len__(self) -> int:
+        return len(self._texts)
+
+    def set(self, oid: int, texts: Iterable[str]) -> None:
+        """Indexes an object under the given texts, replacing its previous entry."""
+        folded = tuple(text.casefold() for text in texts if text)
+        if self._texts.get(oid) == folded:
+            return
+        self.remove(oid)
+        self._texts[oid] = folded
+        for word in {w for text in folded for w in _WORD.findall(text)}:
+            ids = self._postings.get(word)
+            if ids is None:
+                ids = self._postings[word] = set()
+                insort(self._words, word)
+                for gram in _grams(word):
+                    self._grams.setdefault(gram, set()).add(word)
+            ids.add(oid)
+
+    def remove(self, oid: int) -> None:
+        """Drops an object from the index, if present."""
+        texts = self._texts.pop(oid, None)
+        if texts is None:
+            return
+        for word in {w for text in texts for w in _WORD.findall(text)}:
+            ids = self._postings[word]
+            ids.discard(oid)
+            if ids:
+                continue
+            del self._postings[word]
+            del self._words[bisect_left(self._words, word)]
+            for gram in _grams(word):
+                words = self._grams[gram]
+                words.discard(word)
+                if not words:
+                    del self._grams[gram]
+
+    def match(self, query: str, mode: str = "substring") -> List[int]:
+        """Returns the sorted IDs of the objects matching the query.
+
+        Raises:
+            ValueError: If the mode is not 'substring' or 'prefix'.
+        """
+        if mode not in ("substring", "prefix"):
+            raise ValueError(f"Unknown match mode '{mode}'; expected 'substring' or 'prefix'.")
+        query = query.casefold()
+        terms = _WORD.findall(query)
+        if not terms:
+            # Only punctuation or spaces; nothing to look up, so check every text.
+            return sorted(oid for oid, texts in self._texts.items() if any(query in t for t in texts))
+
+        find = self._words_with_prefix if mode == "prefix" else self._words_containing
+        candidates: List[Set[int]] = []
+        for term in set(terms):
+            ids: Set[int] = set()
+            for word in find(term):
+                ids |= self._postings[word]
+            if not ids:
+                return []
+            candidates.append(ids)
+
+        # Walk the smallest candidate set and probe the others.
+        candidates.sort(key=len)
+        smallest, rest = candidates[0], candidates[1:]
+        found = [oid for oid in smallest if all(oid in other for other in rest)]
+        if mode == "substring" and (len(terms) > 1 or terms[0] != query):
+            # The words matched separately; check they occur together as queried.
+            found = [oid for oid in found if any(query in t for t in self._texts[oid])]
+        return sorted(found)
+
+    def _words_with_prefix(self, prefix: str) -> List[str]:
+        start = bisect_left(self._words, prefix)
+        end = start
+        while end < len(self._words) and self._words[end].startswith(prefix):
+            end += 1
+        return self._words[start:end]
+
+    def _words_containing(self, term: str) -> List[str]:
+        if len(term) < _GRAM:
+            return [word for word in self._words if term in word]
+        sets = sorted((self._grams.get(gram, set()) for gram in _grams(term)), key=len)
+        return [word for word in sets[0] if term in word and all(word in s for s in sets[1:])]
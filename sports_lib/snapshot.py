@@ -0,0 +1,174 @@
+import threading
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+from .cup import Cup
+
+
+class ChunkedMap(Mapping):
+    """Read-only mapping of integer IDs, stored in buckets of BUCKET_SIZE consecutive IDs.
+
+    `updated` returns a changed copy that shares every bucket it did not touch,
+    so a change costs O(BUCKET_SIZE + number of buckets) instead of a copy of
+    every entry. Iterates in ID order.
+    """
+
+    BUCKET_SIZE = 256
+
+    __slots__ = ("_buckets", "_len")
+
+    def __init__(self, items: Iterable[Tuple[int, Any]] = ()) -> None:
+        """Initializes the map from (ID, value) pairs."""
+        self._buckets: Dict[int, Dict[int, Any]] = {}
+        for key, value in items:
+            self._buckets.setdefault(key // self.BUCKET_SIZE, {})[key] = value
+        self._len = sum(len(bucket) for bucket in self._buckets.values())
+
+    def __getitem__(self, key: int) -> Any:
+        bucket = self._buckets.get(key // self.BUCKET_SIZE)
+        if bucket is None:
+            raise KeyError(key)
+        return bucket[key]
+
+    def __contains__(self, key: object) -> bool:
+        if not isinstance(key, int):
+            return False
+        bucket = self._buckets.get(key // self.BUCKET_SIZE)
+        return bucket is not None and key in bucket
+
+    def __iter__(self) -> Iterator[int]:
+        for index in sorted(self._buckets):
+            yield from sorted(self._buckets[index])
+
+    def __len__(self) -> int:
+        return self._len
+
+    def updated(self, changes: Dict[int, Any], deleted: Iterable[int] = ()) -> "ChunkedMap":
+        """Returns a copy with `changes` set and the `deleted` IDs removed."""
+        copy = ChunkedMap()
+        copy._buckets = dict(self._buckets)
+        copy._len = self._len
+        copied = set()  # Buckets already copied for this update, safe to modify.
+
+        def bucket_of(key: int) -> Dict[int, Any]:
+            index = key // self.BUCKET_SIZE
+            bucket = copy._buckets.get(index)
+            if index not in copied:
+                bucket = copy._buckets[index] = dict(bucket) if bucket is not None else {}
+                copied.add(index)
+            return bucket
+
+        for key, value in changes.items():
+            bucket = bucket_of(key)
+            copy._len += key not in bucket
+            bucket[key] = value
+        for key in deleted:
+            bucket = bucket_of(key)
+            if bucket.pop(key, None) is not None:
+                copy._len -= 1
+        for index in copied:
+            if not copy._buckets[index]:
+                del copy._buckets[index]
+        return copy
+
+
+class RepoSnapshot:
+    """Immutable view of a Repo as of one change-log sequence number.
+
+    `entries` maps every object ID to its rendered view, `ids` and `ids_by_type`
+    hold the sorted IDs, and `cup_games` the game IDs of each cup in schedule
+    order. Nothing in a snapshot changes after it is published, so it can be
+    read without any lock while the repo moves on. Successive snapshots share
+    the entries of the objects that did not change: `entries` and `cup_games`
+    are ChunkedMaps, so a snapshot only copies the buckets holding a change.
+    """
+
+    __slots__ = ("repo", "seq", "entries", "ids", "ids_by_type", "cup_games")
+
+    def __init__(
+        self,
+        repo: Any,
+        seq: int,
+        entries: ChunkedMap,
+        ids: Tuple[int, ...],
+        ids_by_type: Dict[str, Tuple[int, ...]],
+        cup_games: ChunkedMap,
+    ) -> None:
+        """Initializes a snapshot; the dict passed in must not be modified afterwards."""
+        self.repo = repo
+        self.seq = seq
+        self.entries = entries
+        self.ids = ids
+        self.ids_by_type: Mapping[str, Tuple[int, ...]] = MappingProxyType(ids_by_type)
+        self.cup_games = cup_games
+
+
+class SnapshotPublisher:
+    """Publishes RepoSnapshots of a repo, each object rendered by `render(id, instance)`.
+
+    `refresh()` brings the published snapshot up to the repo's current change
+    sequence. Only the objects that the change log lists since the previous
+    snapshot are rendered again; the rest are shared with it. The repo must not
+    change during the call, so hold its lock, at least shared. `current` is the
+    latest snapshot and may be read from any thread without locking.
+    """
+
+    def __init__(self, render: Callable[[int, Any], Any]) -> None:
+        """Initializes the publisher; nothing is rendered before the first refresh."""
+        self.render = render
+        self.current: Optional[RepoSnapshot] = None
+        self._lock = threading.Lock()  # Concurrent readers refresh one at a time.
+
+    def refresh(self, repo: Any) -> RepoSnapshot:
+        """Publishes and returns a snapshot of the repo's current state."""
+        with self._lock:
+            previous = self.current
+            if previous is not None and previous.repo is repo:
+                if previous.seq == repo.changes.seq:
+                    return previous
+                changed = repo.changes.since(previous.seq)
+            else:
+                changed = None
+
+            if changed is None:
+                # First snapshot, another repo, or the log no longer reaches back.
+                snapshot = self._build(repo)
+            else:
+                snapshot = self._apply(previous, repo, changed)
+            self.current = snapshot
+            return snapshot
+
+    def _build(self, repo: Any) -> RepoSnapshot:
+        entries = ChunkedMap((oid, self.render(oid, data["instance"])) for oid, data in repo._objects.items())
+        cup_games = ChunkedMap((cid, tuple(g.id() for g in cup.games)) for cid, cup in repo.cups())
+        return RepoSnapshot(repo, repo.changes.seq, entries, *self._ids(repo), cup_games)
+
+    def _apply(self, previous: RepoSnapshot, repo: Any, changed: List[Tuple[int, bool]]) -> RepoSnapshot:
+        # Only the changed objects are visited; the maps copy just the buckets they fall in.
+        rendered: Dict[int, Any] = {}
+        cups: Dict[int, Tuple[int, ...]] = {}
+        removed: List[int] = []
+        membership_changed = False
+        for oid, deleted in changed:
+            data = None if deleted else repo._objects.get(oid)
+            if data is None:
+                membership_changed |= oid in previous.entries
+                removed.append(oid)
+                continue
+            membership_changed |= oid not in previous.entries
+            instance = data["instance"]
+            rendered[oid] = self.render(oid, instance)
+            if isinstance(instance, Cup):
+                cups[oid] = tuple(g.id() for g in instance.games)
+
+        entries = previous.entries.updated(rendered, removed)
+        cup_games = previous.cup_games.updated(cups, removed)
+        if membership_changed:
+            ids, ids_by_type = self._ids(repo)
+        else:
+            ids, ids_by_type = previous.ids, dict(previous.ids_by_type)
+        return RepoSnapshot(repo, repo.changes.seq, entries, ids, ids_by_type, cup_games)
+
+    @staticmethod
+    def _ids(repo: Any) -> Tuple[Tuple[int, ...], Dict[str, Tuple[int, ...]]]:
+        return tuple(repo._sorted_ids), {key: tuple(ids) for key, ids in repo._sorted_ids_by_type.items()}
@@ -1,5 +1,7 @@
 from typing import Any, Dict, List
 
+from .pubsub import SubscriptionRegistry, topic
+
 
 class Team:
     """Represents a sports team, its players, and custom attributes.
@@ -15,6 +17,8 @@ class Team:
             raise ValueError("Team name cannot be empty.")
         self.team_name = name
         self.id_ = kwargs.pop("id_", -1)
+        # Observers of the team's games subscribe under topic "team:<id>".
+        self.subscriptions: SubscriptionRegistry = kwargs.pop("subscriptions", None) or SubscriptionRegistry()
         self.players: Dict[int, Dict[str, Any]] = {}
         self._player_id_counter = 0
         self._generic_attrs: Dict[str, Any] = {}
@@ -39,7 +43,7 @@ class Team:
             AttributeError: If the attribute doesn't exist.
         """
         # Safety check for unpickling or initialization issues
-        if key == "_generic_attrs":
+        if key in ("_generic_attrs", "subscriptions"):
             raise AttributeError()
 
         try:
@@ -62,6 +66,36 @@ class Team:
                 f"'{type(self).__name__}' object has no generic attribute '{key}' to delete."
             )
 
+    def __getstate__(self) -> Dict[str, Any]:
+        """Excludes the subscription registry, which holds live observers, from pickling."""
+        state = self.__dict__.copy()
+        state.pop("subscriptions", None)
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        """Restores the team with an empty subscription registry."""
+        self.__dict__.update(state)
+        self.subscriptions = SubscriptionRegistry()
+
+    def topic(self) -> str:
+        """Returns the subscription topic of the team."""
+        return topic("team", self.id_)
+
+    def watch(self, obj: Any) -> None:
+        """Adds the obj as an observer of every game the team plays in.
+
+        Only games sharing the team's registry (i.e. created by the same Repo) are covered.
+        """
+        if not hasattr(obj, "update"):
+            raise TypeError(f"Observer {obj} must have an 'update' method.")
+        if not self.subscriptions.subscribe(self.topic(), obj):
+            raise ValueError(f"Observer {obj} is already watching Team {self.id_}.")
+
+    def unwatch(self, obj: Any) -> None:
+        """Removes the obj from the team's observers."""
+        if not self.subscriptions.unsubscribe(self.topic(), obj):
+            raise ValueError(f"Observer {obj} is not watching Team {self.id_}.")
+
     def addplayer(self, name: str, no: int) -> int:
         """Adds or updates a player in the team's roster.
 
@@ -121,6 +155,7 @@ class Team:
 
     def delete(self) -> None:
         """Deletes the item by clearing its internal data."""
+        self.subscriptions.drop_topic(self.topic())
         self.players.clear()
         self._generic_attrs.clear()
         self.team_name = "DELETED"